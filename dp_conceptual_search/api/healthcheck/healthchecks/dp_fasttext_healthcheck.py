@@ -17,6 +17,7 @@ class DpFastTextHealthCheck(HealthCheck):
     AVAILABLE = "available"
     UNREACHABLE = "unreachable"
     UNAVAILABLE = "unavailable"
+    NOT_REQUIRED = "not required"
 
     async def healthcheck(self, request: ONSRequest) -> Tuple[str, int]:
         """
@@ -24,6 +25,10 @@ class DpFastTextHealthCheck(HealthCheck):
         :param request:
         :return:
         """
+        if not FastTextClientService.remote_enabled():
+            # All fastText requests are served in-process
+            return self.NOT_REQUIRED, 200
+
         client: Client
         async with FastTextClientService.get_fasttext_client() as client:
             headers = {
@@ -31,7 +36,7 @@ class DpFastTextHealthCheck(HealthCheck):
             }
 
             try:
-                response, headers = await client.healthcheck(headers=headers)
+                response, headers = await FastTextClientService.with_timeout(client.healthcheck(headers=headers))
 
                 if response is not None and \
                     Client.REQUEST_ID_HEADER in headers and headers[Client.REQUEST_ID_HEADER] == request.request_id:
@@ -7,12 +7,14 @@ from dp4py_logging.time import timeit
 from dp4py_sanic.api.response.json_response import json
 
 from dp_conceptual_search.log import logger
+from dp_conceptual_search.config import CONFIG
 from dp_conceptual_search.api.request import ONSRequest
+from dp_conceptual_search.api.response import streaming_json
 from dp_conceptual_search.app.search_app import SearchApp
 
 from dp_conceptual_search.ons.search import SortField
 from dp_conceptual_search.ons.search.index import Index
-from dp_conceptual_search.ons.search.response.client.ons_response import ONSResponse
+from dp_conceptual_search.ons.recommend.client.recommendation_store import RecommendationStore
 from dp_conceptual_search.ons.recommend.client.recommend_search_engine import RecommendationSearchEngine
 
 
@@ -45,19 +47,44 @@ async def recommend_content_by_uri(request: ONSRequest):
     # Get num_labels param
     num_labels: int = request.get_num_labels()
 
-    # Build the query
-    s: RecommendationSearchEngine = await s.similar_by_uri_query(uri, num_labels,
-                                                                 page, page_size,
-                                                                 sort_by=sort_by,
-                                                                 highlight=True)
+    # Serve page 1 from the precomputed store, when enabled
+    store: RecommendationStore = app.recommendation_store
+    if store is not None and page == 1:
+        response = store.get(store.key(uri, num_labels, page_size, sort_by))
+        if response is not None:
+            return json(request, response, 200)
 
-    # Execute
+    # Build and execute the query
     try:
-        response: ONSResponse = await s.execute()
+        if CONFIG.API.streaming_responses_enabled:
+            # Write each hit to the response as it is transformed
+            response = await s.recommend(uri, num_labels, page, page_size, sort_by=sort_by, lazy=True)
+            return streaming_json(request, response, 200)
+
+        response = await s.recommend(uri, num_labels, page, page_size, sort_by=sort_by)
 
         # Return JSON response
-        response = response.to_content_query_search_result(page, page_size, sort_by).to_dict()
         return json(request, response, 200)
     except Exception as e:
         logger.error(request.request_id, "Caught exception executing 'similar_to_uri' query", exc_info=e)
         return json(request, "Caught exception executing 'similar_to_uri' query", 500)
+
+
+@recommend_blueprint.route('/invalidate/', methods=['POST'])
+@timeit
+async def invalidate_recommendations(request: ONSRequest):
+    """
+    Removes cached recommendation data for the input uri (i.e when the page is republished)
+    :param request:
+    :return:
+    """
+    app: SearchApp = request.app
+
+    # Get uri from POST params
+    uri = request.get_uri()
+    app.invalidate_recommendations(uri)
+
+    logger.info(request.request_id, "Invalidated cached recommendations", extra={
+        "uri": uri
+    })
+    return json(request, {"uri": uri}, 200)
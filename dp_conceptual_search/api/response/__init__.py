@@ -0,0 +1 @@
+from dp_conceptual_search.api.response.streaming_json import iter_json_chunks, streaming_json
@@ -0,0 +1,81 @@
+"""
+Streaming (chunked transfer) JSON responses. The envelope of a search result (number of results, paginator etc.) is
+written first, followed by each hit as it is transformed, so that large result pages are never serialised into a
+single response body.
+"""
+from inspect import isawaitable
+from typing import Iterator
+
+from sanic.response import HTTPResponse, StreamingHTTPResponse, stream, json_dumps
+
+from dp4py_sanic.api.response.json_response import json
+
+from dp_conceptual_search.log import logger
+from dp_conceptual_search.api.request import ONSRequest
+from dp_conceptual_search.ons.search.response import SearchResult
+
+# Min size (in characters) of each chunk written to the response
+CHUNK_SIZE = 16 * 1024
+
+
+def iter_json_chunks(data: dict, streamed_key: str=SearchResult.results_key,
+                     chunk_size: int=CHUNK_SIZE) -> Iterator[str]:
+    """
+    Serialises data to JSON in chunks: all other keys first, then each item of the (possibly lazy) iterable under
+    streamed_key. Items are buffered into chunks of at least chunk_size characters.
+    :param data:
+    :param streamed_key:
+    :param chunk_size:
+    :return:
+    """
+    envelope = {key: value for key, value in data.items() if key != streamed_key}
+
+    # Open the envelope, leaving it unterminated
+    head = json_dumps(envelope)[:-1]
+    if len(envelope) > 0:
+        head += ","
+
+    buffer = [head, json_dumps(streamed_key), ":["]
+    buffered = 0
+    for i, item in enumerate(data.get(streamed_key, [])):
+        if i > 0:
+            buffer.append(",")
+
+        serialised = json_dumps(item)
+        buffer.append(serialised)
+        buffered += len(serialised)
+
+        if buffered >= chunk_size:
+            yield "".join(buffer)
+            buffer = []
+            buffered = 0
+
+    buffer.append("]}")
+    yield "".join(buffer)
+
+
+def streaming_json(request: ONSRequest, data: dict, status: int,
+                   streamed_key: str=SearchResult.results_key) -> StreamingHTTPResponse:
+    """
+    Builds a streaming JSON response (see iter_json_chunks). The headers are taken from a response created by
+    dp4py_sanic, so that they match those of a non-streaming response.
+    :param request:
+    :param data:
+    :param status:
+    :param streamed_key:
+    :return:
+    """
+    skeleton: HTTPResponse = json(request, {}, status)
+
+    async def write_chunks(response: StreamingHTTPResponse):
+        try:
+            for chunk in iter_json_chunks(data, streamed_key=streamed_key):
+                result = response.write(chunk)
+                if isawaitable(result):
+                    await result
+        except Exception as e:
+            # The status line has already been sent, so the response can only be truncated
+            logger.error(request.request_id, "Caught exception streaming JSON response", exc_info=e)
+            raise
+
+    return stream(write_chunks, status=status, headers=skeleton.headers, content_type=skeleton.content_type)
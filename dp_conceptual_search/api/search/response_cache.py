@@ -0,0 +1,172 @@
+"""
+Opt-in cache of serialised search API responses. Responses are keyed on the normalised request parameters and stored
+as the already serialised JSON body, so that cache hits skip both Elasticsearch and response serialisation.
+"""
+from enum import Enum
+from functools import wraps
+from typing import Awaitable, Callable, Iterable, Optional, Tuple
+
+from sanic.response import HTTPResponse
+
+from dp4py_sanic.api.response.json_response import json
+
+from dp_conceptual_search.cache import create_cache
+from dp_conceptual_search.api.request import ONSRequest
+from dp_conceptual_search.log.metrics import RESPONSE_CACHE_REQUESTS
+
+
+class SearchEndpoint(Enum):
+    """
+    Enum of search endpoints whose responses can be cached
+    """
+    SEARCH = "search"
+    CONTENT = "content"
+    COUNTS = "counts"
+
+    @staticmethod
+    def from_str(label: str) -> 'SearchEndpoint':
+        """
+        Returns the endpoint with the given (case insensitive) name
+        :param label:
+        :return:
+        """
+        for endpoint in SearchEndpoint:
+            if endpoint.value == label.strip().lower():
+                return endpoint
+        raise NotImplementedError("Unknown search endpoint '{0}'".format(label))
+
+
+class CacheStatus(Enum):
+    """
+    Values of the cache status response header
+    """
+    HIT = "HIT"
+    MISS = "MISS"
+
+
+class ResponseCache(object):
+    """
+    Bounded (by number of entries and total size in bytes) LRU cache of serialised response bodies, with TTL eviction
+    and per-endpoint enablement
+    """
+    NAME = "search_response"
+    CACHE_STATUS_HEADER = "X-Cache"
+
+    def __init__(self, endpoints: Iterable[SearchEndpoint], max_size: int, max_bytes: int, ttl: float):
+        """
+        :param endpoints: Endpoints whose responses are cached
+        :param max_size: Max number of cached responses
+        :param max_bytes: Max total size (in bytes) of cached responses
+        :param ttl: Time-to-live (in seconds) of cached responses
+        """
+        self.endpoints = frozenset(endpoints)
+        self.cache = create_cache(self.NAME, max_size, ttl=ttl, max_weight=max_bytes, weigher=len)
+
+    @classmethod
+    def from_config(cls, endpoints: str, max_size: int, max_bytes: int, ttl: float) -> 'ResponseCache':
+        """
+        Initialises the cache from config
+        :param endpoints: Comma separated list of endpoint names
+        :param max_size:
+        :param max_bytes:
+        :param ttl:
+        :return:
+        """
+        labels = [label for label in endpoints.split(",") if len(label.strip()) > 0]
+        return cls([SearchEndpoint.from_str(label) for label in labels], max_size, max_bytes, ttl)
+
+    def is_enabled(self, endpoint: SearchEndpoint) -> bool:
+        return self.cache.enabled and endpoint in self.endpoints
+
+    @staticmethod
+    def key(request: ONSRequest, endpoint: SearchEndpoint) -> Tuple:
+        """
+        Returns the cache key for the given request, built from the parsed (and so normalised) request parameters used
+        by the endpoint. Only parameters the endpoint actually reads are included, so that invalid values of unused
+        parameters don't raise.
+        :param request:
+        :param endpoint:
+        :return:
+        """
+        search_term = request.get_search_term()
+        type_filters = tuple(sorted(content_type.name for content_type in request.get_type_filters()))
+
+        if endpoint is SearchEndpoint.COUNTS:
+            return endpoint.value, search_term, type_filters
+
+        return endpoint.value, search_term, type_filters, request.get_current_page(), request.get_page_size(), \
+            request.get_sort_by().name
+
+    def get(self, key: Tuple) -> Optional[bytes]:
+        """
+        Returns the cached response body for key, or None
+        :param key:
+        :return:
+        """
+        return self.cache.get(key)
+
+    def put(self, key: Tuple, body: bytes):
+        """
+        Caches the response body under key
+        :param key:
+        :param body:
+        :return:
+        """
+        self.cache[key] = body
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self) -> dict:
+        return {
+            **self.cache.stats(),
+            "endpoints": sorted(endpoint.value for endpoint in self.endpoints)
+        }
+
+
+def cached_json(request: ONSRequest, body: bytes, status: int) -> HTTPResponse:
+    """
+    Builds a JSON response from an already serialised body. The response is created by dp4py_sanic (with an empty
+    body) so that it carries the same headers as an uncached response.
+    :param request:
+    :param body:
+    :param status:
+    :return:
+    """
+    response: HTTPResponse = json(request, {}, status)
+    response.body = body
+    return response
+
+
+def cached_response(endpoint: SearchEndpoint):
+    """
+    Decorator which serves the responses of a search route from the app response cache, if enabled for the endpoint.
+    Only successful (200), non-streaming responses are cached.
+    :param endpoint:
+    :return:
+    """
+    def decorator(handler: Callable[..., Awaitable[HTTPResponse]]):
+        @wraps(handler)
+        async def wrapper(request: ONSRequest, *args, **kwargs) -> HTTPResponse:
+            response_cache: ResponseCache = request.app.response_cache
+            if response_cache is None or not response_cache.is_enabled(endpoint):
+                return await handler(request, *args, **kwargs)
+
+            key = response_cache.key(request, endpoint)
+
+            body = response_cache.get(key)
+            if body is not None:
+                response = cached_json(request, body, 200)
+                status = CacheStatus.HIT
+            else:
+                response = await handler(request, *args, **kwargs)
+                # Streaming responses have no body to cache
+                if response.status == 200 and isinstance(response, HTTPResponse):
+                    response_cache.put(key, response.body)
+                status = CacheStatus.MISS
+
+            RESPONSE_CACHE_REQUESTS.labels(endpoint.value, status.value).inc()
+            response.headers[ResponseCache.CACHE_STATUS_HEADER] = status.value
+            return response
+        return wrapper
+    return decorator
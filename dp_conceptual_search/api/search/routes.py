@@ -8,10 +8,12 @@ from dp4py_sanic.api.response.json_response import json
 
 from dp_conceptual_search.config import CONFIG
 from dp_conceptual_search.api.request import ONSRequest
+from dp_conceptual_search.api.response import streaming_json
 from dp_conceptual_search.ons.search.index import Index
 from dp_conceptual_search.ons.search.client.search_engine import SearchEngine
 from dp_conceptual_search.ons.search.response.search_result import SearchResult
 from dp_conceptual_search.api.search.sanic_search_engine import SanicSearchEngine
+from dp_conceptual_search.api.search.response_cache import cached_response, SearchEndpoint
 from dp_conceptual_search.api.search.conceptual import routes as conceptual_routes
 
 search_blueprint = Blueprint('search', url_prefix='/search')
@@ -34,6 +36,7 @@ async def ons_departments_query(request: ONSRequest) -> HTTPResponse:
 
 
 @search_blueprint.route('/', methods=['GET', 'POST'], strict_slashes=False)
+@cached_response(SearchEndpoint.SEARCH)
 async def search(request: ONSRequest) -> HTTPResponse:
     """
     API which combines the content, counts and featured result queries into one
@@ -52,6 +55,7 @@ async def search(request: ONSRequest) -> HTTPResponse:
 
 
 @search_blueprint.route('/content', methods=['GET', 'POST'], strict_slashes=True)
+@cached_response(SearchEndpoint.CONTENT)
 async def ons_content_query(request: ONSRequest) -> HTTPResponse:
     """
     Handles content queries to the API.
@@ -64,6 +68,11 @@ async def ons_content_query(request: ONSRequest) -> HTTPResponse:
     # Initialise the search engine
     sanic_search_engine = SanicSearchEngine(request.app, SearchEngine, Index.ONS)
 
+    if CONFIG.API.streaming_responses_enabled:
+        # Write each hit to the response as it is transformed
+        search_result: SearchResult = await sanic_search_engine.content_query(request, lazy=True)
+        return streaming_json(request, search_result.to_dict(), 200)
+
     # Perform the request
     search_result: SearchResult = await sanic_search_engine.content_query(request)
 
@@ -71,6 +80,7 @@ async def ons_content_query(request: ONSRequest) -> HTTPResponse:
 
 
 @search_blueprint.route('/counts', methods=['GET', 'POST'], strict_slashes=True)
+@cached_response(SearchEndpoint.COUNTS)
 async def ons_counts_query(request: ONSRequest) -> HTTPResponse:
     """
     Handles type counts queries to the API.
@@ -1,7 +1,11 @@
 """
 This file contains utility methods for performing search queries using abstract search engines and clients
 """
-from typing import ClassVar, List, Dict
+import asyncio
+from time import perf_counter
+from typing import Callable, ClassVar, List, Dict, Awaitable, Tuple
+
+from numpy import zeros
 
 from elasticsearch.exceptions import ConnectionError
 
@@ -9,18 +13,26 @@ from sanic.exceptions import ServerError, InvalidUsage
 
 from dp4py_logging.time import timeit
 
-from dp_conceptual_search.config.config import FASTTEXT_CONFIG
+from dp_conceptual_search.config.config import FASTTEXT_CONFIG, SEARCH_CONFIG
 
 from dp_conceptual_search.log import logger
+from dp_conceptual_search.log.metrics import SEARCH_BRANCH_DURATION, QUERY_BUILD_DURATION
+from dp_conceptual_search.cache import AsyncCache, CacheBackendType, create_cache
 from dp_conceptual_search.app.search_app import SearchApp
 from dp_conceptual_search.api.request import ONSRequest
+from dp_conceptual_search.search.query_template import QueryTemplate
+from dp_conceptual_search.search.stored_search_template import StoredSearchTemplate, StoredSearchTemplates
+from dp_conceptual_search.search.client.multi_search_client import MultiSearchClient
 from dp_conceptual_search.search.client.exceptions import RequestSizeExceededException
 
 from dp_conceptual_search.ons.search.index import Index
+from dp_conceptual_search.ons.search.paginator import Paginator
 from dp_conceptual_search.ons.search.sort_fields import SortField
-from dp_conceptual_search.ons.search.content_type import ContentType
+from dp_conceptual_search.ons.search.content_type import AvailableContentTypes, ContentType
 from dp_conceptual_search.ons.search.client.search_engine import SearchEngine
 from dp_conceptual_search.ons.search.response.search_result import SearchResult
+from dp_conceptual_search.ons.search.response.content_query_result import ContentQueryResult
+from dp_conceptual_search.ons.search.response.type_counts_query_result import TypeCountsQueryResult
 from dp_conceptual_search.ons.search.response.client.ons_response import ONSResponse
 from dp_conceptual_search.ons.search.client.abstract_search_engine import AbstractSearchEngine
 from dp_conceptual_search.ons.conceptual.client import ConceptualSearchEngine, FastTextClientService
@@ -41,12 +53,85 @@ async def execute(request: ONSRequest, engine: AbstractSearchEngine) -> ONSRespo
         raise ServerError(message)
 
 
+async def execute_multi_search(request: ONSRequest, multi_search: MultiSearchClient) -> List[ONSResponse]:
+    """
+    Executes a multi search query and logs known exceptions
+    :param request:
+    :param multi_search:
+    :return:
+    """
+    try:
+        return await multi_search.execute()
+    except ConnectionError as e:
+        message = "Unable to connect to Elasticsearch cluster to perform multi search request"
+        logger.error(request.request_id, message, exc_info=e)
+        raise ServerError(message)
+
+
+async def gather(request: ONSRequest, branches: Dict[str, Awaitable]) -> Dict[str, SearchResult]:
+    """
+    Runs the given branches concurrently and returns their results keyed by branch name. If any branch fails, all
+    outstanding branches are cancelled and the first exception is raised. The time taken by each branch is recorded.
+    :param request:
+    :param branches:
+    :return:
+    """
+    timings = {}
+
+    async def run_branch(name: str, coro: Awaitable):
+        start = perf_counter()
+        try:
+            return await coro
+        finally:
+            elapsed = perf_counter() - start
+            timings[name] = elapsed * 1000.0
+            SEARCH_BRANCH_DURATION.labels(name).observe(elapsed)
+
+    futures = {name: asyncio.ensure_future(run_branch(name, coro)) for name, coro in branches.items()}
+
+    try:
+        done, pending = await asyncio.wait(futures.values(), return_when=asyncio.FIRST_EXCEPTION)
+    except asyncio.CancelledError:
+        # The request itself was cancelled, so cancel all branches
+        for future in futures.values():
+            future.cancel()
+        raise
+
+    if pending:
+        # A branch failed - cancel the remaining branches and wait for them to finish
+        for future in pending:
+            future.cancel()
+        await asyncio.wait(pending)
+
+    logger.debug(request.request_id, "Executed search branches", extra={
+        "timings": timings
+    })
+
+    # Raise the first exception (retrieving all exceptions to prevent 'exception never retrieved' warnings)
+    exceptions = [future.exception() for future in done if not future.cancelled() and future.exception() is not None]
+    if len(exceptions) > 0:
+        raise exceptions[0]
+
+    return {name: future.result() for name, future in futures.items()}
+
+
 class SanicSearchEngine(object):
 
     CONTENT = "content"
     TYPE_COUNTS = "counts"
     FEATURED = "featured"
 
+    # Type counts (which don't depend on page, size or sort order) as JSON, keyed by (search engine class, index,
+    # search term, type filters)
+    type_counts_cache = AsyncCache(create_cache("type_counts",
+                                                SEARCH_CONFIG.type_counts_cache_max_size,
+                                                ttl=SEARCH_CONFIG.type_counts_cache_ttl))
+
+    # Precompiled content, type counts and featured result queries, keyed by (query, search engine class, sort order,
+    # type filters, request parameters). Templates are compiled per process, so are always held in memory.
+    query_templates = create_cache("query_templates", SEARCH_CONFIG.query_template_cache_max_size,
+                                   backend=CacheBackendType.MEMORY)
+
     def __init__(self, app: SearchApp, search_engine_cls: ClassVar[AbstractSearchEngine], index: Index):
         """
         Helper class for working with abstract search engine instances
@@ -65,6 +150,90 @@ class SanicSearchEngine(object):
         """
         return self._search_engine_cls(using=self.app.elasticsearch.client, index=self.index.value)
 
+    def build_query(self, name: str, engine: AbstractSearchEngine, search_term: str,
+                    build_query: Callable[..., AbstractSearchEngine], template_key: Tuple, current_page: int=None,
+                    page_size: int=None, **kwargs) -> AbstractSearchEngine:
+        """
+        Builds a query by rendering a precompiled template of it or, if query templates are disabled, by calling
+        build_query. If stored search templates are enabled (and the template has been registered), the query
+        executes the stored template instead. Query build times are recorded by name and method.
+        :param name: Name of the query, used to label metrics and stored search templates
+        :param engine: Search engine used to execute the query
+        :param search_term:
+        :param build_query: Builds the query for a search term and additional arguments
+        :param template_key: Key of the query template (excluding the query name and search engine)
+        :param current_page: Page number, if the query is paginated
+        :param page_size: Page size, if the query is paginated
+        :param kwargs: Additional (conceptual search) arguments
+        :return:
+        """
+        start = perf_counter()
+
+        if not self.query_templates.enabled:
+            query: AbstractSearchEngine = build_query(search_term, **kwargs)
+            method = "build"
+        else:
+            template_kwargs, params = engine.query_template_kwargs(**kwargs)
+            key = (name, type(engine).__name__) + template_key + tuple(sorted(params))
+
+            template: QueryTemplate = self.query_templates.get(key)
+            if template is None:
+                template = QueryTemplate.build(build_query, **template_kwargs)
+                self.query_templates[key] = template
+
+            # Only send the request parameters used by the template
+            params = {name: params[name] for name in template.slot_names if name in params}
+
+            from_start = None
+            if page_size is not None:
+                engine.check_request_size(page_size)
+                from_start = engine.from_start(current_page, page_size)
+
+            stored_templates: StoredSearchTemplates = self.app.stored_search_templates
+            stored_template = None
+            if stored_templates is not None:
+                stored_template: StoredSearchTemplate = stored_templates.get(key, name, template)
+
+            if stored_template is not None:
+                template_params = stored_template.request_params(search_term, from_start=from_start, size=page_size,
+                                                                 **params)
+                query: AbstractSearchEngine = engine.with_template(stored_template.template_id, template_params,
+                                                                   **stored_template.params)
+                method = "stored_template"
+            else:
+                body = template.render(search_term, from_start=from_start, size=page_size, **params)
+                query: AbstractSearchEngine = engine.with_body(body, **template.params)
+                method = "template"
+
+        QUERY_BUILD_DURATION.labels(name, method).observe(perf_counter() - start)
+        return query
+
+    async def register_stored_search_templates(self):
+        """
+        Registers stored search templates for the default (first page, relevance sorted and unfiltered) content, type
+        counts and featured result queries, and waits for registration to complete. Templates for all other queries
+        are registered on first use.
+        :return:
+        """
+        stored_templates: StoredSearchTemplates = self.app.stored_search_templates
+        if stored_templates is None:
+            return
+
+        engine: AbstractSearchEngine = self.get_search_engine_instance()
+        type_filters: List[ContentType] = AvailableContentTypes.available_content_types()
+
+        kwargs = {}
+        if isinstance(engine, ConceptualSearchEngine):
+            # Only the number of labels (and not their values, or the search vector) affect the templates
+            kwargs['labels'] = [""] * FASTTEXT_CONFIG.num_labels
+            kwargs['search_vector'] = zeros(0)
+
+        self._build_content_query("", 1, SEARCH_CONFIG.results_per_page, SortField.relevance, type_filters, **kwargs)
+        self._build_type_counts_query("", type_filters, **kwargs)
+        self._build_featured_result_query("")
+
+        await stored_templates.wait()
+
     @timeit
     async def search(self, request: ONSRequest) -> Dict[str, dict]:
         """
@@ -72,11 +241,29 @@ class SanicSearchEngine(object):
         :param request:
         :return:
         """
+        if SEARCH_CONFIG.multi_search_enabled:
+            # Send all queries in a single _msearch request
+            responses: Dict[str, SearchResult] = await self.multi_search(request)
+
+            content_response: SearchResult = responses[self.CONTENT]
+            type_counts_response: SearchResult = responses[self.TYPE_COUNTS]
+            featured_result_response: SearchResult = responses[self.FEATURED]
+        elif SEARCH_CONFIG.concurrent_search_enabled:
+            # Fan out the individual queries
+            responses: Dict[str, SearchResult] = await gather(request, {
+                self.CONTENT: self.content_query(request),
+                self.TYPE_COUNTS: self.type_counts_query(request),
+                self.FEATURED: self.featured_result_query(request)
+            })
 
-        # Build the individual responses
-        content_response: SearchResult = await self.content_query(request)
-        type_counts_response: SearchResult = await self.type_counts_query(request)
-        featured_result_response: SearchResult = await self.featured_result_query(request)
+            content_response: SearchResult = responses[self.CONTENT]
+            type_counts_response: SearchResult = responses[self.TYPE_COUNTS]
+            featured_result_response: SearchResult = responses[self.FEATURED]
+        else:
+            # Build the individual responses
+            content_response: SearchResult = await self.content_query(request)
+            type_counts_response: SearchResult = await self.type_counts_query(request)
+            featured_result_response: SearchResult = await self.featured_result_query(request)
 
         # Add to result
         result_dict = {
@@ -88,6 +275,79 @@ class SanicSearchEngine(object):
         # Return
         return result_dict
 
+    @timeit
+    async def multi_search(self, request: ONSRequest) -> Dict[str, SearchResult]:
+        """
+        Executes the content, type counts and featured result queries in a single _msearch request
+        :param request:
+        :return:
+        """
+        engine: AbstractSearchEngine = self.get_search_engine_instance()
+
+        # Conceptual search params are shared by the content and type counts queries
+        kwargs = await self.conceptual_search_kwargs(request, engine)
+
+        content_engine: AbstractSearchEngine = self.build_content_query(request, **kwargs)
+
+        multi_search = MultiSearchClient(using=self.app.elasticsearch.client) \
+            .add(content_engine)
+
+        # Only query for type counts if they aren't cached
+        type_counts_key = self.type_counts_cache_key(request)
+        type_counts = self.type_counts_cache.cache.get(type_counts_key)
+        if type_counts is None:
+            multi_search.add(self.build_type_counts_query(request, **kwargs))
+
+        # Only query for a featured result if one is possible
+        featured_result_possible = await self.may_have_featured_result(request)
+        if featured_result_possible:
+            multi_search.add(self.build_featured_result_query(request))
+
+        logger.trace(request.request_id, "Executing multi search query", extra={
+            "query": multi_search.to_dict()
+        })
+        responses: List[ONSResponse] = await execute_multi_search(request, multi_search)
+        content_response = responses.pop(0)
+
+        if type_counts is None:
+            type_counts_result: TypeCountsQueryResult = responses.pop(0).to_type_counts_query_search_result()
+            self.type_counts_cache.cache[type_counts_key] = type_counts_result.to_dict()
+        else:
+            type_counts_result = TypeCountsQueryResult.from_dict(type_counts)
+
+        if featured_result_possible:
+            featured_result: SearchResult = responses.pop(0).to_featured_result_query_search_result()
+            self.record_featured_result(request, featured_result)
+        else:
+            featured_result: SearchResult = self.empty_featured_result()
+
+        page = request.get_current_page()
+        page_size = request.get_page_size()
+        sort_by: SortField = request.get_sort_by()
+
+        return {
+            self.CONTENT: content_response.to_content_query_search_result(page, page_size, sort_by),
+            self.TYPE_COUNTS: type_counts_result,
+            self.FEATURED: featured_result
+        }
+
+    async def conceptual_search_kwargs(self, request: ONSRequest, engine: AbstractSearchEngine) -> dict:
+        """
+        Returns the additional keyword arguments (labels and search vector) required to build conceptual search
+        queries, or an empty dict for all other search engines
+        :param request:
+        :param engine:
+        :return:
+        """
+        kwargs = {}
+        if isinstance(engine, ConceptualSearchEngine):
+            labels, search_vector = await engine.conceptual_search_params(request.get_search_term(),
+                                                                          FASTTEXT_CONFIG.num_labels,
+                                                                          FASTTEXT_CONFIG.threshold)
+            kwargs['labels'] = labels
+            kwargs['search_vector'] = search_vector
+        return kwargs
+
     @timeit
     async def departments_query(self, request: ONSRequest) -> SearchResult:
         """
@@ -114,17 +374,14 @@ class SanicSearchEngine(object):
 
         return search_result
 
-    @timeit
-    async def content_query(self, request: ONSRequest) -> SearchResult:
+    def build_content_query(self, request: ONSRequest, **kwargs) -> AbstractSearchEngine:
         """
-        Executes the ONS content query using the given SearchEngine class
+        Builds the ONS content query using the given SearchEngine class
         :param request:
+        :param kwargs: Additional (conceptual search) arguments
         :return:
         """
-        # Initialise the search engine
-        engine: AbstractSearchEngine = self.get_search_engine_instance()
-
-        # Perform the query
+        # Build the query
         search_term = request.get_search_term()
         page = request.get_current_page()
         page_size = request.get_page_size()
@@ -132,14 +389,6 @@ class SanicSearchEngine(object):
         type_filters: List[ContentType] = request.get_type_filters()
 
         try:
-            kwargs = {}
-            if isinstance(engine, ConceptualSearchEngine):
-                labels, search_vector = await engine.conceptual_search_params(search_term,
-                                                                              FASTTEXT_CONFIG.num_labels,
-                                                                              FASTTEXT_CONFIG.threshold)
-                kwargs['labels'] = labels
-                kwargs['search_vector'] = search_vector
-
             logger.debug(request.request_id, "Received content query request", extra={
                 "params": {
                     "search_term": search_term,
@@ -151,12 +400,8 @@ class SanicSearchEngine(object):
                 }
             })
 
-            # NB: We pass the same content types as both filters and filter boosts (type_filters and filter_functions,
-            # respectively).
-            engine: AbstractSearchEngine = engine.content_query(search_term, page, page_size, sort_by=sort_by,
-                                                                filter_functions=type_filters,
-                                                                type_filters=type_filters,
-                                                                **kwargs)
+            engine: AbstractSearchEngine = self._build_content_query(search_term, page, page_size, sort_by,
+                                                                     type_filters, **kwargs)
 
         except RequestSizeExceededException as e:
             # Log and raise a 400 BAD_REQUEST
@@ -164,38 +409,73 @@ class SanicSearchEngine(object):
             logger.error(request.request_id, message, exc_info=e)
             raise InvalidUsage(message)
 
+        return engine
+
+    def _build_content_query(self, search_term: str, page: int, page_size: int, sort_by: SortField,
+                             type_filters: List[ContentType], **kwargs) -> AbstractSearchEngine:
+        """
+        Builds the ONS content query for the given (parsed) request parameters
+        :param search_term:
+        :param page:
+        :param page_size:
+        :param sort_by:
+        :param type_filters:
+        :param kwargs: Additional (conceptual search) arguments
+        :return:
+        """
+        # Initialise the search engine
+        engine: AbstractSearchEngine = self.get_search_engine_instance()
+
+        # NB: We pass the same content types as both filters and filter boosts (type_filters and filter_functions,
+        # respectively).
+        def build_query(term: str, **build_kwargs) -> AbstractSearchEngine:
+            return engine.content_query(term, page, page_size, sort_by=sort_by,
+                                        filter_functions=type_filters,
+                                        type_filters=type_filters,
+                                        **build_kwargs)
+
+        template_key = (sort_by.name, tuple(content_type.name for content_type in type_filters))
+
+        return self.build_query(self.CONTENT, engine, search_term, build_query, template_key,
+                                current_page=page, page_size=page_size, **kwargs)
+
+    @timeit
+    async def content_query(self, request: ONSRequest, lazy: bool=False) -> SearchResult:
+        """
+        Executes the ONS content query using the given SearchEngine class
+        :param request:
+        :param lazy: If True, hits are transformed on demand (see ONSResponse.to_content_query_search_result)
+        :return:
+        """
+        page = request.get_current_page()
+        page_size = request.get_page_size()
+        sort_by: SortField = request.get_sort_by()
+
+        kwargs = await self.conceptual_search_kwargs(request, self.get_search_engine_instance())
+        engine: AbstractSearchEngine = self.build_content_query(request, **kwargs)
+
         logger.trace(request.request_id, "Executing content query", extra={
             "query": engine.to_dict()
         })
         response: ONSResponse = await execute(request, engine)
 
-        search_result: SearchResult = response.to_content_query_search_result(page, page_size, sort_by)
+        search_result: SearchResult = response.to_content_query_search_result(page, page_size, sort_by, lazy=lazy)
 
         return search_result
 
-    @timeit
-    async def type_counts_query(self, request: ONSRequest) -> SearchResult:
+    def build_type_counts_query(self, request: ONSRequest, **kwargs) -> AbstractSearchEngine:
         """
-        Executes the ONS type counts query using the given SearchEngine class
+        Builds the ONS type counts query using the given SearchEngine class
         :param request:
+        :param kwargs: Additional (conceptual search) arguments
         :return:
         """
-        engine: AbstractSearchEngine = self.get_search_engine_instance()
-
-        # Perform the query
+        # Build the query
         search_term = request.get_search_term()
         type_filters: List[ContentType] = request.get_type_filters()
 
         # Attempt to build the query
         try:
-            kwargs = {}
-            if isinstance(engine, ConceptualSearchEngine):
-                labels, search_vector = await engine.conceptual_search_params(search_term,
-                                                                              FASTTEXT_CONFIG.num_labels,
-                                                                              FASTTEXT_CONFIG.threshold)
-                kwargs['labels'] = labels
-                kwargs['search_vector'] = search_vector
-
             logger.debug(request.request_id, "Received type counts query request", extra={
                 "params": {
                     "search_term": search_term,
@@ -204,33 +484,76 @@ class SanicSearchEngine(object):
                 }
             })
 
-            engine: AbstractSearchEngine = engine.type_counts_query(search_term, type_filters=type_filters, **kwargs)
+            engine: AbstractSearchEngine = self._build_type_counts_query(search_term, type_filters, **kwargs)
         except RequestSizeExceededException as e:
             # Log and raise a 400 BAD_REQUEST
             message = "Requested page size exceeds max allowed: '{0}'".format(e)
             logger.error(request.request_id, message, exc_info=e)
             raise InvalidUsage(message)
 
-        # Execute
-        logger.trace(request.request_id, "Executing type counts query", extra={
-            "query": engine.to_dict()
-        })
-        response: ONSResponse = await execute(request, engine)
+        return engine
 
-        search_result: SearchResult = response.to_type_counts_query_search_result()
+    def _build_type_counts_query(self, search_term: str, type_filters: List[ContentType],
+                                 **kwargs) -> AbstractSearchEngine:
+        """
+        Builds the ONS type counts query for the given (parsed) request parameters
+        :param search_term:
+        :param type_filters:
+        :param kwargs: Additional (conceptual search) arguments
+        :return:
+        """
+        engine: AbstractSearchEngine = self.get_search_engine_instance()
 
-        return search_result
+        def build_query(term: str, **build_kwargs) -> AbstractSearchEngine:
+            return engine.type_counts_query(term, type_filters=type_filters, **build_kwargs)
+
+        template_key = (tuple(content_type.name for content_type in type_filters),)
+
+        return self.build_query(self.TYPE_COUNTS, engine, search_term, build_query, template_key, **kwargs)
+
+    def type_counts_cache_key(self, request: ONSRequest) -> Tuple:
+        """
+        Returns the type counts cache key for the given request. Type counts only depend on the search term and type
+        filters (and the search engine and index used), so are shared by all pages and sort orders.
+        :param request:
+        :return:
+        """
+        type_filters = tuple(sorted(content_type.name for content_type in request.get_type_filters()))
+        return self._search_engine_cls.__name__, self.index.value, request.get_search_term(), type_filters
 
     @timeit
-    async def featured_result_query(self, request: ONSRequest) -> SearchResult:
+    async def type_counts_query(self, request: ONSRequest) -> SearchResult:
         """
-        Executes the ONS featured result query using the default search engine class
+        Executes the ONS type counts query using the given SearchEngine class. Results are cached, so paging through
+        results for the same search term and filters only queries for type counts once.
         :param request:
         :return:
         """
-        engine: AbstractSearchEngine = SearchEngine(using=self.app.elasticsearch.client, index=self.index.value)
+        async def compute() -> dict:
+            kwargs = await self.conceptual_search_kwargs(request, self.get_search_engine_instance())
+            engine: AbstractSearchEngine = self.build_type_counts_query(request, **kwargs)
 
-        # Perform the query
+            # Execute
+            logger.trace(request.request_id, "Executing type counts query", extra={
+                "query": engine.to_dict()
+            })
+            response: ONSResponse = await execute(request, engine)
+
+            return response.to_type_counts_query_search_result().to_dict()
+
+        data = await self.type_counts_cache.get_or_compute(self.type_counts_cache_key(request), compute)
+
+        search_result: SearchResult = TypeCountsQueryResult.from_dict(data)
+
+        return search_result
+
+    def build_featured_result_query(self, request: ONSRequest) -> AbstractSearchEngine:
+        """
+        Builds the ONS featured result query using the default search engine class
+        :param request:
+        :return:
+        """
+        # Build the query
         search_term = request.get_search_term()
 
         logger.debug(request.request_id, "Received featured result query request", extra={
@@ -240,19 +563,78 @@ class SanicSearchEngine(object):
         })
 
         try:
-            engine: AbstractSearchEngine = engine.featured_result_query(search_term)
+            engine: AbstractSearchEngine = self._build_featured_result_query(search_term)
         except RequestSizeExceededException as e:
             # Log and raise a 400 BAD_REQUEST
             message = "Requested page size exceeds max allowed: '{0}'".format(e)
             logger.error(request.request_id, message, exc_info=e)
             raise InvalidUsage(message)
 
+        return engine
+
+    def _build_featured_result_query(self, search_term: str) -> AbstractSearchEngine:
+        """
+        Builds the ONS featured result query (using the default search engine class) for the given search term
+        :param search_term:
+        :return:
+        """
+        engine: AbstractSearchEngine = SearchEngine(using=self.app.elasticsearch.client, index=self.index.value)
+
+        def build_query(term: str) -> AbstractSearchEngine:
+            return engine.featured_result_query(term)
+
+        return self.build_query(self.FEATURED, engine, search_term, build_query, ())
+
+    async def may_have_featured_result(self, request: ONSRequest) -> bool:
+        """
+        Returns False if the featured result index (if enabled) rules out a featured result for the search term
+        :param request:
+        :return:
+        """
+        featured_result_index = self.app.featured_result_index
+        if featured_result_index is None or self.index is not Index.ONS:
+            return True
+        return await featured_result_index.may_have_featured_result(request.get_search_term())
+
+    def record_featured_result(self, request: ONSRequest, search_result: ContentQueryResult):
+        """
+        Records search terms which have no featured result in the featured result index (if enabled)
+        :param request:
+        :param search_result:
+        :return:
+        """
+        featured_result_index = self.app.featured_result_index
+        if featured_result_index is not None and self.index is Index.ONS and search_result.number_of_results == 0:
+            featured_result_index.record_no_featured_result(request.get_search_term())
+
+    @staticmethod
+    def empty_featured_result() -> SearchResult:
+        """
+        Returns the (empty) featured result for search terms which can't have a featured result
+        :return:
+        """
+        return ContentQueryResult(0, 0, [], Paginator(0, 1, result_per_page=1), SortField.relevance)
+
+    @timeit
+    async def featured_result_query(self, request: ONSRequest) -> SearchResult:
+        """
+        Executes the ONS featured result query using the default search engine class. The query is skipped if the
+        featured result index rules out a featured result.
+        :param request:
+        :return:
+        """
+        if not await self.may_have_featured_result(request):
+            return self.empty_featured_result()
+
+        engine: AbstractSearchEngine = self.build_featured_result_query(request)
+
         logger.trace(request.request_id, "Executing featured result query", extra={
             "query": engine.to_dict()
         })
         response: ONSResponse = await execute(request, engine)
 
         search_result: SearchResult = response.to_featured_result_query_search_result()
+        self.record_featured_result(request, search_result)
 
         return search_result
 
@@ -274,4 +656,3 @@ class SanicSearchEngine(object):
 
         search_result: SearchResult = response.to_single_search_result()
         return search_result
-
@@ -1,14 +1,18 @@
 """
 This file contains all routes for the /spellcheck API
 """
+import asyncio
+
 from sanic import Blueprint
 
 from dp4py_sanic.api.response.json_response import json
 
+from dp_conceptual_search.config import CONFIG
 from dp_conceptual_search.log import logger
 from dp_conceptual_search.api.request import ONSRequest
 from dp_conceptual_search.app.search_app import SearchApp
 from dp_conceptual_search.ml.spelling.spell_checker import SpellChecker
+from dp_conceptual_search.app.executor.bounded_executor import BoundedExecutor, ExecutorQueueFull
 
 spell_check_blueprint = Blueprint('spellcheck', url_prefix='/spellcheck')
 
@@ -25,12 +29,22 @@ async def spell_check(request: ONSRequest):
     # Get spell checker
     app: SearchApp = request.app
     spell_checker: SpellChecker = app.spell_checker
+    executor: BoundedExecutor = app.spell_check_executor
 
     # Generate the tokens
     tokens = search_term.split()
     if len(tokens) > 0:
-        # Get the result
-        result = spell_checker.correct_spelling(tokens)
+        # Get the result (off the event loop)
+        try:
+            result = await executor.run(spell_checker.correct_spelling, tokens, timeout=CONFIG.ML.spellcheck_timeout)
+        except ExecutorQueueFull:
+            message = "Too many pending spellcheck requests, unable to check query: %s" % search_term
+            logger.warning(request.request_id, message)
+            return json(request, message, 503)
+        except asyncio.TimeoutError:
+            message = "Spellcheck deadline exceeded for query: %s" % search_term
+            logger.warning(request.request_id, message)
+            return json(request, message, 503)
 
         # Return the json response
         return json(request, result, 200)
@@ -0,0 +1,87 @@
+"""
+Thread pool executor with a bounded queue and per-call deadlines, used to keep blocking (CPU bound) work off the event
+loop without letting a backlog of such work build up indefinitely.
+"""
+import asyncio
+import threading
+from typing import Callable
+from concurrent.futures import ThreadPoolExecutor, Future
+
+from dp_conceptual_search.log.metrics import EXECUTOR_REJECTIONS
+
+
+class ExecutorQueueFull(Exception):
+    """
+    Raised when a call is submitted to a BoundedExecutor which already has max_workers + max_queue_size calls
+    pending
+    """
+    pass
+
+
+class BoundedExecutor(object):
+    def __init__(self, name: str, max_workers: int, max_queue_size: int):
+        """
+        :param name: Name of the executor (used to name threads and label metrics)
+        :param max_workers: Number of worker threads
+        :param max_queue_size: Max number of calls waiting for a free worker
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+
+        # Number of submitted calls which haven't yet finished (running or queued). Calls which have timed out are
+        # still counted until their worker is done with them.
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _on_done(self, future: Future):
+        with self._lock:
+            self._pending -= 1
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """
+        Submits fn(*args) to the pool, raising ExecutorQueueFull if the queue is full
+        :param fn:
+        :param args:
+        :return:
+        """
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue_size:
+                EXECUTOR_REJECTIONS.labels(self.name, "queue_full").inc()
+                raise ExecutorQueueFull("Executor '{0}' has {1} pending calls".format(self.name, self._pending))
+            self._pending += 1
+
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._on_done)
+        return future
+
+    async def run(self, fn: Callable, *args, timeout: float=None):
+        """
+        Runs fn(*args) on the pool and awaits the result, raising asyncio.TimeoutError if this takes longer than
+        timeout seconds. Calls which time out before they start are cancelled.
+        :param fn:
+        :param args:
+        :param timeout:
+        :return:
+        """
+        future = asyncio.wrap_future(self.submit(fn, *args))
+
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            EXECUTOR_REJECTIONS.labels(self.name, "timeout").inc()
+            raise
+
+    def shutdown(self, wait: bool=True):
+        """
+        Shuts down the underlying thread pool
+        :param wait:
+        :return:
+        """
+        self._executor.shutdown(wait=wait)
@@ -1,15 +1,31 @@
 """
 This file defines our custom Sanic app class
 """
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
+
 from dp4py_sanic.app.server import Server
 
 from dp_conceptual_search.config import CONFIG
+from dp_conceptual_search.config.config import FASTTEXT_CONFIG
 
 from dp_conceptual_search.api.request.ons_request import ONSRequest
+from dp_conceptual_search.api.search.response_cache import ResponseCache
 from dp_conceptual_search.ml.spelling.spell_checker import SpellChecker
-from dp_conceptual_search.ml.word_embedding.fastText import UnsupervisedModel
+from dp_conceptual_search.ml.word_embedding.fastText import UnsupervisedModel, SupervisedModel
+from dp_conceptual_search.app.executor.bounded_executor import BoundedExecutor
+from dp_conceptual_search.ons.search.index import Index
+from dp_conceptual_search.ons.search.client.search_engine import SearchEngine
+from dp_conceptual_search.search.stored_search_template import StoredSearchTemplates
+from dp_conceptual_search.ons.search.featured_result_index import FeaturedResultIndex, FeaturedTerms
+from dp_conceptual_search.ons.recommend.client.recommend_search_engine import RecommendationSearchEngine
+from dp_conceptual_search.ons.recommend.client.recommendation_store import RecommendationStore, RecommendationKey
 from dp_conceptual_search.app.elasticsearch.elasticsearch_client_service import ElasticsearchClientService
+from dp_conceptual_search.ons.conceptual.client.local_fasttext_client import LocalFastTextClient
+from dp_conceptual_search.ons.conceptual.client.fasttext_client import (
+    FastTextClientService, FastTextClientPool, FastTextBackend
+)
 
 
 class SearchApp(Server):
@@ -20,12 +36,34 @@ class SearchApp(Server):
         # Attach an Elasticsearh client
         self._elasticsearch = None
 
+        # Attach a dp-fasttext connection pool
+        self._fasttext_pool = None
+
         # Initialise unsupervised model member (used for spell check API)
         self._unsupervised_model = None
         self._supervised_model = None
 
-        # Initialise spell check member
+        # Executor for in-process model inference
+        self._ml_executor = None
+
+        # Precomputed recommendations
+        self._recommendation_store = None
+
+        # Index of featured pages, used to skip featured result queries which can't match
+        self._featured_result_index = None
+
+        # Elasticsearch stored search templates (initialised with the Elasticsearch client)
+        self._stored_search_templates = None
+
+        # Cache of serialised search API responses
+        self._response_cache = ResponseCache.from_config(CONFIG.SEARCH.response_cache_endpoints,
+                                                         CONFIG.SEARCH.response_cache_max_size,
+                                                         CONFIG.SEARCH.response_cache_max_bytes,
+                                                         CONFIG.SEARCH.response_cache_ttl)
+
+        # Initialise spell check member, and the executor it runs on
         self._spell_checker = None
+        self._spell_check_executor = None
 
         @self.listener("after_server_start")
         async def init(app: SearchApp, loop):
@@ -48,21 +86,162 @@ class SearchApp(Server):
 
             logging.debug("Initialised Elasticsearch client", extra=elasticsearch_log_data)
 
+            # Register stored search templates in the background, if enabled
+            if CONFIG.SEARCH.stored_templates_enabled:
+                app._stored_search_templates = StoredSearchTemplates(app.elasticsearch.client,
+                                                                     CONFIG.SEARCH.query_template_cache_max_size)
+                asyncio.ensure_future(app._register_stored_search_templates())
+
+            # Start building the featured result index, if enabled
+            if CONFIG.SEARCH.featured_index_enabled:
+                app._initialise_featured_result_index()
+
+            # Open the dp-fasttext connection pool, if any requests are served by dp-fasttext
+            if FastTextClientService.remote_enabled():
+                await app._initialise_fasttext_pool()
+
+            # Start precomputing recommendations, if enabled
+            if CONFIG.API.recommended_search_enabled and CONFIG.RECOMMEND.precompute_enabled:
+                app._initialise_recommendation_store()
+
             # Now initialise the ML models essential to the APP
             self._initialise_unsupervised_model()
 
             # Initialise spell checker
             self._initialise_spell_checker()
 
+            # Initialise the in-process fastText client, if enabled
+            if FastTextBackend.LOCAL in (FastTextClientService.supervised_backend(),
+                                         FastTextClientService.unsupervised_backend()):
+                self._initialise_local_fasttext_client()
+
         @self.listener("after_server_stop")
         async def shutdown(app: SearchApp, loop):
             """
-            Trigger clean shutdown of ES client
+            Trigger clean shutdown of ES client and dp-fasttext connection pool
             :param app:
             :param loop:
             :return:
             """
+            if app._recommendation_store is not None:
+                await app._recommendation_store.stop()
+
+            if app._featured_result_index is not None:
+                await app._featured_result_index.stop()
+
             await app.elasticsearch.shutdown()
+            await app._shutdown_fasttext_pool()
+
+            if app._ml_executor is not None:
+                FastTextClientService.set_local_client(None)
+                app._ml_executor.shutdown(wait=False)
+
+            if app._spell_check_executor is not None:
+                app._spell_check_executor.shutdown(wait=False)
+
+    async def _initialise_fasttext_pool(self):
+        """
+        Opens the app-scoped pool of keep-alive dp-fasttext clients
+        :return:
+        """
+        self._fasttext_pool = FastTextClientPool(FASTTEXT_CONFIG.fasttext_host,
+                                                 FASTTEXT_CONFIG.fasttext_port,
+                                                 FASTTEXT_CONFIG.pool_size,
+                                                 FASTTEXT_CONFIG.timeout)
+        await self._fasttext_pool.open()
+
+        FastTextClientService.set_pool(self._fasttext_pool)
+
+        logging.debug("Initialised dp-fasttext connection pool", extra={
+            "data": {
+                "fasttext.host": FASTTEXT_CONFIG.fasttext_host,
+                "fasttext.port": FASTTEXT_CONFIG.fasttext_port,
+                "fasttext.pool_size": FASTTEXT_CONFIG.pool_size,
+                "fasttext.timeout": FASTTEXT_CONFIG.timeout
+            }
+        })
+
+    async def _shutdown_fasttext_pool(self):
+        """
+        Closes the dp-fasttext connection pool
+        :return:
+        """
+        if self._fasttext_pool is not None:
+            logging.info("Closing dp-fasttext connection pool")
+            FastTextClientService.set_pool(None)
+            await self._fasttext_pool.close()
+            self._fasttext_pool = None
+
+    def _initialise_recommendation_store(self):
+        """
+        Initialises the store of precomputed recommendations and starts its background refresh task
+        :return:
+        """
+        async def compute(key: RecommendationKey) -> dict:
+            engine = RecommendationSearchEngine(using=self.elasticsearch.client, index=Index.ONS.value)
+            return await engine.recommend(key.uri, key.num_labels, 1, key.page_size, sort_by=key.sort_by)
+
+        self._recommendation_store = RecommendationStore(compute,
+                                                         CONFIG.RECOMMEND.precompute_max_size,
+                                                         CONFIG.RECOMMEND.precompute_ttl,
+                                                         CONFIG.RECOMMEND.precompute_refresh_interval,
+                                                         CONFIG.RECOMMEND.precompute_refresh_concurrency)
+        self._recommendation_store.start()
+
+        logging.debug("Initialised recommendation store", extra={
+            "recommend": {
+                "max_size": CONFIG.RECOMMEND.precompute_max_size,
+                "ttl": CONFIG.RECOMMEND.precompute_ttl,
+                "refresh_interval": CONFIG.RECOMMEND.precompute_refresh_interval
+            }
+        })
+
+    def _initialise_featured_result_index(self):
+        """
+        Initialises the featured result index and starts its background refresh task
+        :return:
+        """
+        featured_terms = FeaturedTerms(self.elasticsearch.client, Index.ONS.value,
+                                       CONFIG.SEARCH.featured_index_max_pages)
+
+        self._featured_result_index = FeaturedResultIndex(featured_terms.load,
+                                                          featured_terms.analyze,
+                                                          CONFIG.SEARCH.featured_index_refresh_interval,
+                                                          CONFIG.SEARCH.featured_negative_cache_max_size,
+                                                          CONFIG.SEARCH.featured_negative_cache_ttl)
+        self._featured_result_index.start()
+
+        logging.debug("Initialised featured result index", extra={
+            "featured": {
+                "max_pages": CONFIG.SEARCH.featured_index_max_pages,
+                "refresh_interval": CONFIG.SEARCH.featured_index_refresh_interval
+            }
+        })
+
+    async def _register_stored_search_templates(self):
+        """
+        Registers stored search templates for the default ONS (and, if enabled, conceptual search) queries
+        :return:
+        """
+        # Imported here, as the Sanic search engine depends on the app
+        from dp_conceptual_search.api.search.sanic_search_engine import SanicSearchEngine
+        from dp_conceptual_search.ons.conceptual.client import ConceptualSearchEngine
+
+        search_engine_classes = [SearchEngine]
+        if CONFIG.API.conceptual_search_enabled:
+            search_engine_classes.append(ConceptualSearchEngine)
+
+        for search_engine_cls in search_engine_classes:
+            try:
+                await SanicSearchEngine(self, search_engine_cls, Index.ONS).register_stored_search_templates()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error("Caught exception registering stored search templates", exc_info=e, extra={
+                    "search_engine": search_engine_cls.__name__
+                })
+
+        logging.debug("Registered stored search templates")
 
     def _initialise_unsupervised_model(self):
         """
@@ -76,7 +255,8 @@ class SearchApp(Server):
         })
 
         try:
-            self._unsupervised_model = UnsupervisedModel(CONFIG.ML.unsupervised_model_filename)
+            self._unsupervised_model = UnsupervisedModel(CONFIG.ML.unsupervised_model_filename,
+                                                         mmap=CONFIG.ML.unsupervised_model_mmap)
         except Exception as e:
             logging.error("Error initialising unsupervised model", exc_info=e)
             raise SystemExit()
@@ -87,6 +267,75 @@ class SearchApp(Server):
             }
         })
 
+        if CONFIG.ML.unsupervised_ann_enabled:
+            try:
+                self._unsupervised_model.init_ann_index(num_lists=CONFIG.ML.unsupervised_ann_num_lists,
+                                                        n_probe=CONFIG.ML.unsupervised_ann_n_probe)
+            except Exception as e:
+                # Fall back to exact similarity search
+                self._unsupervised_model.ann_index = None
+                logging.error("Error initialising approximate nearest-neighbour index, using exact search",
+                              exc_info=e)
+                return
+
+            logging.debug("Initialised approximate nearest-neighbour index", extra={
+                "index": {
+                    "num_lists": self._unsupervised_model.ann_index.num_lists,
+                    "n_probe": self._unsupervised_model.ann_index.n_probe
+                }
+            })
+
+    def _initialise_supervised_model(self):
+        """
+        Initialises the supervised fastText model
+        :return:
+        """
+        logging.debug("Initialising supervised fastText model", extra={
+            "model": {
+                "filename": CONFIG.ML.supervised_model_filename
+            }
+        })
+
+        try:
+            self._supervised_model = SupervisedModel(CONFIG.ML.supervised_model_filename)
+        except Exception as e:
+            logging.error("Error initialising supervised model", exc_info=e)
+            raise SystemExit()
+
+        logging.debug("Successfully initialised supervised fastText model", extra={
+            "model": {
+                "filename": CONFIG.ML.supervised_model_filename
+            }
+        })
+
+    def _initialise_local_fasttext_client(self):
+        """
+        Initialises the in-process client used in place of dp-fasttext for the local supervised and/or unsupervised
+        backends
+        :return:
+        """
+        supervised_model = None
+        if FastTextClientService.supervised_backend() is FastTextBackend.LOCAL:
+            self._initialise_supervised_model()
+            supervised_model = self._supervised_model
+
+        unsupervised_model = None
+        if FastTextClientService.unsupervised_backend() is FastTextBackend.LOCAL:
+            unsupervised_model = self._unsupervised_model
+
+        self._ml_executor = ThreadPoolExecutor(max_workers=CONFIG.ML.inference_workers)
+        FastTextClientService.set_local_client(LocalFastTextClient(self._ml_executor,
+                                                                   supervised_model=supervised_model,
+                                                                   unsupervised_model=unsupervised_model))
+
+        logging.debug("Initialised in-process fastText client", extra={
+            "fasttext": {
+                "supervised_backend": str(FastTextClientService.supervised_backend()),
+                "unsupervised_backend": str(FastTextClientService.unsupervised_backend()),
+                "inference_workers": CONFIG.ML.inference_workers
+            }
+        })
+
     def _initialise_spell_checker(self):
         """
         Initialises the SpellChecker using the unsupervised fastText model
@@ -99,11 +348,23 @@ class SearchApp(Server):
                 }
             })
 
-            self._spell_checker = SpellChecker(self._unsupervised_model)
+            self._spell_checker = SpellChecker(self._unsupervised_model, CONFIG.ML.spellcheck_cache_max_size,
+                                               max_words=CONFIG.ML.spellcheck_max_words,
+                                               prefix_length=CONFIG.ML.spellcheck_prefix_length)
+            self._spell_check_executor = BoundedExecutor("spellcheck",
+                                                         CONFIG.ML.spellcheck_workers,
+                                                         CONFIG.ML.spellcheck_max_queue_size)
 
             logging.debug("Successfully initialised SpellChecker", extra={
                 "model": {
                     "filename": self._unsupervised_model.filename
+                },
+                "executor": {
+                    "workers": CONFIG.ML.spellcheck_workers,
+                    "max_queue_size": CONFIG.ML.spellcheck_max_queue_size
+                },
+                "cache": {
+                    "max_size": CONFIG.ML.spellcheck_cache_max_size
                 }
             })
         else:
@@ -118,6 +379,57 @@ class SearchApp(Server):
         """
         return self._elasticsearch
 
+    @property
+    def fasttext_pool(self) -> FastTextClientPool:
+        """
+        Returns the dp-fasttext connection pool
+        :return:
+        """
+        return self._fasttext_pool
+
+    @property
+    def recommendation_store(self) -> RecommendationStore:
+        """
+        Returns the store of precomputed recommendations (None if disabled)
+        :return:
+        """
+        return self._recommendation_store
+
+    def invalidate_recommendations(self, uri: str):
+        """
+        Removes cached embedding vectors, keywords and precomputed recommendations for the given uri, so that
+        recommendations for a republished page are recomputed
+        :param uri:
+        :return:
+        """
+        RecommendationSearchEngine.invalidate_uri(uri)
+        if self._recommendation_store is not None:
+            self._recommendation_store.invalidate_uri(uri)
+
+    @property
+    def featured_result_index(self) -> FeaturedResultIndex:
+        """
+        Returns the featured result index (None if disabled)
+        :return:
+        """
+        return self._featured_result_index
+
+    @property
+    def stored_search_templates(self) -> StoredSearchTemplates:
+        """
+        Returns the registry of Elasticsearch stored search templates (None if disabled)
+        :return:
+        """
+        return self._stored_search_templates
+
+    @property
+    def response_cache(self) -> ResponseCache:
+        """
+        Returns the cache of serialised search API responses
+        :return:
+        """
+        return self._response_cache
+
     @property
     def spell_checker(self) -> SpellChecker:
         """
@@ -126,9 +438,24 @@ class SearchApp(Server):
         """
         return self._spell_checker
 
+    @property
+    def spell_check_executor(self) -> BoundedExecutor:
+        """
+        Returns the (bounded) executor used to run the spell checker
+        :return:
+        """
+        return self._spell_check_executor
+
     def get_unsupervised_model(self) -> UnsupervisedModel:
         """
         Returns the cached unsupervised model
         :return:
         """
         return self._unsupervised_model
+
+    def get_supervised_model(self) -> SupervisedModel:
+        """
+        Returns the cached supervised model (only loaded when using the local supervised backend)
+        :return:
+        """
+        return self._supervised_model
@@ -0,0 +1,5 @@
+from dp_conceptual_search.cache.cache_backend import CacheBackend, CacheBackendType
+from dp_conceptual_search.cache.lru_cache import LRUCache
+from dp_conceptual_search.cache.shared_cache import SharedCache
+from dp_conceptual_search.cache.async_cache import AsyncCache
+from dp_conceptual_search.cache.cache_factory import create_cache
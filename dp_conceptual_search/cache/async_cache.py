@@ -0,0 +1,96 @@
+"""
+Async wrapper around a CacheBackend which coalesces concurrent lookups for the same key
+"""
+import asyncio
+from typing import Callable, Awaitable
+
+from dp_conceptual_search.cache.cache_backend import CacheBackend
+
+
+class AsyncCache(object):
+    """
+    Caches the results of coroutines. Concurrent lookups for a key which is not yet cached share a single in-flight
+    computation, so a burst of identical requests results in only one upstream call.
+    """
+    def __init__(self, cache: CacheBackend):
+        self.cache = cache
+
+        # Futures for computations which are currently in flight
+        self._in_flight = {}
+
+    @property
+    def name(self) -> str:
+        return self.cache.name
+
+    async def get_or_compute(self, key, compute: Callable[[], Awaitable]):
+        """
+        Returns the cached value for key, or awaits compute() to produce (and cache) it. Exceptions raised by
+        compute() are propagated to all waiters and are not cached.
+        :param key:
+        :param compute: Callable which returns an awaitable producing the value to be cached
+        :return:
+        """
+        try:
+            return self.cache[key]
+        except KeyError:
+            pass
+
+        future: asyncio.Future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._compute(key, compute))
+            self._in_flight[key] = future
+
+        # Shield the shared computation so that a cancelled waiter does not cancel it for everyone else
+        return await asyncio.shield(future)
+
+    async def _compute(self, key, compute: Callable[[], Awaitable]):
+        """
+        Computes and caches the value for key
+        :param key:
+        :param compute:
+        :return:
+        """
+        try:
+            value = await compute()
+            self.cache[key] = value
+            return value
+        finally:
+            self._in_flight.pop(key, None)
+
+    def invalidate(self, key):
+        """
+        Removes key from the cache, if present
+        :param key:
+        :return:
+        """
+        try:
+            del self.cache[key]
+        except KeyError:
+            pass
+
+    def invalidate_matching(self, predicate: Callable[..., bool]):
+        """
+        Removes all keys for which predicate(key) is True
+        :param predicate:
+        :return:
+        """
+        for key in self.cache.keys():
+            if predicate(key):
+                self.invalidate(key)
+
+    def clear(self):
+        """
+        Removes all entries from the cache
+        :return:
+        """
+        self.cache.clear()
+
+    def stats(self) -> dict:
+        """
+        Returns cache statistics, including the number of in-flight computations
+        :return:
+        """
+        return {
+            **self.cache.stats(),
+            "in_flight": len(self._in_flight)
+        }
@@ -0,0 +1,74 @@
+"""
+Interface implemented by cache backends
+"""
+from enum import Enum
+from abc import ABC, abstractmethod
+
+
+class CacheBackendType(Enum):
+    MEMORY = "memory"  # In-process LRU cache (per worker)
+    SHARED = "shared"  # SQLite database (on shared memory), shared by all workers on a node
+
+    def __str__(self):
+        return self.value
+
+
+class CacheBackend(ABC):
+    """
+    Bounded key/value cache. Lookups of missing or expired keys raise a KeyError.
+    """
+    def __init__(self, name: str, max_size: int):
+        """
+        :param name: Name used to label cache metrics
+        :param max_size: Maximum number of entries. A max_size of zero disables caching.
+        """
+        self.name = name
+        self.max_size = max_size
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    @abstractmethod
+    def __getitem__(self, key):
+        pass
+
+    @abstractmethod
+    def __setitem__(self, key, value):
+        pass
+
+    @abstractmethod
+    def __delitem__(self, key):
+        pass
+
+    @abstractmethod
+    def __contains__(self, key) -> bool:
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    @abstractmethod
+    def keys(self) -> list:
+        pass
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+    @abstractmethod
+    def stats(self) -> dict:
+        pass
+
+    def get(self, key, default=None):
+        """
+        Returns the cached value for key, or default if the key is missing or has expired
+        :param key:
+        :param default:
+        :return:
+        """
+        try:
+            return self[key]
+        except KeyError:
+            return default
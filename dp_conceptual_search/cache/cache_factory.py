@@ -0,0 +1,34 @@
+"""
+Creates caches using the configured backend
+"""
+from typing import Any, Callable
+
+from dp_conceptual_search.config.config import CACHE_CONFIG
+from dp_conceptual_search.cache.lru_cache import LRUCache
+from dp_conceptual_search.cache.shared_cache import SharedCache
+from dp_conceptual_search.cache.cache_backend import CacheBackend, CacheBackendType
+
+
+def cache_backend_type() -> CacheBackendType:
+    return CacheBackendType(CACHE_CONFIG.backend)
+
+
+def create_cache(name: str, max_size: int, ttl: float=None, max_weight: int=None,
+                 weigher: Callable[[Any], int]=None, backend: CacheBackendType=None) -> CacheBackend:
+    """
+    Creates a cache using the given backend (defaults to the configured CACHE_BACKEND)
+    :param name: Name used to label cache metrics
+    :param max_size: Maximum number of entries. A max_size of zero disables caching.
+    :param ttl: Time-to-live of each entry in seconds (None for no expiry)
+    :param max_weight: Maximum total weight of all entries (None for no limit)
+    :param weigher: Callable which returns the weight of a value (required if max_weight is set)
+    :param backend:
+    :return:
+    """
+    if backend is None:
+        backend = cache_backend_type()
+
+    if backend is CacheBackendType.SHARED:
+        return SharedCache(name, max_size, CACHE_CONFIG.shared_path, ttl=ttl, max_weight=max_weight, weigher=weigher,
+                           timeout=CACHE_CONFIG.shared_timeout)
+    return LRUCache(name, max_size, ttl=ttl, max_weight=max_weight, weigher=weigher)
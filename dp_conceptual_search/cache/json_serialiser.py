@@ -0,0 +1,75 @@
+"""
+JSON serialisation of cache keys and values, used by the shared cache so that reading an entry never executes code.
+Supports JSON types plus tuples, bytes and numpy arrays (decoded as read-only arrays, as cached values are shared).
+"""
+import json
+from base64 import b64encode, b64decode
+from typing import Any
+
+from numpy import ndarray, generic, frombuffer
+
+TUPLE_TAG = "__tuple__"
+BYTES_TAG = "__bytes__"
+NDARRAY_TAG = "__ndarray__"
+
+
+def _encode(value: Any) -> Any:
+    """
+    Converts a value into JSON types, tagging tuples, bytes and numpy arrays
+    :param value:
+    :return:
+    """
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, tuple):
+        return {TUPLE_TAG: [_encode(item) for item in value]}
+    if isinstance(value, list):
+        return [_encode(item) for item in value]
+    if isinstance(value, dict):
+        if not all(isinstance(key, str) for key in value):
+            raise TypeError("Only dicts with str keys can be serialised, got {0}".format(list(value.keys())))
+        return {key: _encode(item) for key, item in value.items()}
+    if isinstance(value, bytes):
+        return {BYTES_TAG: b64encode(value).decode("ascii")}
+    if isinstance(value, ndarray):
+        return {
+            NDARRAY_TAG: b64encode(value.tobytes()).decode("ascii"),
+            "dtype": value.dtype.str,
+            "shape": list(value.shape)
+        }
+    if isinstance(value, generic):
+        return value.item()
+    raise TypeError("Unable to serialise value of type {0}".format(type(value).__name__))
+
+
+def _decode(obj: dict) -> Any:
+    """
+    Restores tagged tuples, bytes and numpy arrays (used as a json object_hook)
+    :param obj:
+    :return:
+    """
+    if TUPLE_TAG in obj and len(obj) == 1:
+        return tuple(obj[TUPLE_TAG])
+    if BYTES_TAG in obj and len(obj) == 1:
+        return b64decode(obj[BYTES_TAG])
+    if NDARRAY_TAG in obj and len(obj) == 3:
+        return frombuffer(b64decode(obj[NDARRAY_TAG]), dtype=obj["dtype"]).reshape(obj["shape"])
+    return obj
+
+
+def dumps(value: Any) -> str:
+    """
+    Serialises a value to JSON, raising a TypeError if it holds unsupported types
+    :param value:
+    :return:
+    """
+    return json.dumps(_encode(value), separators=(",", ":"))
+
+
+def loads(data: str) -> Any:
+    """
+    Deserialises a value from JSON
+    :param data:
+    :return:
+    """
+    return json.loads(data, object_hook=_decode)
@@ -0,0 +1,160 @@
+"""
+Bounded, thread-safe LRU cache with optional time-to-live (TTL) eviction
+"""
+from time import monotonic
+from typing import Any, Callable
+from threading import RLock
+from collections import OrderedDict
+
+from dp_conceptual_search.cache.cache_backend import CacheBackend
+
+from dp_conceptual_search.log.metrics import CACHE_HITS, CACHE_MISSES, CACHE_EVICTIONS, CACHE_SIZE, CACHE_WEIGHT
+
+
+class LRUCache(CacheBackend):
+    """
+    Holds at most max_size entries, evicting the least recently used entry when full. Entries older than ttl seconds
+    are treated as missing and evicted on access. Hit, miss and eviction counts are recorded per cache name.
+    If a weigher is given, the total weight (e.g size in bytes) of all entries is also bounded by max_weight.
+    """
+    def __init__(self, name: str, max_size: int, ttl: float=None, max_weight: int=None,
+                 weigher: Callable[[Any], int]=None):
+        """
+        Initialise the cache
+        :param name: Name used to label cache metrics
+        :param max_size: Maximum number of entries. A max_size of zero disables caching.
+        :param ttl: Time-to-live of each entry in seconds (None for no expiry)
+        :param max_weight: Maximum total weight of all entries (None for no limit)
+        :param weigher: Callable which returns the weight of a value (required if max_weight is set)
+        """
+        if max_weight is not None and weigher is None:
+            raise ValueError("A weigher is required to bound the total weight of the cache")
+
+        super(LRUCache, self).__init__(name, max_size)
+        self.ttl = ttl
+        self.max_weight = max_weight
+        self.weigher = weigher
+
+        # Total weight of all entries
+        self.weight = 0
+
+        self._data = OrderedDict()
+        self._lock = RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _expired(self, timestamp: float) -> bool:
+        return self.ttl is not None and monotonic() - timestamp > self.ttl
+
+    def _record_size(self):
+        CACHE_SIZE.labels(self.name).set(len(self._data))
+        if self.weigher is not None:
+            CACHE_WEIGHT.labels(self.name).set(self.weight)
+
+    def _remove(self, key):
+        _, _, weight = self._data.pop(key)
+        self.weight -= weight
+
+    def _evict(self, key):
+        self._remove(key)
+        self.evictions += 1
+        CACHE_EVICTIONS.labels(self.name).inc()
+
+    def __getitem__(self, key):
+        """
+        Returns the cached value for key, raising a KeyError if the key is missing or has expired
+        :param key:
+        :return:
+        """
+        with self._lock:
+            if key in self._data:
+                timestamp, value, _ = self._data[key]
+                if not self._expired(timestamp):
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    CACHE_HITS.labels(self.name).inc()
+                    return value
+
+                # Expired
+                self._evict(key)
+                self._record_size()
+
+            self.misses += 1
+            CACHE_MISSES.labels(self.name).inc()
+            raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        """
+        Caches value under key, evicting the least recently used entries if the cache is full. Values which are
+        heavier than max_weight on their own are not cached.
+        :param key:
+        :param value:
+        :return:
+        """
+        if not self.enabled:
+            return
+
+        weight = self.weigher(value) if self.weigher is not None else 0
+        if self.max_weight is not None and weight > self.max_weight:
+            return
+
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+            self._data[key] = (monotonic(), value, weight)
+            self.weight += weight
+
+            while len(self._data) > self.max_size or (self.max_weight is not None and self.weight > self.max_weight):
+                oldest_key = next(iter(self._data))
+                self._evict(oldest_key)
+
+            self._record_size()
+
+    def __delitem__(self, key):
+        with self._lock:
+            self._remove(key)
+            self._record_size()
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._data and not self._expired(self._data[key][0])
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def keys(self) -> list:
+        """
+        Returns a snapshot of the cached keys (including any which have expired but not yet been evicted)
+        :return:
+        """
+        with self._lock:
+            return list(self._data.keys())
+
+    def clear(self):
+        """
+        Removes all entries from the cache
+        :return:
+        """
+        with self._lock:
+            self._data.clear()
+            self.weight = 0
+            self._record_size()
+
+    def stats(self) -> dict:
+        """
+        Returns the size and hit, miss and eviction counts of the cache
+        :return:
+        """
+        return {
+            "name": self.name,
+            "size": len(self),
+            "max_size": self.max_size,
+            "weight": self.weight,
+            "max_weight": self.max_weight,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
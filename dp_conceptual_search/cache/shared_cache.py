@@ -0,0 +1,342 @@
+"""
+Bounded LRU cache backed by a SQLite database, so that it can be shared by all worker processes on a node. By default
+the database lives on shared memory (/dev/shm), so lookups never touch disk.
+"""
+import os
+import logging
+import sqlite3
+from time import time
+from threading import RLock
+from typing import Any, Callable, Optional, Tuple
+
+from dp_conceptual_search.cache.cache_backend import CacheBackend
+from dp_conceptual_search.cache.json_serialiser import dumps, loads
+from dp_conceptual_search.log.metrics import CACHE_HITS, CACHE_MISSES, CACHE_EVICTIONS, CACHE_ERRORS, CACHE_SIZE, \
+    CACHE_WEIGHT
+
+# Entries of all shared caches are held in one table, keyed by cache name and (JSON serialised) key. The size and
+# total weight of each cache are maintained by triggers, so that bounding the cache doesn't need to scan its entries.
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS entries ("
+    "cache TEXT NOT NULL, "
+    "key TEXT NOT NULL, "
+    "value TEXT NOT NULL, "
+    "weight INTEGER NOT NULL, "
+    "created REAL NOT NULL, "
+    "accessed REAL NOT NULL, "
+    "PRIMARY KEY (cache, key))",
+    "CREATE INDEX IF NOT EXISTS entries_accessed ON entries (cache, accessed)",
+    "CREATE TABLE IF NOT EXISTS totals ("
+    "cache TEXT PRIMARY KEY, "
+    "size INTEGER NOT NULL, "
+    "weight INTEGER NOT NULL)",
+    "CREATE TRIGGER IF NOT EXISTS entries_inserted AFTER INSERT ON entries BEGIN "
+    "UPDATE totals SET size = size + 1, weight = weight + NEW.weight WHERE cache = NEW.cache; END",
+    "CREATE TRIGGER IF NOT EXISTS entries_deleted AFTER DELETE ON entries BEGIN "
+    "UPDATE totals SET size = size - 1, weight = weight - OLD.weight WHERE cache = OLD.cache; END"
+]
+
+# Errors (i.e the database being locked by another worker, or a key or value which can't be serialised) which are
+# treated as a cache miss or skipped write
+CACHE_ERROR_TYPES = (sqlite3.Error, OSError, ValueError, TypeError)
+
+
+def create_private_file(path: str):
+    """
+    Creates (if required) the file at path, readable and writable only by the current user, in a directory private to
+    the current user. Raises a PermissionError if the directory is accessible to other users.
+    :param path:
+    :return:
+    """
+    dirname = os.path.dirname(os.path.abspath(path))
+    os.makedirs(dirname, mode=0o700, exist_ok=True)
+
+    stat = os.stat(dirname)
+    if stat.st_uid != os.getuid() or stat.st_mode & 0o077:
+        raise PermissionError("Shared cache directory '{0}' must only be accessible to the current user"
+                              .format(dirname))
+
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        os.fchmod(fd, 0o600)
+    finally:
+        os.close(fd)
+
+
+class SharedCache(CacheBackend):
+    """
+    Holds at most max_size entries (and, if a weigher is given, at most max_weight total weight), evicting the least
+    recently used entries when full. Entries older than ttl seconds are treated as missing and evicted on access.
+    Keys and values are serialised as JSON (see json_serialiser), and the database is created in a directory private
+    to the current user. Each process opens its own connection, so instances may be created before workers are forked.
+
+    Access times are only updated when older than ACCESS_RESOLUTION seconds, so repeated lookups of hot entries don't
+    take the database write lock. Errors (i.e the database being locked by another worker for longer than timeout)
+    are logged, and treated as a cache miss or a skipped write.
+    """
+    ACCESS_RESOLUTION = 1.0
+
+    def __init__(self, name: str, max_size: int, path: str, ttl: float=None, max_weight: int=None,
+                 weigher: Callable[[Any], int]=None, timeout: float=1.0):
+        """
+        Initialise the cache
+        :param name: Name used to label cache metrics, and to identify entries in the database
+        :param max_size: Maximum number of entries. A max_size of zero disables caching.
+        :param path: Path of the SQLite database
+        :param ttl: Time-to-live of each entry in seconds (None for no expiry)
+        :param max_weight: Maximum total weight of all entries (None for no limit)
+        :param weigher: Callable which returns the weight of a value (required if max_weight is set)
+        :param timeout: Time (in seconds) to wait for a lock held by another process
+        """
+        if max_weight is not None and weigher is None:
+            raise ValueError("A weigher is required to bound the total weight of the cache")
+
+        super(SharedCache, self).__init__(name, max_size)
+        self.path = path
+        self.ttl = ttl
+        self.max_weight = max_weight
+        self.weigher = weigher
+        self.timeout = timeout
+
+        self._lock = RLock()
+        self._connection: sqlite3.Connection = None
+        self._pid: int = None
+
+        # Counts are per process - the shared totals are the sum across processes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """
+        Returns this process' connection to the database, opening it (and creating the schema) if required
+        :return:
+        """
+        if self._connection is None or self._pid != os.getpid():
+            create_private_file(self.path)
+
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None,
+                                         check_same_thread=False)
+            try:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=OFF")
+                # Fire the delete trigger for entries replaced by INSERT OR REPLACE
+                connection.execute("PRAGMA recursive_triggers=ON")
+                for statement in SCHEMA:
+                    connection.execute(statement)
+                connection.execute("INSERT OR IGNORE INTO totals VALUES (?, 0, 0)", (self.name,))
+            except sqlite3.Error:
+                connection.close()
+                raise
+
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def close(self):
+        """
+        Closes this process' connection to the database
+        :return:
+        """
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl is not None and time() - created > self.ttl
+
+    def _execute(self, sql: str, *params) -> sqlite3.Cursor:
+        return self.connection.execute(sql, params)
+
+    def _error(self, e: Exception):
+        self.errors += 1
+        CACHE_ERRORS.labels(self.name).inc()
+        logging.warning("Caught exception accessing shared cache", exc_info=e, extra={
+            "cache": {
+                "name": self.name,
+                "path": self.path
+            }
+        })
+
+    def _record_size(self):
+        size, weight = self._totals()
+        CACHE_SIZE.labels(self.name).set(size)
+        if self.weigher is not None:
+            CACHE_WEIGHT.labels(self.name).set(weight)
+
+    def _totals(self) -> Tuple[int, int]:
+        row = self._execute("SELECT size, weight FROM totals WHERE cache = ?", self.name).fetchone()
+        return (int(row[0]), int(row[1])) if row is not None else (0, 0)
+
+    def _evict(self, key: str):
+        self._execute("DELETE FROM entries WHERE cache = ? AND key = ?", self.name, key)
+        self.evictions += 1
+        CACHE_EVICTIONS.labels(self.name).inc()
+
+    def _evict_lru(self):
+        """
+        Evicts the least recently used entries, in batches, until the cache is within its bounds
+        :return:
+        """
+        size, weight = self._totals()
+        while size > self.max_size or (self.max_weight is not None and weight > self.max_weight):
+            cursor = self._execute("DELETE FROM entries WHERE rowid IN "
+                                   "(SELECT rowid FROM entries WHERE cache = ? ORDER BY accessed LIMIT ?)",
+                                   self.name, max(size - self.max_size, 1))
+            if cursor.rowcount <= 0:
+                break
+
+            self.evictions += cursor.rowcount
+            CACHE_EVICTIONS.labels(self.name).inc(cursor.rowcount)
+            size, weight = self._totals()
+
+    def _lookup(self, key) -> Optional[Tuple[str, str, float, float]]:
+        sql_key = dumps(key)
+        row = self._execute("SELECT value, created, accessed FROM entries WHERE cache = ? AND key = ?",
+                            self.name, sql_key).fetchone()
+        if row is None:
+            return None
+        return sql_key, row[0], row[1], row[2]
+
+    def __getitem__(self, key):
+        """
+        Returns the cached value for key, raising a KeyError if the key is missing or has expired
+        :param key:
+        :return:
+        """
+        with self._lock:
+            try:
+                entry = self._lookup(key)
+                if entry is not None:
+                    sql_key, value, created, accessed = entry
+                    if not self._expired(created):
+                        now = time()
+                        if now - accessed > self.ACCESS_RESOLUTION:
+                            self._execute("UPDATE entries SET accessed = ? WHERE cache = ? AND key = ?",
+                                          now, self.name, sql_key)
+                        value = loads(value)
+
+                        self.hits += 1
+                        CACHE_HITS.labels(self.name).inc()
+                        return value
+
+                    # Expired
+                    self._evict(sql_key)
+                    self._record_size()
+            except CACHE_ERROR_TYPES as e:
+                self._error(e)
+
+            self.misses += 1
+            CACHE_MISSES.labels(self.name).inc()
+            raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        """
+        Caches value under key, evicting the least recently used entries if the cache is full. Values which are
+        heavier than max_weight on their own are not cached.
+        :param key:
+        :param value:
+        :return:
+        """
+        if not self.enabled:
+            return
+
+        weight = self.weigher(value) if self.weigher is not None else 0
+        if self.max_weight is not None and weight > self.max_weight:
+            return
+
+        now = time()
+        with self._lock:
+            try:
+                sql_key, sql_value = dumps(key), dumps(value)
+                self._execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                              self.name, sql_key, sql_value, weight, now, now)
+                self._evict_lru()
+                self._record_size()
+            except CACHE_ERROR_TYPES as e:
+                self._error(e)
+
+    def __delitem__(self, key):
+        with self._lock:
+            try:
+                cursor = self._execute("DELETE FROM entries WHERE cache = ? AND key = ?", self.name, dumps(key))
+            except CACHE_ERROR_TYPES as e:
+                self._error(e)
+                return
+
+            if cursor.rowcount == 0:
+                raise KeyError(key)
+            self._record_size()
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            try:
+                entry = self._lookup(key)
+            except CACHE_ERROR_TYPES as e:
+                self._error(e)
+                return False
+            return entry is not None and not self._expired(entry[2])
+
+    def __len__(self) -> int:
+        with self._lock:
+            try:
+                return self._totals()[0]
+            except CACHE_ERROR_TYPES as e:
+                self._error(e)
+                return 0
+
+    @property
+    def weight(self) -> int:
+        with self._lock:
+            try:
+                return self._totals()[1]
+            except CACHE_ERROR_TYPES as e:
+                self._error(e)
+                return 0
+
+    def keys(self) -> list:
+        """
+        Returns a snapshot of the cached keys (including any which have expired but not yet been evicted)
+        :return:
+        """
+        with self._lock:
+            try:
+                cursor = self._execute("SELECT key FROM entries WHERE cache = ?", self.name)
+                return [loads(key) for key, in cursor.fetchall()]
+            except CACHE_ERROR_TYPES as e:
+                self._error(e)
+                return []
+
+    def clear(self):
+        """
+        Removes all entries from the cache
+        :return:
+        """
+        with self._lock:
+            try:
+                self._execute("DELETE FROM entries WHERE cache = ?", self.name)
+                self._record_size()
+            except CACHE_ERROR_TYPES as e:
+                self._error(e)
+
+    def stats(self) -> dict:
+        """
+        Returns the size of the cache, and this process' hit, miss, eviction and error counts
+        :return:
+        """
+        size, weight = len(self), self.weight
+
+        return {
+            "name": self.name,
+            "size": size,
+            "max_size": self.max_size,
+            "weight": weight,
+            "max_weight": self.max_weight,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "errors": self.errors
+        }
@@ -6,3 +6,5 @@ CONFIG.API = API_CONFIG
 CONFIG.ML = ML_CONFIG
 CONFIG.ELASTIC_SEARCH = ELASTIC_SEARCH_CONFIG
 CONFIG.SEARCH = SEARCH_CONFIG
+CONFIG.RECOMMEND = RECOMMEND_CONFIG
+CONFIG.CACHE = CACHE_CONFIG
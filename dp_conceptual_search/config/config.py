@@ -7,6 +7,7 @@ from dp4py_config.utils import bool_env
 from dp4py_sanic.config import CONFIG as SANIC_CONFIG
 
 from dp_conceptual_search.config.utils import read_git_sha
+from dp_conceptual_search.search.search_type import SearchType
 
 
 def get_log_level(variable: str, default: str="INFO"):
@@ -28,6 +29,27 @@ def get_log_level(variable: str, default: str="INFO"):
         raise SystemExit()
 
 
+def get_search_type(variable: str, default: str="dfs_query_then_fetch") -> SearchType:
+    """
+    Returns the configured Elasticsearch search type, and logs error if invalid
+    :param variable:
+    :param default:
+    :return:
+    """
+    search_type = os.environ.get(variable, default)
+
+    try:
+        return SearchType(search_type.lower())
+    except ValueError as e:
+        logging.error("Caught exception parsing search type", exc_info=e, extra={
+            "data": {
+                "variable": variable,
+                "value": search_type
+            }
+        })
+        raise SystemExit()
+
+
 # APP
 
 APP_CONFIG = Section("APP config")
@@ -44,19 +66,56 @@ API_CONFIG.testing = bool_env("TESTING", False)
 API_CONFIG.conceptual_search_enabled = bool_env("CONCEPTUAL_SEARCH_ENABLED", False)
 API_CONFIG.redirect_conceptual_search = bool_env("REDIRECT_CONCEPTUAL_SEARCH", False)
 API_CONFIG.recommended_search_enabled = bool_env("RECOMMENDED_SEARCH_ENABLED", False)
+API_CONFIG.streaming_responses_enabled = bool_env("STREAMING_RESPONSES_ENABLED", False)
 
 # ML
 
 ML_CONFIG = Section("Machine Learning config")
 ML_CONFIG.unsupervised_model_filename = os.environ.get("UNSUPERVISED_MODEL_FILENAME",
                                                        "./dp_conceptual_search/ml/data/word2vec/ons_supervised.vec")
+ML_CONFIG.unsupervised_model_mmap = bool_env("UNSUPERVISED_MODEL_MMAP", True)
+ML_CONFIG.unsupervised_ann_enabled = bool_env("UNSUPERVISED_ANN_ENABLED", False)
+ML_CONFIG.unsupervised_ann_num_lists = int(os.environ.get("UNSUPERVISED_ANN_NUM_LISTS", 0))
+ML_CONFIG.unsupervised_ann_n_probe = int(os.environ.get("UNSUPERVISED_ANN_N_PROBE", 8))
+ML_CONFIG.supervised_model_filename = os.environ.get("SUPERVISED_MODEL_FILENAME",
+                                                     "./dp_conceptual_search/ml/data/fasttext/ons_supervised.bin")
+ML_CONFIG.inference_workers = int(os.environ.get("ML_INFERENCE_WORKERS", 4))
+ML_CONFIG.spellcheck_workers = int(os.environ.get("SPELLCHECK_WORKERS", 2))
+ML_CONFIG.spellcheck_max_queue_size = int(os.environ.get("SPELLCHECK_MAX_QUEUE_SIZE", 20))
+ML_CONFIG.spellcheck_timeout = float(os.environ.get("SPELLCHECK_TIMEOUT", 1.0))
+ML_CONFIG.spellcheck_cache_max_size = int(os.environ.get("SPELLCHECK_CACHE_MAX_SIZE", 10000))
+ML_CONFIG.spellcheck_max_words = int(os.environ.get("SPELLCHECK_MAX_WORDS", 0))
+ML_CONFIG.spellcheck_prefix_length = int(os.environ.get("SPELLCHECK_PREFIX_LENGTH", 7))
 
 FASTTEXT_CONFIG = Section("FastText config")
 FASTTEXT_CONFIG.fasttext_host = os.environ.get("DP_FASTTEXT_HOST", "localhost")
 FASTTEXT_CONFIG.fasttext_port = int(os.environ.get("DP_FASTTEXT_PORT", 5100))
+FASTTEXT_CONFIG.pool_size = int(os.environ.get("DP_FASTTEXT_POOL_SIZE", 10))
+FASTTEXT_CONFIG.timeout = float(os.environ.get("DP_FASTTEXT_TIMEOUT", 5))
+FASTTEXT_CONFIG.supervised_backend = os.environ.get("FASTTEXT_SUPERVISED_BACKEND", "remote")
+FASTTEXT_CONFIG.unsupervised_backend = os.environ.get("FASTTEXT_UNSUPERVISED_BACKEND", "remote")
 FASTTEXT_CONFIG.num_labels = int(os.environ.get("FASTTEXT_NUM_LABELS", 5))
 FASTTEXT_CONFIG.threshold = float(os.environ.get("FASTTEXT_THRESHOLD", 0.0))
+FASTTEXT_CONFIG.cache_max_size = int(os.environ.get("FASTTEXT_CACHE_MAX_SIZE", 1000))
+FASTTEXT_CONFIG.cache_ttl = float(os.environ.get("FASTTEXT_CACHE_TTL", 3600))
+
+# Caches
+
+CACHE_CONFIG = Section("Cache config")
+CACHE_CONFIG.backend = os.environ.get("CACHE_BACKEND", "memory")
+CACHE_CONFIG.shared_path = os.environ.get("CACHE_SHARED_PATH", "/dev/shm/dp-conceptual-search/cache.db")
+CACHE_CONFIG.shared_timeout = float(os.environ.get("CACHE_SHARED_TIMEOUT", 1.0))
+
+# Recommendations
 
+RECOMMEND_CONFIG = Section("Recommendation API config")
+RECOMMEND_CONFIG.cache_max_size = int(os.environ.get("RECOMMEND_CACHE_MAX_SIZE", 1000))
+RECOMMEND_CONFIG.cache_ttl = float(os.environ.get("RECOMMEND_CACHE_TTL", 3600))
+RECOMMEND_CONFIG.precompute_enabled = bool_env("RECOMMEND_PRECOMPUTE_ENABLED", False)
+RECOMMEND_CONFIG.precompute_max_size = int(os.environ.get("RECOMMEND_PRECOMPUTE_MAX_SIZE", 100))
+RECOMMEND_CONFIG.precompute_ttl = float(os.environ.get("RECOMMEND_PRECOMPUTE_TTL", 600))
+RECOMMEND_CONFIG.precompute_refresh_interval = float(os.environ.get("RECOMMEND_PRECOMPUTE_REFRESH_INTERVAL", 60))
+RECOMMEND_CONFIG.precompute_refresh_concurrency = int(os.environ.get("RECOMMEND_PRECOMPUTE_REFRESH_CONCURRENCY", 4))
 
 # Elasticsearch
 
@@ -75,3 +134,26 @@ SEARCH_CONFIG.departments_search_index = "departments"
 SEARCH_CONFIG.results_per_page = int(os.getenv("RESULTS_PER_PAGE", 10))
 SEARCH_CONFIG.max_visible_paginator_link = int(os.getenv("MAX_VISIBLE_PAGINATOR_LINK", 5))
 SEARCH_CONFIG.max_request_size = int(os.getenv("SEARCH_MAX_REQUEST_SIZE", 200))
+SEARCH_CONFIG.concurrent_search_enabled = bool_env("SEARCH_CONCURRENT_ENABLED", True)
+SEARCH_CONFIG.multi_search_enabled = bool_env("SEARCH_MULTI_SEARCH_ENABLED", False)
+SEARCH_CONFIG.response_cache_endpoints = os.getenv("SEARCH_RESPONSE_CACHE_ENDPOINTS", "")
+SEARCH_CONFIG.response_cache_max_size = int(os.getenv("SEARCH_RESPONSE_CACHE_MAX_SIZE", 10000))
+SEARCH_CONFIG.response_cache_max_bytes = int(os.getenv("SEARCH_RESPONSE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+SEARCH_CONFIG.response_cache_ttl = float(os.getenv("SEARCH_RESPONSE_CACHE_TTL", 60))
+SEARCH_CONFIG.type_counts_cache_max_size = int(os.getenv("SEARCH_TYPE_COUNTS_CACHE_MAX_SIZE", 1000))
+SEARCH_CONFIG.type_counts_cache_ttl = float(os.getenv("SEARCH_TYPE_COUNTS_CACHE_TTL", 60))
+SEARCH_CONFIG.featured_index_enabled = bool_env("SEARCH_FEATURED_INDEX_ENABLED", False)
+SEARCH_CONFIG.featured_index_max_pages = int(os.getenv("SEARCH_FEATURED_INDEX_MAX_PAGES", 10000))
+SEARCH_CONFIG.featured_index_refresh_interval = float(os.getenv("SEARCH_FEATURED_INDEX_REFRESH_INTERVAL", 300))
+SEARCH_CONFIG.featured_negative_cache_max_size = int(os.getenv("SEARCH_FEATURED_NEGATIVE_CACHE_MAX_SIZE", 10000))
+SEARCH_CONFIG.featured_negative_cache_ttl = float(os.getenv("SEARCH_FEATURED_NEGATIVE_CACHE_TTL", 300))
+SEARCH_CONFIG.query_template_cache_max_size = int(os.getenv("SEARCH_QUERY_TEMPLATE_CACHE_MAX_SIZE", 1000))
+SEARCH_CONFIG.stored_templates_enabled = bool_env("SEARCH_STORED_TEMPLATES_ENABLED", False)
+SEARCH_CONFIG.vector_encoding = os.getenv("SEARCH_VECTOR_ENCODING", "json")
+SEARCH_CONFIG.vector_precision = int(os.getenv("SEARCH_VECTOR_PRECISION", 0))
+SEARCH_CONFIG.content_search_type = get_search_type("SEARCH_TYPE_CONTENT")
+SEARCH_CONFIG.departments_search_type = get_search_type("SEARCH_TYPE_DEPARTMENTS")
+SEARCH_CONFIG.conceptual_content_search_type = get_search_type("SEARCH_TYPE_CONCEPTUAL_CONTENT")
+SEARCH_CONFIG.type_counts_search_type = get_search_type("SEARCH_TYPE_TYPE_COUNTS")
+SEARCH_CONFIG.featured_search_type = get_search_type("SEARCH_TYPE_FEATURED")
+SEARCH_CONFIG.recommendation_search_type = get_search_type("SEARCH_TYPE_RECOMMENDATION")
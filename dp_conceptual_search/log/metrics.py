@@ -0,0 +1,70 @@
+"""
+Prometheus metrics shared across the app. Metrics are registered with the default prometheus_client registry, which
+is exposed on the /metrics endpoint when ENABLE_PROMETHEUS_METRICS is set.
+"""
+from prometheus_client import Counter, Gauge, Histogram
+
+# Time taken by each sub-query (branch) of the combined /search API
+SEARCH_BRANCH_DURATION = Histogram(
+    "search_branch_duration_seconds",
+    "Time taken to execute a single branch (content, counts or featured) of a combined search request",
+    ["branch"]
+)
+
+# Cache metrics, labelled by cache name
+CACHE_HITS = Counter(
+    "cache_hits_total",
+    "Number of cache lookups which returned a cached value",
+    ["cache"]
+)
+
+CACHE_MISSES = Counter(
+    "cache_misses_total",
+    "Number of cache lookups which did not return a cached value",
+    ["cache"]
+)
+
+CACHE_EVICTIONS = Counter(
+    "cache_evictions_total",
+    "Number of cache entries evicted because the cache was full or the entry had expired",
+    ["cache"]
+)
+
+CACHE_ERRORS = Counter(
+    "cache_errors_total",
+    "Number of cache operations which failed (e.g. because a shared cache was locked) and were skipped",
+    ["cache"]
+)
+
+CACHE_SIZE = Gauge(
+    "cache_size",
+    "Number of entries currently held in the cache",
+    ["cache"]
+)
+
+# Calls rejected by a bounded executor, labelled by executor name and reason (queue_full or timeout)
+EXECUTOR_REJECTIONS = Counter(
+    "executor_rejections_total",
+    "Number of calls to a bounded executor which were rejected because its queue was full or which timed out",
+    ["executor", "reason"]
+)
+
+CACHE_WEIGHT = Gauge(
+    "cache_weight",
+    "Total weight (e.g. size in bytes) of the entries currently held in a weighted cache",
+    ["cache"]
+)
+
+# Search API requests served with the response cache enabled, labelled by endpoint and cache status (HIT or MISS)
+RESPONSE_CACHE_REQUESTS = Counter(
+    "response_cache_requests_total",
+    "Number of search API requests served with the response cache enabled, by cache status",
+    ["endpoint", "status"]
+)
+
+# Time taken to build a search query, labelled by query (content or counts) and method (template or build)
+QUERY_BUILD_DURATION = Histogram(
+    "query_build_duration_seconds",
+    "Time taken to build a search query, either from a precompiled template or by building the query",
+    ["query", "method"]
+)
@@ -1,15 +1,156 @@
 """
 Implementation of a spellchecker using word embedding models
 """
-from typing import Generator, List
+from array import array
+from itertools import islice
+from typing import Iterator, List, Optional, Set
+
+import numpy as np
+from numpy import ndarray
 from sortedcontainers import SortedSet
 
+from dp_conceptual_search.cache import create_cache
 from dp_conceptual_search.ml.word_embedding.fastText.unsupervised import UnsupervisedModel
 
 # Constant
 LETTERS = 'abcdefghijklmnopqrstuvwxyz'
 
 
+def deletes(word: str, max_distance: int) -> Set[str]:
+    """
+    Returns all strings which can be generated by deleting up to max_distance characters from word (including word itself)
+    :param word:
+    :param max_distance:
+    :return:
+    """
+    result = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        result.update(frontier)
+    return result
+
+
+def damerau_levenshtein_distance(source: str, target: str, alphabet: str=LETTERS) -> float:
+    """
+    Computes the (unrestricted) Damerau-Levenshtein distance between source and target using the Lowrance-Wagner
+    algorithm. Characters may only be inserted or substituted from the given alphabet (as when generating edits), so
+    targets which can't be reached are an infinite distance away.
+    :param source:
+    :param target:
+    :param alphabet:
+    :return:
+    """
+    inf = float("inf")
+    num_rows, num_cols = len(source), len(target)
+
+    # Cost of inserting each target character, and a running count of those which can't be inserted
+    insert_cost = [1 if char in alphabet else inf for char in target]
+    num_invalid = [0]
+    for char in target:
+        num_invalid.append(num_invalid[-1] + (char not in alphabet))
+
+    def span_insert_cost(start: int, end: int) -> float:
+        # Cost of inserting target[start:end]
+        return end - start if num_invalid[end] == num_invalid[start] else inf
+
+    # d[i + 1][j + 1] is the distance between source[:i] and target[:j]
+    d = [[inf] * (num_cols + 2) for _ in range(num_rows + 2)]
+    for i in range(num_rows + 1):
+        d[i + 1][1] = i
+    for j in range(num_cols + 1):
+        d[1][j + 1] = span_insert_cost(0, j)
+
+    last_row = {}
+    for i in range(1, num_rows + 1):
+        last_match_col = 0
+        for j in range(1, num_cols + 1):
+            k = last_row.get(target[j - 1], 0)
+            l = last_match_col
+
+            if source[i - 1] == target[j - 1]:
+                cost = 0
+                last_match_col = j
+            else:
+                cost = insert_cost[j - 1]
+
+            # Delete the characters between the transposed pair in source, and insert those between them in target
+            transposition = d[k][l] + (i - k - 1) + 1 + span_insert_cost(l, j - 1)
+
+            # Two overlapping transpositions move a character two places (which can't always be done by a delete and
+            # insert, as only characters in the alphabet may be inserted)
+            rotation = inf
+            if i >= 3 and j >= 3:
+                window = source[i - 3:i]
+                if target[j - 3:j] in (window[1:] + window[0], window[2] + window[:2]):
+                    rotation = d[i - 2][j - 2] + 2
+
+            d[i + 1][j + 1] = min(
+                d[i][j] + cost,
+                d[i + 1][j] + insert_cost[j - 1],
+                d[i][j + 1] + 1,
+                transposition,
+                rotation
+            )
+        last_row[source[i - 1]] = i
+
+    return d[num_rows + 1][num_cols + 1]
+
+
+class DeletesIndex(object):
+    """
+    Compact symmetric delete index, mapping each string reachable by up to max_distance deletes from the prefix of a
+    vocabulary word back to the word. Entries are held as a sorted array of delete hashes, with the (vocabulary list)
+    index of the word each came from, rather than as a dict of lists of strings. Hash collisions only add candidates,
+    which are verified by edit distance.
+    """
+    def __init__(self, words: List[str], max_distance: int, prefix_length: int):
+        """
+        :param words: Indexed words
+        :param max_distance: Max number of deletes
+        :param prefix_length: Length of the prefix of each word which is indexed
+        """
+        self.words = words
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+
+        hashes, indices = array("q"), array("i")
+        for i, word in enumerate(words):
+            word_deletes = self.deletes(word)
+            hashes.extend(map(hash, word_deletes))
+            indices.extend([i] * len(word_deletes))
+
+        hashes = np.frombuffer(hashes, dtype=np.int64)
+        order = np.argsort(hashes, kind="mergesort")
+
+        self.hashes: ndarray = hashes[order]
+        self.indices: ndarray = np.frombuffer(indices, dtype=np.int32)[order]
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def deletes(self, word: str) -> Set[str]:
+        """
+        Returns the deletes of the (indexed prefix of the) given word
+        :param word:
+        :return:
+        """
+        return deletes(word[:self.prefix_length], self.max_distance)
+
+    def candidates(self, word: str) -> Iterator[str]:
+        """
+        Returns the indexed words which share a delete with the given word (possibly with duplicates)
+        :param word:
+        :return:
+        """
+        hashes = np.fromiter(map(hash, self.deletes(word)), dtype=np.int64)
+        starts = np.searchsorted(self.hashes, hashes, side="left")
+        ends = np.searchsorted(self.hashes, hashes, side="right")
+        for start, end in zip(starts[starts < ends], ends[starts < ends]):
+            for i in self.indices[start:end]:
+                yield self.words[i]
+
+
 class SpellCheckSuggestion(object):
     """
     Useful class for defining a single suggested spelling correction
@@ -26,14 +167,56 @@ class SpellCheckSuggestion(object):
             "probability": self.probability
         }
 
+    @staticmethod
+    def from_dict(data: dict) -> 'SpellCheckSuggestion':
+        return SpellCheckSuggestion(data["input"], data["correction"], data["probability"])
+
 
 class SpellChecker(object):
     """
     Uses word embedding models to check the spelling of words and suggested corrections.
+    Candidates are looked up in a symmetric delete (SymSpell style) index: any two words within max_edit_distance edits
+    of each other share a string obtained by deleting at most max_edit_distance characters from each, so the candidate
+    corrections for a word are found by hashing its (few) deletes rather than generating every possible edit. As in
+    SymSpell, only the prefix of each word is indexed, to bound the size of the index held by each worker. The index
+    may be further limited to the max_words most frequent words, though rarer words are then never suggested.
     """
+    MAX_EDIT_DISTANCE = 2
+    DEFAULT_PREFIX_LENGTH = 7
 
-    def __init__(self, model: UnsupervisedModel):
-        self.model: UnsupervisedModel = model
+    def __init__(self, model: UnsupervisedModel, cache_max_size: int=0, max_words: int=0,
+                 prefix_length: int=DEFAULT_PREFIX_LENGTH):
+        """
+        :param model:
+        :param cache_max_size: Max number of per-token suggestions to cache (0 disables the cache)
+        :param max_words: Max number of (most frequent) words to index as corrections (0 for the whole vocabulary)
+        :param prefix_length: Length of the prefix of each word which is indexed
+        """
+        self.suggestions_cache = create_cache("spellcheck", cache_max_size)
+        self.max_words = max_words
+        self.prefix_length = max(prefix_length, self.MAX_EDIT_DISTANCE + 1)
+        self.model = model
+
+    @property
+    def model(self) -> UnsupervisedModel:
+        return self._model
+
+    @model.setter
+    def model(self, model: UnsupervisedModel):
+        """
+        Sets the model, rebuilding the deletes index and invalidating cached suggestions
+        :param model:
+        :return:
+        """
+        self._model: UnsupervisedModel = model
+
+        # The vocabulary is in rank (frequency) order
+        words = iter(self.words.keys())
+        if self.max_words > 0:
+            words = islice(words, self.max_words)
+        self.deletes_index = DeletesIndex([str(word) for word in words], self.MAX_EDIT_DISTANCE, self.prefix_length)
+
+        self.suggestions_cache.clear()
 
     @property
     def words(self) -> dict:
@@ -48,13 +231,34 @@ class SpellChecker(object):
         result = []
 
         for term in SortedSet(terms):
-            correction = self.correction(term)
-            if correction.lower() != term.lower():
-                probability = self.probability(correction)
-                if probability != 0:
-                    result.append(SpellCheckSuggestion(term, correction, probability))
+            suggestion = self.suggestion(term)
+            if suggestion is not None:
+                result.append(suggestion)
         return result
 
+    def suggestion(self, term: str) -> Optional[SpellCheckSuggestion]:
+        """
+        Returns the (cached) suggested correction for a single term, or None if the term is spelt correctly or no
+        correction is known. Suggestions are cached as dicts, so that they can be held by the shared cache backend.
+        :param term:
+        :return:
+        """
+        try:
+            cached = self.suggestions_cache[term]
+            return SpellCheckSuggestion.from_dict(cached) if cached is not None else None
+        except KeyError:
+            pass
+
+        suggestion = None
+        correction = self.correction(term)
+        if correction.lower() != term.lower():
+            probability = self.probability(correction)
+            if probability != 0:
+                suggestion = SpellCheckSuggestion(term, correction, probability)
+
+        self.suggestions_cache[term] = suggestion.to_dict() if suggestion is not None else None
+        return suggestion
+
     def probability(self, word) -> float:
         """
         Probability of `word` being the correct substitution.
@@ -72,29 +276,30 @@ class SpellChecker(object):
 
     def candidates(self, word) -> set:
         """ Generate possible spelling corrections for word. """
-        return self.known(
-            [word]) or self.known(
-            self.single_edit_candidates(word)) or self.known(
-            self.double_edit_candidates(word)) or [word]
+        if word in self.words:
+            return {word}
+
+        # Known words at each edit distance from word
+        known = [set() for _ in range(self.MAX_EDIT_DISTANCE + 1)]
+
+        seen = set()
+        for candidate in self.deletes_index.candidates(word):
+            if candidate in seen:
+                continue
+            seen.add(candidate)
+
+            if abs(len(candidate) - len(word)) > self.MAX_EDIT_DISTANCE:
+                continue
+
+            distance = damerau_levenshtein_distance(word, candidate)
+            if distance <= self.MAX_EDIT_DISTANCE:
+                known[int(distance)].add(candidate)
+
+        for distance in range(1, self.MAX_EDIT_DISTANCE + 1):
+            if known[distance]:
+                return known[distance]
+        return {word}
 
     def known(self, words) -> set:
         """ The subset of `words` that appear in the dictionary. """
         return set(w for w in words if w in self.words)
-
-    def single_edit_candidates(self, word) -> set:
-        """ All candidate words that are one edit away from `word`. """
-        splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
-        # All words one deletion away from word
-        deletes = [left + right[1:] for left, right in splits if right]
-        # All words one transposition away from word
-        transposes = [left + right[1] + right[0] + right[2:] for left, right in splits if len(right) > 1]
-        # All words with one character replacement from word
-        replaces = [left + char + right[1:] for left, right in splits if right for char in LETTERS]
-        # All words one character insert away from word
-        inserts = [left + char + right for left, right in splits for char in LETTERS]
-        # Return set of all of the above
-        return set(deletes + transposes + replaces + inserts)
-
-    def double_edit_candidates(self, word) -> Generator:
-        """ All candidate words that are two edits away from `word`. """
-        return (e2 for e1 in self.single_edit_candidates(word) for e2 in self.single_edit_candidates(e1))
@@ -0,0 +1,41 @@
+"""
+This file defines classes and methods for working with supervised fastText models in-process.
+Requires the fastText python bindings (see the 'fastText' make target).
+"""
+from typing import List, Tuple
+
+from numpy import ndarray, float64
+
+
+class SupervisedModel(object):
+    LABEL_PREFIX = "__label__"
+
+    def __init__(self, filename: str):
+        # Import here, as the fastText bindings are only required when running supervised models in-process
+        from fastText import load_model
+
+        self.filename = filename
+        self.model = load_model(filename)
+
+    def get_sentence_vector(self, sentence: str) -> ndarray:
+        """
+        Returns the sentence vector for the given (cleaned) sentence, as float64 (like vectors decoded from
+        dp-fasttext responses)
+        :param sentence:
+        :return:
+        """
+        return self.model.get_sentence_vector(sentence).astype(float64)
+
+    def predict(self, sentence: str, num_labels: int, threshold: float=0.0) -> Tuple[List[str], List[float]]:
+        """
+        Predicts the top num_labels labels for the given sentence, along with their probabilities
+        :param sentence:
+        :param num_labels:
+        :param threshold: Min probability of returned labels
+        :return:
+        """
+        labels, probabilities = self.model.predict(sentence, k=num_labels, threshold=threshold)
+
+        # Strip the fastText label prefix
+        labels = [label.replace(self.LABEL_PREFIX, "", 1) for label in labels]
+        return labels, [float(probability) for probability in probabilities]
@@ -1,24 +1,205 @@
 """
 This file defines classes and methods for working with unsupervised fastText models.
-We use the excellent gensim package for working with such models.
+Models are parsed from the text (.vec) format using the excellent gensim package, and can be converted (once) to a
+compact, memory-mappable numpy format so that the vectors are shared between worker processes via the page cache.
 """
+import os
+import logging
+from typing import Iterator, List, Mapping
+
+import numpy as np
 from numpy import ndarray
-from gensim.models.keyedvectors import Word2VecKeyedVectors
+
+from dp_conceptual_search.ml.word_embedding.ivf_index import IVFIndex
+from dp_conceptual_search.ml.word_embedding.model_files import is_up_to_date, write_derived_dir
+
+# Files which make up the compact (memory-mappable) model format
+VECTORS_FILENAME = "vectors.npy"
+VECTORS_NORM_FILENAME = "vectors_norm.npy"
+VOCAB_FILENAME = "vocab.npy"
+VOCAB_ORDER_FILENAME = "vocab_order.npy"
+
+
+def compact_model_dirname(filename: str) -> str:
+    """
+    Returns the directory holding the compact format of the given .vec model
+    :param filename:
+    :return:
+    """
+    return "{0}.mmap".format(os.path.splitext(filename)[0])
+
+
+def ann_index_dirname(filename: str) -> str:
+    """
+    Returns the directory holding the persisted approximate nearest-neighbour index of the given .vec model
+    :param filename:
+    :return:
+    """
+    return "{0}.ivf".format(os.path.splitext(filename)[0])
+
+
+def top_k(scores: ndarray, k: int) -> ndarray:
+    """
+    Returns the (unsorted) column indices of the k largest scores in each row of the 2D scores array
+    :param scores:
+    :param k:
+    :return:
+    """
+    if k >= scores.shape[1]:
+        return np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    return np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+
+class VocabIndex(Mapping):
+    """
+    Read-only mapping of word -> rank (position in the model vocabulary), backed by a (memory-mapped) array of words in
+    rank order and the permutation which sorts it. Lookups are a binary search.
+    """
+    def __init__(self, vocab: ndarray, order: ndarray):
+        """
+        :param vocab: Array of words in rank order
+        :param order: Permutation of ranks which sorts vocab
+        """
+        self.vocab = vocab
+        self.order = order
+
+    def __getitem__(self, word: str) -> int:
+        if len(self.vocab) > 0 and isinstance(word, str):
+            i = int(np.searchsorted(self.vocab, word, sorter=self.order))
+            if i < len(self.order):
+                rank = int(self.order[i])
+                if self.vocab[rank] == word:
+                    return rank
+        raise KeyError(word)
+
+    def __iter__(self) -> Iterator[str]:
+        return (str(word) for word in self.vocab)
+
+    def __len__(self) -> int:
+        return len(self.vocab)
 
 
 class UnsupervisedModel(object):
-    def __init__(self, filename: str):
+    def __init__(self, filename: str, mmap: bool=True):
+        """
+        Loads the model from its compact format if it exists (see compact_model_dirname) and was converted from the
+        current .vec file, otherwise parses the .vec file
+        :param filename: Path to the .vec model
+        :param mmap: Use the compact format (if it exists)
+        """
         self.filename = filename
-        self.model = Word2VecKeyedVectors.load_word2vec_format(filename)
+        self.ann_index: IVFIndex = None
+
+        dirname = compact_model_dirname(filename)
+        if mmap and os.path.isdir(dirname):
+            if is_up_to_date(dirname, filename):
+                self._load_compact(dirname)
+                return
+
+            logging.warning("Compact model is out of date, parsing .vec model (re-run the conversion)", extra={
+                "model": {
+                    "filename": filename,
+                    "compact_dirname": dirname
+                }
+            })
+
+        self._load_word2vec_format(filename)
+
+    def _load_word2vec_format(self, filename: str):
+        """
+        Parses the model from the text .vec format
+        :param filename:
+        :return:
+        """
+        # Import here, as gensim is only required to parse the text format
+        from gensim.models.keyedvectors import Word2VecKeyedVectors
+
+        model = Word2VecKeyedVectors.load_word2vec_format(filename)
+
+        self.vectors: ndarray = model.vectors
+        self.vectors_norm: ndarray = self.normalise(self.vectors)
 
         # Collect ranked list of words in vocab
-        words = self.model.index2word
+        self.index2word = model.index2word
 
         w_rank = {}
-        for i, word in enumerate(words):
+        for i, word in enumerate(self.index2word):
             w_rank[word] = i
         self.words = w_rank
 
+    def _load_compact(self, dirname: str):
+        """
+        Memory-maps the model from its compact format
+        :param dirname:
+        :return:
+        """
+        def load(name: str) -> ndarray:
+            return np.load(os.path.join(dirname, name), mmap_mode="r")
+
+        self.vectors: ndarray = load(VECTORS_FILENAME)
+        self.vectors_norm: ndarray = load(VECTORS_NORM_FILENAME)
+
+        self.index2word = load(VOCAB_FILENAME)
+        self.words = VocabIndex(self.index2word, load(VOCAB_ORDER_FILENAME))
+
+    def save_compact(self, dirname: str=None) -> str:
+        """
+        Writes the model in its compact format (atomically replacing any existing compact format), recording the
+        signature of the .vec file it was converted from
+        :param dirname: Output directory (defaults to compact_model_dirname(self.filename))
+        :return: The output directory
+        """
+        if dirname is None:
+            dirname = compact_model_dirname(self.filename)
+
+        vocab = np.array([str(word) for word in self.index2word])
+
+        def write(tmp_dirname: str):
+            np.save(os.path.join(tmp_dirname, VECTORS_FILENAME), np.asarray(self.vectors))
+            np.save(os.path.join(tmp_dirname, VECTORS_NORM_FILENAME), np.asarray(self.vectors_norm))
+            np.save(os.path.join(tmp_dirname, VOCAB_FILENAME), vocab)
+            np.save(os.path.join(tmp_dirname, VOCAB_ORDER_FILENAME),
+                    np.argsort(vocab, kind="mergesort").astype(np.int32))
+
+        write_derived_dir(dirname, self.filename, write)
+        return dirname
+
+    def init_ann_index(self, num_lists: int=None, n_probe: int=8):
+        """
+        Loads the approximate nearest-neighbour index persisted next to the model, or builds (and persists) it if it
+        doesn't exist or is out of date (i.e was built from a previous version of the .vec file). The index is
+        persisted atomically, so workers starting concurrently never load a partially written index. Once initialised,
+        similarity queries are approximate unless exact=True.
+        :param num_lists: Number of clusters (None or 0 for sqrt of the vocabulary size)
+        :param n_probe: Number of clusters searched for each query (higher for better recall, lower for lower latency)
+        :return:
+        """
+        dirname = ann_index_dirname(self.filename)
+
+        if os.path.isdir(dirname) and is_up_to_date(dirname, self.filename):
+            index = IVFIndex.load(dirname, n_probe=n_probe)
+            if index.num_vectors == len(self.vectors_norm) and (not num_lists or index.num_lists == num_lists):
+                self.ann_index = index
+                return
+
+        index = IVFIndex.build(self.vectors_norm, num_lists=num_lists, n_probe=n_probe)
+        try:
+            write_derived_dir(dirname, self.filename, index.save)
+        except OSError as e:
+            logging.warning("Unable to persist approximate nearest-neighbour index", exc_info=e)
+        self.ann_index = index
+
+    @staticmethod
+    def normalise(vectors: ndarray) -> ndarray:
+        """
+        Returns the given vector(s) scaled to unit length (zero vectors are left unchanged)
+        :param vectors:
+        :return:
+        """
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (vectors / norms).astype(vectors.dtype, copy=False)
+
     def word_vec(self, word: str, use_norm=False) -> ndarray:
         """
         Returns the word vector for the given word
@@ -26,7 +207,11 @@ class UnsupervisedModel(object):
         :param use_norm: Return normalised vector
         :return:
         """
-        return self.model.word_vec(word, use_norm=use_norm)
+        if word not in self.words:
+            raise KeyError("word '{0}' not in vocabulary".format(word))
+
+        vectors = self.vectors_norm if use_norm else self.vectors
+        return np.array(vectors[self.words[word]])
 
     def similar_by_word(self, word: str, top_n: int=10, return_similarity=False, **kwargs) -> list:
         """
@@ -37,23 +222,83 @@ class UnsupervisedModel(object):
         :param kwargs: Additional arguments
         :return:
         """
-        word_vector = self.model.word_vec(word)
+        word_vector = self.word_vec(word)
         return self.similar_by_vector(word_vector, top_n=top_n, return_similarity=return_similarity, **kwargs)
 
-    def similar_by_vector(self, vector: ndarray, top_n: int=10, return_similarity=False, **kwargs) -> list:
+    def similar_by_vector(self, vector: ndarray, top_n: int=10, return_similarity=False,
+                          restrict_vocab: int=None, exact: bool=False) -> list:
         """
         Returns similar terms (and optionally, their similarity) to the given word vector.
         :param vector: Word vector for which to search for similarities to
         :param top_n: Return the top_n similar words
         :param return_similarity: Return the similarity score with each word
-        :param kwargs: Additional arguments
+        :param restrict_vocab: Only consider the restrict_vocab most frequent words
+        :param exact: Don't use the approximate nearest-neighbour index (if initialised)
+        :return:
+        """
+        return self.similar_by_vectors(np.asarray(vector).reshape(1, -1), top_n=top_n,
+                                       return_similarity=return_similarity, restrict_vocab=restrict_vocab,
+                                       exact=exact)[0]
+
+    def similar_by_vectors(self, vectors: ndarray, top_n: int=10, return_similarity=False, restrict_vocab: int=None,
+                           chunk_size: int=None, exact: bool=False) -> List[list]:
+        """
+        Returns similar terms (and optionally, their similarity) for each row of an (N, d) matrix of word vectors.
+        Similarities are computed with a single matrix multiply against the pre-normalised vocabulary vectors, or one
+        per chunk of chunk_size words (keeping a running top_n) so that the full (N, V) matrix of similarities is never
+        materialised.
+        :param vectors: (N, d) matrix of word vectors
+        :param top_n: Return the top_n similar words for each vector
+        :param return_similarity: Return the similarity score with each word
+        :param restrict_vocab: Only consider the restrict_vocab most frequent words
+        :param chunk_size: Number of vocabulary words to score at a time (None to score all at once)
+        :param exact: Don't use the approximate nearest-neighbour index (if initialised)
+        :return: List (of length N) of similar terms
+        """
+        vectors_norm = self.vectors_norm[:restrict_vocab]
+        queries = self.normalise(np.asarray(vectors, dtype=vectors_norm.dtype).reshape(-1, vectors_norm.shape[1]))
+
+        num_queries, num_words = len(queries), len(vectors_norm)
+        top_n = min(top_n, num_words)
+        if top_n <= 0:
+            return [[] for _ in range(num_queries)]
+
+        if self.ann_index is not None and not exact and restrict_vocab is None:
+            results = [self.ann_index.search(vectors_norm, query, top_n) for query in queries]
+            return [self._similar(indices, scores, return_similarity) for indices, scores in results]
+
+        if chunk_size is None:
+            chunk_size = num_words
+
+        rows = np.arange(num_queries)[:, None]
+        best_scores = np.empty((num_queries, 0), dtype=vectors_norm.dtype)
+        best_indices = np.empty((num_queries, 0), dtype=np.int64)
+
+        for start in range(0, num_words, chunk_size):
+            scores = queries.dot(vectors_norm[start:start + chunk_size].T)
+
+            # Top of this chunk, merged with the running top
+            chunk_top = top_k(scores, top_n)
+            scores = np.hstack([best_scores, scores[rows, chunk_top]])
+            indices = np.hstack([best_indices, chunk_top + start])
+
+            merged_top = top_k(scores, top_n)
+            best_scores, best_indices = scores[rows, merged_top], indices[rows, merged_top]
+
+        # Sort each row by descending similarity
+        order = np.argsort(-best_scores, axis=1, kind="mergesort")
+        best_scores, best_indices = best_scores[rows, order], best_indices[rows, order]
+
+        return [self._similar(indices, scores, return_similarity) for indices, scores in zip(best_indices, best_scores)]
+
+    def _similar(self, indices: ndarray, scores: ndarray, return_similarity: bool) -> list:
+        """
+        Maps vocabulary indices (and their similarity scores) to words
+        :param indices:
+        :param scores:
+        :param return_similarity:
         :return:
         """
         if return_similarity:
-            similar = [
-                s for s in self.model.similar_by_vector(
-                    vector, topn=top_n, **kwargs)]
-        else:
-            similar = [s[0]
-                       for s in self.model.similar_by_vector(vector, topn=top_n, **kwargs)]
-        return similar
+            return [(str(self.index2word[i]), float(score)) for i, score in zip(indices, scores)]
+        return [str(self.index2word[i]) for i in indices]
@@ -0,0 +1,154 @@
+"""
+Approximate nearest-neighbour (cosine similarity) search over word vectors using an inverted file (IVF) index.
+Vectors are clustered with spherical k-means, and queries only score the vectors in the n_probe clusters whose centroids
+are most similar to the query. Increasing n_probe trades latency for recall (n_probe = num_lists is exact search).
+"""
+import os
+from typing import Tuple
+
+import numpy as np
+from numpy import ndarray
+
+# Files which make up a persisted index
+CENTROIDS_FILENAME = "centroids.npy"
+OFFSETS_FILENAME = "offsets.npy"
+INDICES_FILENAME = "indices.npy"
+
+
+class IVFIndex(object):
+    def __init__(self, centroids: ndarray, offsets: ndarray, indices: ndarray, n_probe: int=8):
+        """
+        :param centroids: (num_lists, d) array of unit length cluster centroids
+        :param offsets: (num_lists + 1) array of offsets into indices at which each cluster's (inverted) list begins
+        :param indices: Indices of the indexed vectors, grouped by cluster
+        :param n_probe: Default number of clusters to search for each query
+        """
+        self.centroids = centroids
+        self.offsets = offsets
+        self.indices = indices
+        self.n_probe = n_probe
+
+    @property
+    def num_lists(self) -> int:
+        return len(self.centroids)
+
+    @property
+    def num_vectors(self) -> int:
+        return len(self.indices)
+
+    @staticmethod
+    def assign(vectors: ndarray, centroids: ndarray, chunk_size: int=10000) -> ndarray:
+        """
+        Returns the index of the most similar centroid for each (unit length) vector, in chunks to bound memory
+        :param vectors:
+        :param centroids:
+        :param chunk_size:
+        :return:
+        """
+        assignments = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), chunk_size):
+            scores = vectors[start:start + chunk_size].dot(centroids.T)
+            assignments[start:start + chunk_size] = np.argmax(scores, axis=1)
+        return assignments
+
+    @classmethod
+    def build(cls, vectors_norm: ndarray, num_lists: int=None, num_iterations: int=10, n_probe: int=8,
+              seed: int=0) -> 'IVFIndex':
+        """
+        Clusters the (unit length) vectors with spherical k-means and builds the inverted lists
+        :param vectors_norm:
+        :param num_lists: Number of clusters (defaults to sqrt of the number of vectors)
+        :param num_iterations: Number of k-means iterations
+        :param n_probe:
+        :param seed: Random seed used to initialise centroids
+        :return:
+        """
+        num_vectors = len(vectors_norm)
+        if num_lists is None or num_lists <= 0:
+            num_lists = int(np.sqrt(num_vectors))
+        num_lists = max(1, min(num_lists, num_vectors))
+
+        random_state = np.random.RandomState(seed)
+        centroids = np.array(vectors_norm[random_state.choice(num_vectors, num_lists, replace=False)])
+
+        assignments = cls.assign(vectors_norm, centroids)
+        for _ in range(num_iterations):
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, vectors_norm)
+
+            # Re-seed empty clusters with random vectors
+            empty = np.bincount(assignments, minlength=num_lists) == 0
+            sums[empty] = vectors_norm[random_state.choice(num_vectors, int(empty.sum()), replace=False)]
+
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            centroids = (sums / norms).astype(vectors_norm.dtype)
+
+            new_assignments = cls.assign(vectors_norm, centroids)
+            converged = np.array_equal(new_assignments, assignments)
+            assignments = new_assignments
+            if converged:
+                break
+
+        indices = np.argsort(assignments, kind="mergesort")
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assignments, minlength=num_lists))])
+
+        return cls(centroids, offsets.astype(np.int64), indices.astype(np.int64), n_probe=n_probe)
+
+    def search(self, vectors_norm: ndarray, query: ndarray, top_n: int, n_probe: int=None) -> Tuple[ndarray, ndarray]:
+        """
+        Returns the indices and similarities of (approximately) the top_n indexed vectors most similar to the given
+        query, sorted by descending similarity
+        :param vectors_norm: The (unit length) vectors the index was built over
+        :param query: Unit length query vector
+        :param top_n:
+        :param n_probe: Number of clusters to search (defaults to self.n_probe)
+        :return:
+        """
+        if n_probe is None:
+            n_probe = self.n_probe
+        n_probe = max(1, min(n_probe, self.num_lists))
+
+        centroid_scores = self.centroids.dot(query)
+        if n_probe < self.num_lists:
+            probe = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+        else:
+            probe = np.arange(self.num_lists)
+
+        candidates = np.concatenate([self.indices[self.offsets[i]:self.offsets[i + 1]] for i in probe])
+        scores = vectors_norm[candidates].dot(query)
+
+        top_n = min(top_n, len(candidates))
+        if top_n <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=scores.dtype)
+
+        best = np.argpartition(-scores, top_n - 1)[:top_n] if top_n < len(candidates) else np.arange(len(candidates))
+        best = best[np.argsort(-scores[best], kind="mergesort")]
+        return candidates[best], scores[best]
+
+    def save(self, dirname: str):
+        """
+        Persists the index to the given directory
+        :param dirname:
+        :return:
+        """
+        os.makedirs(dirname, exist_ok=True)
+        np.save(os.path.join(dirname, CENTROIDS_FILENAME), self.centroids)
+        np.save(os.path.join(dirname, OFFSETS_FILENAME), self.offsets)
+        np.save(os.path.join(dirname, INDICES_FILENAME), self.indices)
+
+    @classmethod
+    def load(cls, dirname: str, n_probe: int=8, mmap: bool=True) -> 'IVFIndex':
+        """
+        Loads a persisted index from the given directory
+        :param dirname:
+        :param n_probe:
+        :param mmap: Memory-map the index
+        :return:
+        """
+        mmap_mode = "r" if mmap else None
+
+        def load(name: str) -> ndarray:
+            return np.load(os.path.join(dirname, name), mmap_mode=mmap_mode)
+
+        return cls(load(CENTROIDS_FILENAME), load(OFFSETS_FILENAME), load(INDICES_FILENAME), n_probe=n_probe)
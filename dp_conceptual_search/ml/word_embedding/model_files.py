@@ -0,0 +1,92 @@
+"""
+Helpers for the files derived from a model (i.e its compact format and approximate nearest-neighbour index), which are
+written next to the model and shared by all worker processes. Derived files are written to a temporary directory and
+renamed into place, so readers never see a partially written directory, and record the signature (size and mtime) of
+the model they were derived from, so that they aren't used once the model changes.
+"""
+import os
+import json
+import shutil
+import tempfile
+from typing import Callable, Optional
+
+# File (in each derived directory) holding the signature of the model it was derived from
+SIGNATURE_FILENAME = "source.json"
+
+
+def source_signature(filename: str) -> Optional[dict]:
+    """
+    Returns the signature (size and mtime) of the given model file, or None if it doesn't exist
+    :param filename:
+    :return:
+    """
+    try:
+        stat = os.stat(filename)
+    except FileNotFoundError:
+        return None
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns
+    }
+
+
+def read_signature(dirname: str) -> Optional[dict]:
+    """
+    Returns the model signature recorded in a derived directory, or None if it wasn't recorded
+    :param dirname:
+    :return:
+    """
+    try:
+        with open(os.path.join(dirname, SIGNATURE_FILENAME)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_up_to_date(dirname: str, filename: str) -> bool:
+    """
+    Returns True if the derived directory was derived from the current version of the given model file (or if the
+    model file doesn't exist, so can't have changed)
+    :param dirname:
+    :param filename:
+    :return:
+    """
+    signature = source_signature(filename)
+    return signature is None or read_signature(dirname) == signature
+
+
+def write_derived_dir(dirname: str, filename: str, write: Callable[[str], None]):
+    """
+    Writes a directory derived from the given model file: calls write with a temporary directory, records the model
+    signature and atomically renames the temporary directory into place, replacing any existing directory
+    :param dirname:
+    :param filename: Model file the directory is derived from
+    :param write: Writes the derived files to the given directory
+    :return:
+    """
+    dirname = os.path.abspath(dirname)
+    parent, basename = os.path.split(dirname)
+    os.makedirs(parent, exist_ok=True)
+
+    tmp_dirname = tempfile.mkdtemp(prefix=".{0}.".format(basename), dir=parent)
+    old_dirname = None
+    try:
+        write(tmp_dirname)
+
+        signature = source_signature(filename)
+        if signature is not None:
+            with open(os.path.join(tmp_dirname, SIGNATURE_FILENAME), "w") as f:
+                json.dump(signature, f)
+
+        # Directories can't be renamed over non-empty directories, so the existing directory is moved aside first
+        # (readers which find no directory fall back to the model itself)
+        if os.path.isdir(dirname):
+            old_dirname = tempfile.mkdtemp(prefix=".{0}.old.".format(basename), dir=parent)
+            os.rename(dirname, os.path.join(old_dirname, basename))
+
+        os.rename(tmp_dirname, dirname)
+    finally:
+        if os.path.isdir(tmp_dirname):
+            shutil.rmtree(tmp_dirname, ignore_errors=True)
+        if old_dirname is not None:
+            shutil.rmtree(old_dirname, ignore_errors=True)
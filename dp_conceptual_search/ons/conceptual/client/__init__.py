@@ -1,2 +1,2 @@
-from .fasttext_client import FastTextClientService
+from .fasttext_client import FastTextClientService, FastTextClientPool
 from .conceptual_search_engine import ConceptualSearchEngine
@@ -1,6 +1,7 @@
 """
 Implementation of conceptual search client
 """
+import asyncio
 import logging
 from uuid import uuid4
 from numpy import ndarray
@@ -12,28 +13,38 @@ from dp_fasttext.client import Client
 from dp_fasttext.ml.utils import clean_string, replace_nouns_with_singulars, decode_float_list, encode_float_list
 
 from dp_conceptual_search.log import logger
+from dp_conceptual_search.config.config import FASTTEXT_CONFIG
+from dp_conceptual_search.cache import AsyncCache, create_cache
 
-from dp_conceptual_search.search.search_type import SearchType
-from dp_conceptual_search.search.dsl.vector_script_score import VectorScriptScore
+from dp_conceptual_search.search.query_template import marker, vector_marker
+from dp_conceptual_search.search.dsl.vector_script_score import VectorScriptScore, encode_vector
 
 from dp_conceptual_search.ons.search import SortField, ContentType
 from dp_conceptual_search.ons.search.exceptions import InvalidUsage
 from dp_conceptual_search.ons.search.fields import AvailableFields, Field
 from dp_conceptual_search.ons.search.client.search_engine import SearchEngine
+from dp_conceptual_search.ons.search.search_type_policy import QueryKind, search_type_policy
 from dp_conceptual_search.ons.search.response.client.ons_response import ONSResponse
 from dp_conceptual_search.ons.search.queries.ons_query_builders import build_type_counts_query
 from dp_conceptual_search.ons.search.exceptions import MalformedSearchTerm, UnknownSearchVector
 
 from dp_conceptual_search.ons.conceptual.client.fasttext_client import FastTextClientService
-from dp_conceptual_search.ons.conceptual.queries.ons_query_builders import build_content_query
+from dp_conceptual_search.ons.conceptual.queries.ons_query_builders import build_content_query, clean_label
 
 
 class ConceptualSearchEngine(SearchEngine):
 
-    CONNECTION_HEADER = "Connection"
-    CONNECTION_CLOSE = "close"
     EMBEDDING_VECTOR: Field = AvailableFields.EMBEDDING_VECTOR.value
 
+    # Names of the label and search vector request parameters in query templates
+    LABEL_PARAM = "label{0}"
+    SEARCH_VECTOR_PARAM = "vector"
+
+    # Labels and search vectors, keyed by (raw search term, num_labels, threshold)
+    conceptual_search_params_cache = AsyncCache(create_cache("conceptual_search_params",
+                                                             FASTTEXT_CONFIG.cache_max_size,
+                                                             ttl=FASTTEXT_CONFIG.cache_ttl))
+
     def vector_script_score(self, vector: ndarray) -> VectorScriptScore:
         """
         Wrapper for building a script score function using the embedding vector field
@@ -42,6 +53,32 @@ class ConceptualSearchEngine(SearchEngine):
         """
         return VectorScriptScore(self.EMBEDDING_VECTOR.name, vector, cosine=True)
 
+    def query_template_kwargs(self, **kwargs) -> Tuple[dict, dict]:
+        """
+        Replaces the labels and search vector with markers in query templates. Templates depend on the number of
+        labels, but not their values.
+        :param kwargs:
+        :return:
+        """
+        labels: List[str] = kwargs.get("labels", None)
+        search_vector: ndarray = kwargs.get("search_vector", None)
+        if not isinstance(labels, list) or not isinstance(search_vector, ndarray):
+            return super(ConceptualSearchEngine, self).query_template_kwargs(**kwargs)
+
+        names = [self.LABEL_PARAM.format(i) for i in range(len(labels))]
+
+        template_kwargs = {
+            **kwargs,
+            "labels": [marker(name) for name in names],
+            "search_vector": vector_marker(self.SEARCH_VECTOR_PARAM)
+        }
+
+        # Labels are cleaned by the query builder, so must be cleaned before they're spliced into templates
+        params = {name: clean_label(label) for name, label in zip(names, labels)}
+        _, params[self.SEARCH_VECTOR_PARAM] = encode_vector(search_vector)
+
+        return template_kwargs, params
+
     def content_query(self, search_term: str, current_page: int, size: int,
                       sort_by: SortField = SortField.relevance,
                       highlight: bool = True,
@@ -91,7 +128,7 @@ class ConceptualSearchEngine(SearchEngine):
         s: ConceptualSearchEngine = self._clone() \
             .query(query) \
             .paginate(current_page, size) \
-            .search_type(SearchType.DFS_QUERY_THEN_FETCH) \
+            .search_type(search_type_policy(QueryKind.CONCEPTUAL_CONTENT)) \
             .exclude_fields_from_source(self.EMBEDDING_VECTOR)
 
         if type_filters is not None:
@@ -128,7 +165,7 @@ class ConceptualSearchEngine(SearchEngine):
         # Setup the aggregations bucket
         s.aggs.bucket(self.agg_bucket, aggregations)
 
-        return s
+        return s.search_type(search_type_policy(QueryKind.TYPE_COUNTS))
 
     async def embedding_vector_for_uri(self, uri: str) -> ndarray:
         """
@@ -171,13 +208,12 @@ class ConceptualSearchEngine(SearchEngine):
         :return:
         """
         return {
-            Client.REQUEST_ID_HEADER: context,
-            self.CONNECTION_HEADER: self.CONNECTION_CLOSE
+            Client.REQUEST_ID_HEADER: context
         }
 
     async def similar_by_vector(self, vector: ndarray, num_labels: int, **kwargs) -> list:
         """
-        Initialises a fasttext client and makes a HTTP request to get words similar by vector
+        Gets words similar by vector from fasttext (external server or in-process model)
         :param vector:
         :param num_labels:
         :return:
@@ -186,21 +222,26 @@ class ConceptualSearchEngine(SearchEngine):
         context: str = kwargs.get("context", str(uuid4()))
 
         client: Client
-        async with FastTextClientService.get_fasttext_client() as client:
+        async with FastTextClientService.get_unsupervised_client() as client:
             # Encode vector
             encoded_vector = encode_float_list(vector)
 
             # Build request context header
             headers = self.get_fasttext_headers(context)
 
-            similar_words = await client.unsupervised.similar_by_vector(encoded_vector, num_labels, headers=headers)
+            similar_words = await FastTextClientService.with_timeout(
+                client.unsupervised.similar_by_vector(encoded_vector, num_labels, headers=headers)
+            )
 
             return similar_words
 
     async def conceptual_search_params(self, search_term: str, num_labels: int, threshold: float, **kwargs) -> \
             Tuple[List[str], ndarray]:
         """
-        Queries external fasttext server for labels and search vector
+        Returns labels and search vector for the given search term. Results are cached, and concurrent lookups for
+        the same search term share a single request to the external fasttext server. Labels are predicted from the raw
+        search term (and the search vector from the cleaned term), so results are cached by the raw search term.
+        Cached search vectors are shared, so are read-only.
         :param search_term:
         :param num_labels:
         :param threshold:
@@ -209,27 +250,47 @@ class ConceptualSearchEngine(SearchEngine):
         # Get/generate request context
         context = kwargs.get("context", str(uuid4()))
 
-        # Initialise dp-fasttext client
+        # First, clean the search term and replace all nouns with singulars
+        clean_search_term = replace_nouns_with_singulars(clean_string(search_term))
+
+        if len(clean_search_term) == 0:
+            logger.error(context, "cleaned search term is empty")
+            raise MalformedSearchTerm(search_term)
+
+        key = (search_term, num_labels, threshold)
+
+        async def compute():
+            return await self._conceptual_search_params(search_term, clean_search_term, num_labels, threshold,
+                                                        context)
+
+        return await self.conceptual_search_params_cache.get_or_compute(key, compute)
+
+    async def _conceptual_search_params(self, search_term: str, clean_search_term: str, num_labels: int,
+                                        threshold: float, context: str) -> Tuple[List[str], ndarray]:
+        """
+        Queries fasttext (external server or in-process model) for labels and search vector
+        :param search_term:
+        :param clean_search_term:
+        :param num_labels:
+        :param threshold:
+        :param context:
+        :return:
+        """
+        # Initialise dp-fasttext (or local) client
         client: Client
-        async with FastTextClientService.get_fasttext_client() as client:
+        async with FastTextClientService.get_supervised_client() as client:
             # Build request context header
             headers = self.get_fasttext_headers(context)
 
-            # First, clean the search term and replace all nouns with singulars
-            clean_search_term = replace_nouns_with_singulars(clean_string(search_term))
-
-            if len(clean_search_term) == 0:
-                logger.error(context, "cleaned search term is empty")
-                raise MalformedSearchTerm(search_term)
-
-            # Get search vector from dp-fasttext
-            search_vector: ndarray = await client.supervised.get_sentence_vector(clean_search_term, headers=headers)
+            # Get the search vector and keyword labels (with their probabilities) from dp-fasttext concurrently
+            search_vector, (labels, probabilities) = await FastTextClientService.with_timeout(asyncio.gather(
+                client.supervised.get_sentence_vector(clean_search_term, headers=headers),
+                client.supervised.predict(search_term, num_labels, threshold, headers=headers)
+            ))
 
             if search_vector is None:
                 logger.error(context, "Unable to retrieve search vector for query '{0}'".format(search_term))
                 raise UnknownSearchVector(search_term)
 
-            # Get keyword labels and their probabilities from dp-fasttext
-            labels, probabilities = await client.supervised.predict(search_term, num_labels, threshold, headers=headers)
-
-            return labels, search_vector
\ No newline at end of file
+            search_vector.setflags(write=False)
+            return labels, search_vector
@@ -1,12 +1,182 @@
 """
 Provides methods for initialising dp-fasttext HTTP client
 """
+import asyncio
+from enum import Enum
+from typing import Awaitable
+
 from dp_fasttext.client import Client
 
 from dp_conceptual_search.config.config import FASTTEXT_CONFIG
+from dp_conceptual_search.ons.conceptual.client.local_fasttext_client import LocalFastTextClient
+
+
+class FastTextBackend(Enum):
+    REMOTE = "remote"  # dp-fasttext HTTP service
+    LOCAL = "local"  # In-process model
+
+    def __str__(self):
+        return self.value
+
+
+class PooledClient(object):
+    """
+    Async context manager which borrows a client from a FastTextClientPool and returns it on exit
+    """
+    def __init__(self, pool: 'FastTextClientPool'):
+        self.pool = pool
+        self.client: Client = None
+
+    async def __aenter__(self) -> Client:
+        self.client = await self.pool.get()
+        return self.client
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.pool.put(self.client)
+        self.client = None
+
+
+class FastTextClientPool(object):
+    """
+    Fixed size pool of long-lived dp-fasttext clients. Each client keeps its HTTP connection alive between requests,
+    so lookups do not pay for a new TCP handshake and session.
+    """
+    def __init__(self, host: str, port: int, size: int, timeout: float):
+        """
+        Initialise the pool
+        :param host: dp-fasttext host
+        :param port: dp-fasttext port
+        :param size: Number of clients in the pool
+        :param timeout: Max time (in seconds) to wait for a free client
+        """
+        self.host = host
+        self.port = port
+        self.size = size
+        self.timeout = timeout
+
+        self._clients = []
+        self._queue: asyncio.Queue = None
+
+    async def open(self):
+        """
+        Opens all clients in the pool. Must be called from within the running event loop.
+        :return:
+        """
+        self._queue = asyncio.Queue()
+
+        for i in range(self.size):
+            client = Client(self.host, self.port)
+            await client.__aenter__()
+
+            self._clients.append(client)
+            self._queue.put_nowait(client)
+
+    async def close(self):
+        """
+        Closes all clients in the pool
+        :return:
+        """
+        client: Client
+        for client in self._clients:
+            await client.__aexit__(None, None, None)
+
+        self._clients = []
+        self._queue = None
+
+    async def get(self) -> Client:
+        """
+        Waits (up to the configured timeout) for a free client
+        :return:
+        """
+        return await asyncio.wait_for(self._queue.get(), self.timeout)
+
+    def put(self, client: Client):
+        """
+        Returns a client to the pool (a no-op if the pool has been closed)
+        :param client:
+        :return:
+        """
+        if self._queue is not None:
+            self._queue.put_nowait(client)
+
+    def acquire(self) -> PooledClient:
+        """
+        Returns an async context manager which borrows a client from the pool
+        :return:
+        """
+        return PooledClient(self)
 
 
 class FastTextClientService(object):
+    # App-scoped connection pool, set by the SearchApp on startup
+    _pool: FastTextClientPool = None
+
+    # App-scoped in-process client, set by the SearchApp on startup when using a local backend
+    _local_client: LocalFastTextClient = None
+
+    @staticmethod
+    def set_pool(pool: FastTextClientPool):
+        FastTextClientService._pool = pool
+
+    @staticmethod
+    def set_local_client(client: LocalFastTextClient):
+        FastTextClientService._local_client = client
+
+    @staticmethod
+    def supervised_backend() -> FastTextBackend:
+        return FastTextBackend(FASTTEXT_CONFIG.supervised_backend)
+
+    @staticmethod
+    def unsupervised_backend() -> FastTextBackend:
+        return FastTextBackend(FASTTEXT_CONFIG.unsupervised_backend)
+
+    @staticmethod
+    def remote_enabled() -> bool:
+        """
+        Returns True if any requests are served by dp-fasttext
+        :return:
+        """
+        return FastTextBackend.REMOTE in (FastTextClientService.supervised_backend(),
+                                          FastTextClientService.unsupervised_backend())
+
+    @staticmethod
+    def get_supervised_client():
+        """
+        Returns an async context manager for the client used for supervised model requests (sentence vectors and
+        label prediction), as selected by config
+        :return:
+        """
+        if FastTextClientService.supervised_backend() is FastTextBackend.LOCAL:
+            return FastTextClientService._local_client
+        return FastTextClientService.get_fasttext_client()
+
+    @staticmethod
+    def get_unsupervised_client():
+        """
+        Returns an async context manager for the client used for unsupervised model requests (similar words), as
+        selected by config
+        :return:
+        """
+        if FastTextClientService.unsupervised_backend() is FastTextBackend.LOCAL:
+            return FastTextClientService._local_client
+        return FastTextClientService.get_fasttext_client()
+
     @staticmethod
     def get_fasttext_client() -> Client:
+        """
+        Returns an async context manager for a dp-fasttext client. Clients are borrowed from the app-scoped pool
+        when available, otherwise a new client is created.
+        :return:
+        """
+        if FastTextClientService._pool is not None:
+            return FastTextClientService._pool.acquire()
         return Client(FASTTEXT_CONFIG.fasttext_host, FASTTEXT_CONFIG.fasttext_port)
+
+    @staticmethod
+    def with_timeout(request: Awaitable) -> Awaitable:
+        """
+        Applies the configured per-request timeout to a dp-fasttext request
+        :param request:
+        :return:
+        """
+        return asyncio.wait_for(request, FASTTEXT_CONFIG.timeout)
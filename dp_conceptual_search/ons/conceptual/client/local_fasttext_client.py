@@ -0,0 +1,91 @@
+"""
+In-process replacement for the dp-fasttext HTTP client. Implements the subset of the client API used by the conceptual
+search and recommendation engines, running model inference in an executor so that the event loop is not blocked.
+"""
+import asyncio
+from concurrent.futures import Executor
+from typing import Callable, List, Tuple
+
+from numpy import ndarray
+
+from dp_fasttext.ml.utils import decode_float_list
+
+from dp_conceptual_search.ml.word_embedding.fastText.supervised import SupervisedModel
+from dp_conceptual_search.ml.word_embedding.fastText.unsupervised import UnsupervisedModel
+
+
+class LocalSupervisedClient(object):
+    def __init__(self, client: 'LocalFastTextClient', model: SupervisedModel):
+        self.client = client
+        self.model = model
+
+    async def get_sentence_vector(self, sentence: str, headers: dict=None) -> ndarray:
+        """
+        Returns the sentence vector for the given sentence
+        :param sentence:
+        :param headers: Unused (kept for compatibility with the dp-fasttext client)
+        :return:
+        """
+        return await self.client.run_in_executor(self.model.get_sentence_vector, sentence)
+
+    async def predict(self, sentence: str, num_labels: int, threshold: float, headers: dict=None) -> \
+            Tuple[List[str], List[float]]:
+        """
+        Predicts labels (and their probabilities) for the given sentence
+        :param sentence:
+        :param num_labels:
+        :param threshold:
+        :param headers: Unused (kept for compatibility with the dp-fasttext client)
+        :return:
+        """
+        return await self.client.run_in_executor(self.model.predict, sentence, num_labels, threshold)
+
+
+class LocalUnsupervisedClient(object):
+    def __init__(self, client: 'LocalFastTextClient', model: UnsupervisedModel):
+        self.client = client
+        self.model = model
+
+    async def similar_by_vector(self, encoded_vector: str, num_labels: int, headers: dict=None) -> List[str]:
+        """
+        Returns the num_labels words most similar to the given (encoded) vector
+        :param encoded_vector:
+        :param num_labels:
+        :param headers: Unused (kept for compatibility with the dp-fasttext client)
+        :return:
+        """
+        vector = decode_float_list(encoded_vector)
+        return await self.client.run_in_executor(self.model.similar_by_vector, vector, num_labels)
+
+
+class LocalFastTextClient(object):
+    def __init__(self, executor: Executor, supervised_model: SupervisedModel=None,
+                 unsupervised_model: UnsupervisedModel=None):
+        """
+        Initialise the local client
+        :param executor: Executor to run model inference on
+        :param supervised_model: Model for sentence vectors and label prediction (if served locally)
+        :param unsupervised_model: Model for similar words (if served locally)
+        """
+        self.executor = executor
+
+        if supervised_model is not None:
+            self.supervised = LocalSupervisedClient(self, supervised_model)
+        if unsupervised_model is not None:
+            self.unsupervised = LocalUnsupervisedClient(self, unsupervised_model)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    async def run_in_executor(self, fn: Callable, *args):
+        """
+        Runs fn(*args) on the executor
+        :param fn:
+        :param args:
+        :return:
+        """
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.executor, fn, *args)
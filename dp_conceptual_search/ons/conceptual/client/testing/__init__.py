@@ -0,0 +1 @@
+from .stand_in_server import StandInFastTextServer
@@ -0,0 +1,151 @@
+"""
+Local stand-in for the dp-fasttext HTTP API, used to test and benchmark the conceptual search path offline through the
+real dp-fasttext client (and FastTextClientPool). Each request sleeps for a fixed latency (simulating model inference)
+and the number of concurrent requests is recorded.
+"""
+import socket
+import asyncio
+import hashlib
+from typing import List
+
+import numpy as np
+from aiohttp import web
+
+from dp_fasttext.client import Client
+from dp_fasttext.ml.utils import encode_float_list, decode_float_list
+
+# dp-fasttext API routes
+HEALTHCHECK_ROUTE = "/healthcheck"
+SENTENCE_VECTOR_ROUTE = "/supervised/sentence/vector"
+PREDICT_ROUTE = "/supervised/predict"
+SIMILAR_BY_VECTOR_ROUTE = "/unsupervised/similar/vector"
+
+
+class StandInFastTextServer(object):
+    """
+    Serves deterministic responses for the subset of the dp-fasttext API used by this app, on a free local port
+    """
+    def __init__(self, latency: float=0.05, dimensions: int=10, host: str="127.0.0.1"):
+        """
+        :param latency: Simulated time (in seconds) to serve each request
+        :param dimensions: Dimensions of returned vectors
+        :param host: Host to listen on
+        """
+        self.latency = latency
+        self.dimensions = dimensions
+        self.host = host
+        self.port: int = None
+
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+        self._runner: web.AppRunner = None
+
+    async def __aenter__(self) -> 'StandInFastTextServer':
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+
+    async def start(self):
+        """
+        Starts serving on a free port. Must be called from within the running event loop.
+        :return:
+        """
+        app = web.Application()
+        app.router.add_get(HEALTHCHECK_ROUTE, self.healthcheck)
+        app.router.add_post(SENTENCE_VECTOR_ROUTE, self.get_sentence_vector)
+        app.router.add_post(PREDICT_ROUTE, self.predict)
+        app.router.add_post(SIMILAR_BY_VECTOR_ROUTE, self.similar_by_vector)
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind((self.host, 0))
+        self.port = sock.getsockname()[1]
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.SockSite(self._runner, sock).start()
+
+    async def stop(self):
+        """
+        Stops serving
+        :return:
+        """
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def request(self, name: str):
+        """
+        Records a request and simulates the time taken to serve it
+        :param name:
+        :return:
+        """
+        self.requests.append(name)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+
+    def vector(self, sentence: str) -> np.ndarray:
+        """
+        Returns a deterministic vector for the given sentence
+        :param sentence:
+        :return:
+        """
+        seed = int(hashlib.md5(sentence.encode("utf-8")).hexdigest()[:8], 16)
+        return np.random.RandomState(seed).rand(self.dimensions)
+
+    @staticmethod
+    def response(request: web.Request, body: dict) -> web.Response:
+        """
+        Returns a JSON response, echoing the request ID header
+        :param request:
+        :param body:
+        :return:
+        """
+        headers = {}
+        if Client.REQUEST_ID_HEADER in request.headers:
+            headers[Client.REQUEST_ID_HEADER] = request.headers[Client.REQUEST_ID_HEADER]
+        return web.json_response(body, headers=headers)
+
+    async def healthcheck(self, request: web.Request) -> web.Response:
+        await self.request("healthcheck")
+        return self.response(request, {})
+
+    async def get_sentence_vector(self, request: web.Request) -> web.Response:
+        await self.request("get_sentence_vector")
+
+        query = (await request.json()).get("query")
+        return self.response(request, {
+            "query": query,
+            "vector": encode_float_list(self.vector(query).tolist())
+        })
+
+    async def predict(self, request: web.Request) -> web.Response:
+        await self.request("predict")
+
+        data = await request.json()
+        query, num_labels = data.get("query"), int(data.get("num_labels", 10))
+
+        labels: List[str] = ["{0}_{1}".format(query, i) for i in range(num_labels)]
+        probabilities: List[float] = [1.0 / (i + 1) for i in range(num_labels)]
+        return self.response(request, {
+            "labels": labels,
+            "probabilities": probabilities
+        })
+
+    async def similar_by_vector(self, request: web.Request) -> web.Response:
+        await self.request("similar_by_vector")
+
+        data = await request.json()
+        vector, num_labels = decode_float_list(data.get("vector")), int(data.get("num_labels", 10))
+
+        words = ["similar_{0}_{1:.3f}".format(i, value) for i, value in enumerate(vector[:num_labels])]
+        return self.response(request, {
+            "words": words
+        })
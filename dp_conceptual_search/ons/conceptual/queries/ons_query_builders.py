@@ -18,6 +18,15 @@ date_function = date_decay_function(AvailableFields.RELEASE_DATE.value.name,
                                     "exp", "365d", "30d", decay=0.95)
 
 
+def clean_label(label: str) -> str:
+    """
+    Cleans a generated keyword label for matching (removes _)
+    :param label:
+    :return:
+    """
+    return label.replace("_", " ")
+
+
 def word_vector_keywords_query(labels: List[str]) -> Q.Query:
     """
     Build a bool query to match against generated keyword labels
@@ -28,7 +37,7 @@ def word_vector_keywords_query(labels: List[str]) -> Q.Query:
     field: Field = AvailableFields.KEYWORDS_RAW.value
 
     # Remove _ from labels
-    labels = [label.replace("_", " ") for label in labels]
+    labels = [clean_label(label) for label in labels]
 
     # Build the individual match queries
     match_queries = [Q.MultiMatch(**{
@@ -2,19 +2,60 @@
 Defines the search engine for recommendation queries
 """
 from numpy import ndarray
+from typing import List, Tuple
 
 from elasticsearch_dsl import query as Q
 
-from dp_conceptual_search.search.search_type import SearchType
+from dp_conceptual_search.config.config import RECOMMEND_CONFIG
+from dp_conceptual_search.cache import AsyncCache, create_cache
+from dp_conceptual_search.search.query_helper import normalise_uri
+
+from dp_conceptual_search.ons.search.search_type_policy import QueryKind, search_type_policy
 from dp_conceptual_search.search.dsl.vector_script_score import VectorScriptScore
 
 from dp_conceptual_search.ons.search.sort_fields import SortField
+from dp_conceptual_search.ons.search.response.client.ons_response import ONSResponse
 from dp_conceptual_search.ons.recommend.queries.ons_query_builders import similar_to_uri
 from dp_conceptual_search.ons.conceptual.client.conceptual_search_engine import ConceptualSearchEngine
 
 
 class RecommendationSearchEngine(ConceptualSearchEngine):
 
+    # Page embedding vectors and keywords, keyed by (uri, num_labels)
+    recommendation_params_cache = AsyncCache(create_cache("recommendation_params",
+                                                          RECOMMEND_CONFIG.cache_max_size,
+                                                          ttl=RECOMMEND_CONFIG.cache_ttl))
+
+    @classmethod
+    def invalidate_uri(cls, uri: str):
+        """
+        Removes cached embedding vectors and keywords for the given uri (i.e when the page is republished)
+        :param uri:
+        :return:
+        """
+        uri = normalise_uri(uri)
+        cls.recommendation_params_cache.invalidate_matching(lambda key: normalise_uri(key[0]) == uri)
+
+    async def recommendation_params(self, uri: str, num_labels: int, **kwargs) -> Tuple[ndarray, List[str]]:
+        """
+        Returns the embedding vector and keywords for the page at the given uri. Results are cached, and concurrent
+        lookups for the same uri share a single Elasticsearch query and fasttext request.
+        :param uri:
+        :param num_labels:
+        :return:
+        """
+        async def compute():
+            # Get the page embedding vector (read-only, as it is shared between requests)
+            embedding_vector: ndarray = await self.embedding_vector_for_uri(uri)
+            embedding_vector.flags.writeable = False
+
+            # Generate the keywords
+            keywords = await self.similar_by_vector(embedding_vector, num_labels, **kwargs)
+
+            return embedding_vector, keywords
+
+        return await self.recommendation_params_cache.get_or_compute((uri, num_labels), compute)
+
     async def similar_by_uri_query(self, uri: str, num_labels, page: int, page_size: int,
                                    sort_by: SortField = SortField.relevance,
                                    highlight: bool=True,
@@ -29,11 +70,8 @@ class RecommendationSearchEngine(ConceptualSearchEngine):
         :param highlight:
         :return:
         """
-        # Get the page embedding vector
-        embedding_vector: ndarray = await self.embedding_vector_for_uri(uri)
-
-        # Generate the keywords
-        keywords = await self.similar_by_vector(embedding_vector, num_labels, **kwargs)
+        # Get the page embedding vector and keywords
+        embedding_vector, keywords = await self.recommendation_params(uri, num_labels, **kwargs)
 
         # Build the query
         vector_script: VectorScriptScore = self.vector_script_score(embedding_vector)
@@ -44,7 +82,7 @@ class RecommendationSearchEngine(ConceptualSearchEngine):
         # Set query
         s: RecommendationSearchEngine = s.query(query) \
             .paginate(page, page_size) \
-            .search_type(SearchType.DFS_QUERY_THEN_FETCH) \
+            .search_type(search_type_policy(QueryKind.RECOMMENDATION)) \
             .sort_by(sort_by)
 
         if highlight:
@@ -52,3 +90,24 @@ class RecommendationSearchEngine(ConceptualSearchEngine):
 
         # Execute and return
         return s
+
+    async def recommend(self, uri: str, num_labels: int, page: int, page_size: int,
+                        sort_by: SortField = SortField.relevance, lazy: bool=False, **kwargs) -> dict:
+        """
+        Queries for content similar to (but excluding) the given uri, and returns the content query search result
+        :param uri:
+        :param num_labels:
+        :param page:
+        :param page_size:
+        :param sort_by:
+        :param lazy: If True, results are an iterator which transforms each hit on demand (i.e for streaming)
+        :return:
+        """
+        s: RecommendationSearchEngine = await self.similar_by_uri_query(uri, num_labels,
+                                                                        page, page_size,
+                                                                        sort_by=sort_by,
+                                                                        highlight=True,
+                                                                        **kwargs)
+
+        response: ONSResponse = await s.execute()
+        return response.to_content_query_search_result(page, page_size, sort_by, lazy=lazy).to_dict()
@@ -0,0 +1,208 @@
+"""
+Bounded store of precomputed (page 1) recommendation results for the most requested pages, kept fresh by a background
+task running on the app event loop
+"""
+import heapq
+import asyncio
+import logging
+from time import monotonic
+from collections import namedtuple
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from dp_conceptual_search.search.query_helper import normalise_uri
+from dp_conceptual_search.ons.search.sort_fields import SortField
+from dp_conceptual_search.log.metrics import CACHE_HITS, CACHE_MISSES, CACHE_SIZE
+
+# Identifies a page 1 recommendation result
+RecommendationKey = namedtuple("RecommendationKey", ["uri", "num_labels", "page_size", "sort_by"])
+
+
+class RecommendationStore(object):
+    """
+    Tracks how often each recommendation is requested and periodically (re)computes results for the max_size most
+    requested. Results older than ttl are still served, but trigger a refresh (stale-while-revalidate). Requests for
+    anything not in the store fall back to the live query path.
+    """
+    NAME = "recommendations"
+
+    # Request frequencies are decayed on every refresh, so that the store follows changes in popularity
+    FREQUENCY_DECAY = 0.5
+    MIN_FREQUENCY = 0.1
+
+    def __init__(self, compute: Callable[[RecommendationKey], Awaitable[dict]], max_size: int, ttl: float,
+                 refresh_interval: float, refresh_concurrency: int=4):
+        """
+        :param compute: Coroutine function which computes the (live) result for a key
+        :param max_size: Max number of precomputed results
+        :param ttl: Age (in seconds) after which results are stale
+        :param refresh_interval: Time (in seconds) between background refreshes
+        :param refresh_concurrency: Max number of results computed concurrently by the background refresh
+        """
+        self.compute = compute
+        self.max_size = max_size
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self.refresh_concurrency = refresh_concurrency
+
+        self._entries: Dict[RecommendationKey, Tuple[float, dict]] = {}
+        self._frequencies: Dict[RecommendationKey, float] = {}
+        self._refreshing: Dict[RecommendationKey, asyncio.Future] = {}
+
+        self._semaphore: asyncio.Semaphore = None
+        self._task: asyncio.Future = None
+
+    @staticmethod
+    def key(uri: str, num_labels: int, page_size: int, sort_by: SortField) -> RecommendationKey:
+        return RecommendationKey(uri, num_labels, page_size, sort_by)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: RecommendationKey) -> bool:
+        return key in self._entries
+
+    def record(self, key: RecommendationKey):
+        """
+        Records a request for the given key
+        :param key:
+        :return:
+        """
+        self._frequencies[key] = self._frequencies.get(key, 0.0) + 1.0
+
+        # Bound the number of tracked keys by dropping the least frequently requested half
+        max_tracked = 10 * max(self.max_size, 1)
+        if len(self._frequencies) > max_tracked:
+            for least_requested in heapq.nsmallest(max_tracked // 2, self._frequencies, key=self._frequencies.get):
+                if least_requested not in self._entries:
+                    del self._frequencies[least_requested]
+
+    def get(self, key: RecommendationKey) -> Optional[dict]:
+        """
+        Records a request for the given key and returns its precomputed result, or None if it isn't in the store.
+        Stale results are returned, and refreshed in the background.
+        :param key:
+        :return:
+        """
+        self.record(key)
+
+        entry = self._entries.get(key)
+        if entry is None:
+            CACHE_MISSES.labels(self.NAME).inc()
+            return None
+
+        timestamp, result = entry
+        if monotonic() - timestamp > self.ttl:
+            self._schedule_refresh(key)
+
+        CACHE_HITS.labels(self.NAME).inc()
+        return result
+
+    def invalidate_uri(self, uri: str):
+        """
+        Removes precomputed results for the given uri (i.e when the page is republished). Requests for the uri fall
+        back to the live query path until the next refresh recomputes them.
+        :param uri:
+        :return:
+        """
+        uri = normalise_uri(uri)
+        for key in [key for key in self._entries if normalise_uri(key.uri) == uri]:
+            del self._entries[key]
+        CACHE_SIZE.labels(self.NAME).set(len(self._entries))
+
+    def hottest(self) -> List[RecommendationKey]:
+        """
+        Returns the (up to) max_size most requested keys
+        :return:
+        """
+        return heapq.nlargest(self.max_size, self._frequencies, key=self._frequencies.get)
+
+    def _schedule_refresh(self, key: RecommendationKey):
+        if key not in self._refreshing:
+            self._refreshing[key] = asyncio.ensure_future(self._refresh(key))
+
+    async def _refresh(self, key: RecommendationKey):
+        """
+        Computes and stores the result for the given key. Errors are logged and the existing (stale) result is kept.
+        :param key:
+        :return:
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.refresh_concurrency)
+
+        try:
+            async with self._semaphore:
+                result = await self.compute(key)
+            self._entries[key] = (monotonic(), result)
+            CACHE_SIZE.labels(self.NAME).set(len(self._entries))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error("Caught exception precomputing recommendations", exc_info=e, extra={
+                "uri": key.uri
+            })
+        finally:
+            self._refreshing.pop(key, None)
+
+    async def refresh(self):
+        """
+        Evicts results which are no longer among the most requested, computes results for those which are (and are
+        missing or stale) and decays request frequencies
+        :return:
+        """
+        hottest = self.hottest()
+        hot = set(hottest)
+
+        for key in list(self._entries.keys()):
+            if key not in hot:
+                del self._entries[key]
+        CACHE_SIZE.labels(self.NAME).set(len(self._entries))
+
+        now = monotonic()
+        for key in hottest:
+            entry = self._entries.get(key)
+            if entry is None or now - entry[0] > self.ttl:
+                self._schedule_refresh(key)
+        await asyncio.gather(*[self._refreshing[key] for key in hottest if key in self._refreshing])
+
+        for key in list(self._frequencies.keys()):
+            frequency = self._frequencies[key] * self.FREQUENCY_DECAY
+            if frequency < self.MIN_FREQUENCY and key not in self._entries:
+                del self._frequencies[key]
+            else:
+                self._frequencies[key] = frequency
+
+    async def run(self):
+        """
+        Refreshes the store every refresh_interval seconds, until cancelled
+        :return:
+        """
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error("Caught exception refreshing recommendation store", exc_info=e)
+
+    def start(self):
+        """
+        Starts the background refresh task. Must be called from within the running event loop.
+        :return:
+        """
+        if self._task is None:
+            self._task = asyncio.ensure_future(self.run())
+
+    async def stop(self):
+        """
+        Cancels the background refresh task, and any in-flight refreshes
+        :return:
+        """
+        tasks = list(self._refreshing.values())
+        if self._task is not None:
+            tasks.append(self._task)
+            self._task = None
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
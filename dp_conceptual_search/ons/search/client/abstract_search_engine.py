@@ -1,6 +1,6 @@
 import abc
 import logging as logger
-from typing import List
+from typing import List, Tuple
 
 from dp_conceptual_search.search.query_helper import match_by_uri
 from dp_conceptual_search.search.client.search_client import SearchClient
@@ -91,11 +91,31 @@ class AbstractSearchEngine(SearchClient, abc.ABC):
         s: AbstractSearchEngine = self._clone()
 
         # Calculate from_start param
-        from_start = 0 if current_page <= 1 else (current_page - 1) * size
+        from_start = self.from_start(current_page, size)
         end = from_start + size
 
         return s[from_start:end]
 
+    @staticmethod
+    def from_start(current_page: int, size: int) -> int:
+        """
+        Returns the index of the first hit on the given page
+        :param current_page:
+        :param size:
+        :return:
+        """
+        return 0 if current_page <= 1 else (current_page - 1) * size
+
+    def query_template_kwargs(self, **kwargs) -> Tuple[dict, dict]:
+        """
+        Splits the additional arguments of a query into the arguments used to build its query template (with markers
+        in place of request parameters) and the values of those request parameters. By default, all arguments are
+        part of the template.
+        :param kwargs:
+        :return:
+        """
+        return kwargs, {}
+
     @abc.abstractmethod
     def departments_query(
             self,
@@ -1,7 +1,7 @@
 from typing import List
 
 from dp_conceptual_search.search.query_helper import match_by_uri
-from dp_conceptual_search.search.search_type import SearchType
+from dp_conceptual_search.ons.search.search_type_policy import QueryKind, search_type_policy
 from dp_conceptual_search.ons.search.client.abstract_search_engine import AbstractSearchEngine
 from dp_conceptual_search.ons.search import SortField, AvailableTypeFilters, ContentType
 from dp_conceptual_search.ons.search.queries.ons_query_builders import (
@@ -36,7 +36,7 @@ class SearchEngine(AbstractSearchEngine):
         s: SearchEngine = self._clone() \
             .query(build_departments_query(search_term)) \
             .paginate(current_page, size) \
-            .search_type(SearchType.DFS_QUERY_THEN_FETCH)
+            .search_type(search_type_policy(QueryKind.DEPARTMENTS))
 
         return s
 
@@ -70,7 +70,7 @@ class SearchEngine(AbstractSearchEngine):
             .query(query) \
             .paginate(current_page, size) \
             .sort_by(sort_by) \
-            .search_type(SearchType.DFS_QUERY_THEN_FETCH)
+            .search_type(search_type_policy(QueryKind.CONTENT))
 
         if type_filters is not None:
             s: SearchEngine = s.type_filter(type_filters)
@@ -100,7 +100,7 @@ class SearchEngine(AbstractSearchEngine):
         # Setup the aggregations bucket
         s.aggs.bucket(self.agg_bucket, aggregations)
 
-        return s
+        return s.search_type(search_type_policy(QueryKind.TYPE_COUNTS))
 
     def featured_result_query(self, search_term):
         """
@@ -112,9 +112,25 @@ class SearchEngine(AbstractSearchEngine):
 
         page_size = 1  # Only want one hit
 
-        return self.content_query(search_term,
-                                  self.default_page_number,
-                                  page_size,
-                                  filter_functions=None,
-                                  type_filters=type_filters,
-                                  highlight=False)
+        s: SearchEngine = self.content_query(search_term,
+                                             self.default_page_number,
+                                             page_size,
+                                             filter_functions=None,
+                                             type_filters=type_filters,
+                                             highlight=False)
+
+        return s.search_type(search_type_policy(QueryKind.FEATURED))
+
+    def featured_pages_query(self, size: int):
+        """
+        Builds a query for (the ids of) all featured pages, used to build the featured result index. The page size is
+        set directly, as it may exceed the max request size of user queries.
+        :param size:
+        :return:
+        """
+        type_filters: List[ContentType] = AvailableTypeFilters.FEATURED.value.get_content_types()
+
+        return self._clone() \
+            .type_filter(type_filters) \
+            .source(False) \
+            .extra(from_=0, size=size)
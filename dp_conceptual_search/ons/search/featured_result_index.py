@@ -0,0 +1,294 @@
+"""
+In-memory index of the terms in featured pages (product and census home pages), used to skip the featured result
+query for search terms which can't match any featured page. The index is rebuilt periodically from Elasticsearch by a
+background task on the app event loop, and is backed by a negative cache of search terms known to have no featured
+result.
+
+Terms are those indexed by Elasticsearch (term vectors of the queried fields), and search terms are analysed with the
+search analyser of each queried field, so that terms which only match through synonyms or stemming aren't ruled out.
+"""
+import json
+import asyncio
+import logging
+from inspect import isawaitable
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from elasticsearch import Elasticsearch
+
+from dp_conceptual_search.cache import create_cache
+from dp_conceptual_search.ons.search.fields import AvailableFields, Field
+from dp_conceptual_search.ons.search.client.search_engine import SearchEngine
+
+# Fields queried by the featured result (content) query
+INDEXED_FIELDS: List[Field] = [
+    AvailableFields.TITLE_NO_DATES.value,
+    AvailableFields.TITLE_NO_STEM.value,
+    AvailableFields.TITLE.value,
+    AvailableFields.EDITION.value,
+    AvailableFields.SUMMARY.value,
+    AvailableFields.META_DESCRIPTION.value,
+    AvailableFields.KEYWORDS.value,
+    AvailableFields.CDID.value,
+    AvailableFields.DATASET_ID.value,
+    AvailableFields.SEARCH_BOOST.value
+]
+
+# Indexed terms, or analysed search term tokens, by field name
+FieldTerms = Dict[str, Set[str]]
+
+
+async def _result(response):
+    """
+    Awaits the response of the (async or sync) Elasticsearch client, if required
+    :param response:
+    :return:
+    """
+    if isawaitable(response):
+        response = await response
+    return response
+
+
+class FeaturedTerms(object):
+    """
+    Loads the terms of featured pages from Elasticsearch, and analyses search terms with the search analysers of the
+    queried fields
+    """
+    BATCH_SIZE = 500
+
+    def __init__(self, client: Elasticsearch, index: str, max_pages: int, fields: List[Field]=None):
+        """
+        :param client:
+        :param index:
+        :param max_pages: Max number of featured pages loaded
+        :param fields: Queried fields
+        """
+        self.client = client
+        self.index = index
+        self.max_pages = max_pages
+        self.fields = fields if fields is not None else INDEXED_FIELDS
+
+        # Body of the _analyze request for each field, set on load
+        self._analyze_requests: Dict[str, dict] = None
+
+    async def analyze_requests(self) -> Dict[str, dict]:
+        """
+        Returns the body of the _analyze request used to analyse search terms for each field: the field's
+        search_analyzer (or analyzer) if set in the mapping, otherwise the field itself
+        :return:
+        """
+        names = [field.name for field in self.fields]
+        response = await _result(self.client.indices.get_field_mapping(index=self.index, fields=",".join(names)))
+
+        analyzers = {}
+        for index_mappings in response.values():
+            for type_mappings in index_mappings.get("mappings", {}).values():
+                for name, field_mapping in type_mappings.items():
+                    for mapping in field_mapping.get("mapping", {}).values():
+                        analyzer = mapping.get("search_analyzer", mapping.get("analyzer"))
+                        if analyzer is not None:
+                            analyzers[name] = analyzer
+
+        return {name: {"analyzer": analyzers[name]} if name in analyzers else {"field": name} for name in names}
+
+    async def load(self) -> Optional[FieldTerms]:
+        """
+        Returns the terms of all featured pages by field, or None if there are more than max_pages featured pages
+        :return:
+        """
+        analyze_requests = await self.analyze_requests()
+
+        engine = SearchEngine(using=self.client, index=self.index).featured_pages_query(self.max_pages)
+        response = await engine.execute()
+
+        hits = list(response.hits)
+        if response.hits.total > len(hits):
+            logging.warning("Too many featured pages to index", extra={
+                "featured": {
+                    "pages": response.hits.total,
+                    "max_pages": self.max_pages
+                }
+            })
+            return None
+
+        names = [field.name for field in self.fields]
+        terms: FieldTerms = {name: set() for name in names}
+        for i in range(0, len(hits), self.BATCH_SIZE):
+            docs = [{"_id": hit.meta.id, "_type": hit.meta.doc_type} for hit in hits[i:i + self.BATCH_SIZE]]
+            term_vectors = await _result(self.client.mtermvectors(index=self.index, body={"docs": docs},
+                                                                  fields=",".join(names), positions=False,
+                                                                  offsets=False, payloads=False,
+                                                                  field_statistics=False, term_statistics=False))
+
+            for doc in term_vectors.get("docs", []):
+                for name, vectors in doc.get("term_vectors", {}).items():
+                    if name in terms:
+                        terms[name].update(vectors.get("terms", {}).keys())
+
+        self._analyze_requests = analyze_requests
+        return terms
+
+    async def analyze(self, search_term: str) -> FieldTerms:
+        """
+        Returns the tokens of the search term, analysed for each field. Fields sharing an analyser are analysed once.
+        :param search_term:
+        :return:
+        """
+        if self._analyze_requests is None:
+            raise RuntimeError("Featured terms must be loaded before analysing search terms")
+
+        fields_by_request = {}
+        for name, body in self._analyze_requests.items():
+            fields_by_request.setdefault(json.dumps(body, sort_keys=True), []).append(name)
+
+        requests = list(fields_by_request.keys())
+        responses = await asyncio.gather(*[
+            _result(self.client.indices.analyze(index=self.index, body={**json.loads(request), "text": search_term}))
+            for request in requests
+        ])
+
+        tokens: FieldTerms = {}
+        for request, response in zip(requests, responses):
+            request_tokens = {token["token"] for token in response.get("tokens", [])}
+            for name in fields_by_request[request]:
+                tokens[name] = request_tokens
+        return tokens
+
+
+class FeaturedResultIndex(object):
+    """
+    Decides locally when a search term can't have a featured result. A term may have a featured result if, for any
+    queried field, one of its (analysed) tokens is a term of that field in a featured page. Until the index has been
+    loaded (or if not all featured pages could be loaded), every term may have a featured result.
+    """
+    NAME = "featured_negative"
+    ANALYZED_NAME = "featured_analyzed"
+
+    def __init__(self, load: Callable[[], Awaitable[Optional[FieldTerms]]],
+                 analyze: Callable[[str], Awaitable[FieldTerms]], refresh_interval: float,
+                 negative_cache_max_size: int, negative_cache_ttl: float):
+        """
+        :param load: Coroutine function which returns the terms of all featured pages by field (or None if they
+        couldn't all be loaded)
+        :param analyze: Coroutine function which returns the tokens of a search term, analysed for each field
+        :param refresh_interval: Time (in seconds) between rebuilds of the index
+        :param negative_cache_max_size: Max number of search terms known to have no featured result (and of analysed
+        search terms)
+        :param negative_cache_ttl: Time-to-live (in seconds) of search terms known to have no featured result
+        """
+        self.load = load
+        self.analyze = analyze
+        self.refresh_interval = refresh_interval
+        self.negative_cache = create_cache(self.NAME, negative_cache_max_size, ttl=negative_cache_ttl)
+        self.analyzed_cache = create_cache(self.ANALYZED_NAME, negative_cache_max_size, ttl=negative_cache_ttl)
+
+        # None until loaded
+        self._terms: FieldTerms = None
+
+        self._task: asyncio.Future = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._terms is not None
+
+    def build(self, terms: Optional[FieldTerms]):
+        """
+        Rebuilds the index from the terms of all featured pages (None if they couldn't all be loaded, in which case
+        every term may have a featured result), and clears the negative cache
+        :param terms:
+        :return:
+        """
+        self._terms = terms
+        self.negative_cache.clear()
+        self.analyzed_cache.clear()
+
+    async def analyzed(self, search_term: str) -> FieldTerms:
+        """
+        Returns the (cached) tokens of the search term, analysed for each field
+        :param search_term:
+        :return:
+        """
+        tokens = self.analyzed_cache.get(search_term)
+        if tokens is None:
+            tokens = {name: sorted(field_tokens) for name, field_tokens in (await self.analyze(search_term)).items()}
+            self.analyzed_cache[search_term] = tokens
+        return {name: set(field_tokens) for name, field_tokens in tokens.items()}
+
+    async def may_have_featured_result(self, search_term: str) -> bool:
+        """
+        Returns False if the search term is known not to have a featured result
+        :param search_term:
+        :return:
+        """
+        if self.negative_cache.get(search_term, False):
+            return False
+
+        terms = self._terms
+        if terms is None:
+            return True
+
+        try:
+            tokens = await self.analyzed(search_term)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error("Caught exception analysing search term for featured result index", exc_info=e)
+            return True
+
+        if not any(tokens.values()):
+            return True
+        return any(not field_tokens.isdisjoint(terms.get(name, ())) for name, field_tokens in tokens.items())
+
+    def record_no_featured_result(self, search_term: str):
+        """
+        Records that the featured result query for the search term returned no hits
+        :param search_term:
+        :return:
+        """
+        self.negative_cache[search_term] = True
+
+    async def refresh(self):
+        """
+        Reloads featured pages and rebuilds the index. Errors are logged, and the existing index is kept.
+        :return:
+        """
+        try:
+            terms = await self.load()
+            self.build(terms)
+
+            logging.debug("Rebuilt featured result index", extra={
+                "index": {
+                    "loaded": self.loaded,
+                    "terms": sum(len(field_terms) for field_terms in terms.values()) if terms is not None else 0
+                }
+            })
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error("Caught exception rebuilding featured result index", exc_info=e)
+
+    async def run(self):
+        """
+        Rebuilds the index immediately, then every refresh_interval seconds until cancelled
+        :return:
+        """
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self):
+        """
+        Starts the background refresh task. Must be called from within the running event loop.
+        :return:
+        """
+        if self._task is None:
+            self._task = asyncio.ensure_future(self.run())
+
+    async def stop(self):
+        """
+        Cancels the background refresh task
+        :return:
+        """
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
@@ -0,0 +1,91 @@
+"""
+Single-pass transformer which shapes the raw Elasticsearch hits JSON into search API results, applying highlighter
+fragments as it goes. Hits are transformed in place, without wrapping them in elasticsearch_dsl Hit objects or copying
+them, and can be transformed lazily (i.e while streaming a response).
+"""
+from typing import Iterable, Iterator, List
+
+DESCRIPTION_FIELD_NAME = "description"
+
+
+def set_value(source: dict, field_name: str, original_value: str, new_value: str):
+    """
+    Sets a value in the hit _source using '.' notation. Elements of list fields under the page description are only
+    replaced if they match the original (un-highlighted) value.
+    :param source:
+    :param field_name:
+    :param original_value:
+    :param new_value:
+    :return:
+    """
+    if field_name in source:
+        source[field_name] = new_value
+    elif "." in field_name:
+        parts = field_name.split(".")
+        if parts[0] == DESCRIPTION_FIELD_NAME and len(parts) <= 2:
+            description = source[DESCRIPTION_FIELD_NAME]
+            description_field = parts[1]
+
+            value = description[description_field]
+            if isinstance(value, list):
+                try:
+                    value[value.index(original_value)] = new_value
+                except ValueError:
+                    pass
+            else:
+                description[description_field] = new_value
+    else:
+        raise Exception("Unable to set field %s" % field_name)
+
+
+def transform_hits(hits: List[dict], tag: str="strong") -> List[dict]:
+    """
+    Transforms a list of raw Elasticsearch hits into search results (see iter_transform_hits)
+    :param hits:
+    :param tag:
+    :return:
+    """
+    return list(iter_transform_hits(hits, tag=tag))
+
+
+def iter_transform_hits(hits: Iterable[dict], tag: str="strong") -> Iterator[dict]:
+    """
+    Lazily transforms raw Elasticsearch hits into search results: the _source of each hit (merged with any stored
+    fields) with its _type, and with each highlighted field replaced by its highlighter fragment. The results are the
+    (modified) _source dicts of the given hits.
+    :param hits:
+    :param tag:
+    :return:
+    """
+    open_tag = "<{tag}>".format(tag=tag)
+    close_tag = "</{tag}>".format(tag=tag)
+    open_tag_length = len(open_tag)
+
+    for hit in hits:
+        source = hit.get("_source")
+        if source is None:
+            source = {}
+        if "fields" in hit:
+            source.update(hit["fields"])
+
+        # Remap type field
+        source["_type"] = hit.get("_type")
+
+        highlight = hit.get("highlight")
+        if highlight:
+            for field_name, fragments in highlight.items():
+                for fragment in fragments:
+                    if not isinstance(fragment, str):
+                        continue
+
+                    idx_start = fragment.find(open_tag)
+                    if idx_start == -1:
+                        continue
+                    idx_end = fragment.find(close_tag)
+                    if idx_end == -1:
+                        continue
+
+                    original_value = fragment[idx_start + open_tag_length:idx_end].strip()
+                    set_value(source, field_name, original_value, fragment)
+
+        yield source
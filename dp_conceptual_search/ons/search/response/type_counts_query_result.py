@@ -21,6 +21,19 @@ class TypeCountsQueryResult(SearchResult):
             self.doc_counts_key: result
         }
 
+    @classmethod
+    def from_dict(cls, data: dict) -> 'TypeCountsQueryResult':
+        """
+        Rebuilds a result from its (cached) JSON response, without the original aggregations
+        :param data:
+        :return:
+        """
+        result = cls.__new__(cls)
+        result.aggregations = None
+        result._aggs_json = (data[cls.number_of_results_key], data[cls.doc_counts_key])
+        result._data = data
+        return result
+
     def aggs_to_json(self):
         if self._aggs_json is None:
             self._aggs_json = self._aggs_to_json()
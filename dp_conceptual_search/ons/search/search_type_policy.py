@@ -0,0 +1,31 @@
+"""
+Search type policies: the Elasticsearch search_type used for each kind of ONS query, defined in config. DFS query then
+fetch adds a distributed phase to gather global term statistics, which can be skipped (with query then fetch) for
+queries where exact scoring hardly matters, such as type counts and featured result queries. Policies are parsed
+(and validated) when config is loaded.
+"""
+from enum import Enum
+
+from dp_conceptual_search.config.config import SEARCH_CONFIG
+from dp_conceptual_search.search.search_type import SearchType
+
+
+class QueryKind(Enum):
+    CONTENT = "content"
+    DEPARTMENTS = "departments"
+    CONCEPTUAL_CONTENT = "conceptual_content"
+    TYPE_COUNTS = "type_counts"
+    FEATURED = "featured"
+    RECOMMENDATION = "recommendation"
+
+    def __str__(self):
+        return self.value
+
+
+def search_type_policy(query_kind: QueryKind) -> SearchType:
+    """
+    Returns the configured search type for the given kind of query
+    :param query_kind:
+    :return:
+    """
+    return getattr(SEARCH_CONFIG, "{0}_search_type".format(query_kind.value))
@@ -0,0 +1,113 @@
+"""
+Client for sending several search requests to Elasticsearch in a single _msearch round trip
+"""
+from typing import List
+from inspect import isawaitable
+
+from elasticsearch.exceptions import TransportError
+from elasticsearch_dsl.connections import connections
+
+from dp4py_logging.time import timeit
+
+from dp_conceptual_search.search.client.search_client import SearchClient
+
+
+class MultiSearchClient(object):
+    """
+    Combines a list of SearchClient instances into one _msearch request and splits the responses back out, wrapping
+    each in the response class of the SearchClient which produced it. If any search executes a stored search template,
+    the request is sent to _msearch/template, with the body of every other search sent as an inline template.
+    """
+    def __init__(self, using="default"):
+        """
+        Initialise the MultiSearchClient
+        :param using: Elasticsearch client (or connection alias) used to send the request
+        """
+        self._using = using
+        self._searches: List[SearchClient] = []
+
+    def add(self, search: SearchClient):
+        """
+        Adds a search request to the _msearch body
+        :param search:
+        :return:
+        """
+        self._searches.append(search)
+        return self
+
+    @property
+    def is_templated(self) -> bool:
+        return any(search.is_templated for search in self._searches)
+
+    def __len__(self):
+        return len(self._searches)
+
+    def _get_elasticsearch_client(self):
+        """
+        Return a living connection to the underlying Elasticsearch client
+        :return:
+        """
+        return connections.get_connection(self._using)
+
+    def to_dict(self) -> List[dict]:
+        """
+        Serialises all search requests into the newline delimited header/body format expected by _msearch (or
+        _msearch/template)
+        :return:
+        """
+        body = []
+        templated = self.is_templated
+
+        search: SearchClient
+        for search in self._searches:
+            header = {}
+            if search._index:
+                header["index"] = search._index
+            if search._get_doc_type():
+                header["type"] = search._get_doc_type()
+            # Request params (i.e search_type) are set per search
+            header.update(search._params)
+
+            body.append(header)
+            if templated and not search.is_templated:
+                # Send as an inline template
+                body.append({"source": search.to_dict()})
+            else:
+                body.append(search.to_dict())
+
+        return body
+
+    async def _msearch(self) -> dict:
+        """
+        Execute the _msearch request and return the raw response
+        If the response is a co-routine, then await it
+        :return:
+        """
+        es = self._get_elasticsearch_client()
+
+        msearch = es.msearch_template if self.is_templated else es.msearch
+        response = msearch(body=self.to_dict())
+
+        if isawaitable(response):
+            response = await response
+        return response
+
+    @timeit
+    async def execute(self) -> list:
+        """
+        Sends the _msearch request and returns one response per search, in the order they were added. Raises a
+        TransportError if any individual search failed.
+        :return:
+        """
+        raw_response = await self._msearch()
+
+        responses = []
+        for search, response in zip(self._searches, raw_response["responses"]):
+            if response.get("error", False):
+                error = response["error"]
+                error_type = error.get("type") if isinstance(error, dict) else error
+                raise TransportError(response.get("status", "N/A"), error_type, error)
+
+            responses.append(search._response_class(search, response))
+
+        return responses
@@ -29,6 +29,12 @@ class SearchClient(Search):
         # Define response class object
         self._response_class = response_class
 
+        # Prebuilt request body (see with_body), which overrides the query
+        self._body = None
+
+        # Whether the body is a stored search template request (see with_template)
+        self._templated = False
+
     def __getitem__(self, n):
         """
         Support slicing the `Search` instance for pagination.
@@ -43,13 +49,62 @@ class SearchClient(Search):
 
         """
         if isinstance(n, slice):
-            size = n.stop - n.start
-            if size > CONFIG.SEARCH.max_request_size:
-                raise RequestSizeExceededException(size, CONFIG.SEARCH.max_request_size)
+            self.check_request_size(n.stop - n.start)
 
         # Check passes, invoke super method
         return super(SearchClient, self).__getitem__(n)
 
+    @staticmethod
+    def check_request_size(size: int):
+        """
+        Raises a RequestSizeExceededException if the requested page size exceeds the max allowed
+        :param size:
+        :return:
+        """
+        if size > CONFIG.SEARCH.max_request_size:
+            raise RequestSizeExceededException(size, CONFIG.SEARCH.max_request_size)
+
+    def with_body(self, body: dict, **params):
+        """
+        Returns a copy of this search which sends the given (prebuilt) request body and params, i.e a rendered
+        QueryTemplate. Must be the last step in building a query, as the body overrides any query options.
+        :param body:
+        :param params:
+        :return:
+        """
+        s: SearchClient = self.params(**params)
+        s._body = body
+        return s
+
+    def with_template(self, template_id: str, template_params: dict, **params):
+        """
+        Returns a copy of this search which executes the stored search template with the given id and template
+        parameters (using search_template). Must be the last step in building a query, as the template overrides any
+        query options.
+        :param template_id:
+        :param template_params:
+        :param params: Request params (i.e search_type)
+        :return:
+        """
+        s: SearchClient = self.with_body({"id": template_id, "params": template_params}, **params)
+        s._templated = True
+        return s
+
+    @property
+    def is_templated(self) -> bool:
+        return self._templated
+
+    def to_dict(self, count=False, **kwargs):
+        """
+        Serialises the search request body, or returns the prebuilt body (or stored search template request) if set
+        :param count:
+        :param kwargs:
+        :return:
+        """
+        if self._body is not None and not count and len(kwargs) == 0:
+            return self._body
+        return super(SearchClient, self).to_dict(count=count, **kwargs)
+
     def _get_elasticsearch_client(self):
         """
         Return a living connection to the underlying Elasticsearch client
@@ -67,7 +122,8 @@ class SearchClient(Search):
         """
         es = self._get_elasticsearch_client()
 
-        response = es.search(
+        search = es.search_template if self.is_templated else es.search
+        response = search(
             index=self._index,
             doc_type=self._get_doc_type(),
             body=self.to_dict(),
@@ -0,0 +1,15 @@
+"""
+Enum of available encodings for vector script score params
+"""
+from enum import Enum
+
+
+class VectorEncoding(Enum):
+    JSON = "json"  # JSON array of floats (the 'vector' param)
+    BASE64 = "base64"  # Base64 string, encoded as per the stored embedding vectors (the 'encoded_vector' param)
+
+    def __str__(self):
+        return self.value
+
+    def __repr__(self):
+        return self.value
@@ -1,27 +1,72 @@
 """
 Defines a vector score query object
 """
-from numpy import ndarray
+from typing import Any, Tuple
 
+from numpy import ndarray, float64, round as round_vector
+
+from dp_fasttext.ml.utils import encode_float_list
+
+from dp_conceptual_search.config.config import SEARCH_CONFIG
 from dp_conceptual_search.search.dsl.scripts import Scripts
 from dp_conceptual_search.search.dsl.script_score import ScriptScore
 from dp_conceptual_search.search.dsl.script_language import ScriptLanguage
+from dp_conceptual_search.search.dsl.vector_encoding import VectorEncoding
+
+
+def default_vector_encoding() -> VectorEncoding:
+    return VectorEncoding(SEARCH_CONFIG.vector_encoding)
+
+
+def encode_vector(vector: ndarray, encoding: VectorEncoding=None, precision: int=None) -> Tuple[str, Any]:
+    """
+    Encodes a vector as a script param, returning the param name and value. Query template markers (see
+    query_template.vector_marker) are returned as is.
+    :param vector:
+    :param encoding: Defaults to the configured SEARCH_VECTOR_ENCODING
+    :param precision: Number of decimal places of JSON encoded vectors (defaults to the configured
+    SEARCH_VECTOR_PRECISION, 0 for full precision)
+    :return:
+    """
+    if encoding is None:
+        encoding = default_vector_encoding()
+    if precision is None:
+        precision = SEARCH_CONFIG.vector_precision
+
+    if hasattr(vector, "marker_name"):
+        value = vector.tolist()
+    elif encoding == VectorEncoding.BASE64:
+        value = encode_float_list(vector)
+    elif precision > 0:
+        # Round as float64, as rounded float32 values aren't the nearest doubles to the rounded decimals (and so
+        # serialise to long, unrounded JSON numbers)
+        value = round_vector(vector.astype(float64, copy=False), precision).tolist()
+    else:
+        value = vector.tolist()
+
+    name = "encoded_vector" if encoding == VectorEncoding.BASE64 else "vector"
+    return name, value
 
 
 class VectorScriptScore(ScriptScore):
-    def __init__(self, field: str, vector: ndarray, cosine: bool=True):
+    def __init__(self, field: str, vector: ndarray, cosine: bool=True, encoding: VectorEncoding=None,
+                 precision: int=None):
         """
         Defines a vector score function to be used with the binary-vector-scoring Elasticsearch plugin
         :param field:
         :param vector:
         :param cosine:
+        :param encoding: Encoding of the vector param (see encode_vector)
+        :param precision: Number of decimal places of JSON encoded vectors (see encode_vector)
         """
+        vector_param, encoded_vector = encode_vector(vector, encoding=encoding, precision=precision)
+
         super(VectorScriptScore, self).__init__(**{
             "lang": ScriptLanguage.K_NEAREST_NEIGHBOURS.value,
             "params": {
                 "cosine": cosine,
                 "field": field,
-                "vector": vector.tolist()
+                vector_param: encoded_vector
             },
             "script": Scripts.BINARY_VECTOR_SCORE.value
         })
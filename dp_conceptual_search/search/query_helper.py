@@ -5,15 +5,24 @@ from elasticsearch_dsl import query as Q
 from dp_conceptual_search.search.dsl.script_score import ScriptScore
 
 
-def match_by_uri(uri: str) -> Q.Query:
+def normalise_uri(uri: str) -> str:
     """
-    Match a document by its uri
+    Returns the uri with a leading slash, as used for document ids
     :param uri:
     :return:
     """
     if not uri.startswith("/"):
         uri = "/" + uri
-    return Q.Match(_id=uri)
+    return uri
+
+
+def match_by_uri(uri: str) -> Q.Query:
+    """
+    Match a document by its uri
+    :param uri:
+    :return:
+    """
+    return Q.Match(_id=normalise_uri(uri))
 
 
 def match(field: str, search_term: str, **kwargs) -> Q.Query:
@@ -0,0 +1,168 @@
+"""
+Precompiled query templates. A template is the request body of a fully built query, serialised once with markers in
+place of the search term (and any other request parameters), and compiled into a tree of the (few) paths which hold
+request parameters. Rendering a template copies only the containers along those paths, splicing in the request
+parameters and pagination, so the elasticsearch_dsl query tree is neither rebuilt nor re-serialised per request.
+"""
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+from numpy import ndarray, zeros
+
+from dp_conceptual_search.search.client.search_client import SearchClient
+
+MARKER_PATTERN = re.compile(r"^\u0000(\w+)\u0000$")
+
+SEARCH_TERM = "search_term"
+
+FROM_KEY = "from"
+SIZE_KEY = "size"
+
+
+def marker(name: str) -> str:
+    """
+    Returns the marker which stands in for the named request parameter when building a query template
+    :param name:
+    :return:
+    """
+    return "\u0000{name}\u0000".format(name=name)
+
+
+class VectorMarker(ndarray):
+    """
+    Empty vector which stands in for a vector request parameter when building a query template, by serialising (via
+    tolist) as the marker of the named parameter
+    """
+    marker_name: str = None
+
+    def tolist(self):
+        return marker(self.marker_name)
+
+
+def vector_marker(name: str) -> ndarray:
+    """
+    Returns a vector which stands in for the named vector request parameter when building a query template
+    :param name:
+    :return:
+    """
+    vector: VectorMarker = zeros(0).view(VectorMarker)
+    vector.marker_name = name
+    return vector
+
+
+SEARCH_TERM_MARKER = marker(SEARCH_TERM)
+
+
+class _Slot(object):
+    """
+    Placeholder for a request parameter in a compiled template
+    """
+    def __init__(self, name: str):
+        self.name = name
+
+
+def _compile(node: Any) -> Optional[Any]:
+    """
+    Compiles a (sub-tree of a) request body into a tree of slots, or returns None if it holds no request parameters
+    :param node:
+    :return:
+    """
+    if isinstance(node, str):
+        match = MARKER_PATTERN.match(node)
+        if match is not None:
+            return _Slot(match.group(1))
+        if "\u0000" in node:
+            raise ValueError("Request parameters must be the whole value of a field in query template, got '{0}'"
+                             .format(node.replace("\u0000", "")))
+        return None
+
+    if isinstance(node, dict):
+        children = ((key, _compile(value)) for key, value in node.items())
+    elif isinstance(node, list):
+        children = ((idx, _compile(value)) for idx, value in enumerate(node))
+    else:
+        return None
+
+    slots = {key: child for key, child in children if child is not None}
+    return slots if len(slots) > 0 else None
+
+
+def _render(node: Any, slots: Any, params: Dict[str, Any]) -> Any:
+    """
+    Renders a (sub-tree of a) request body, copying only the containers which hold request parameters
+    :param node:
+    :param slots:
+    :param params:
+    :return:
+    """
+    if isinstance(slots, _Slot):
+        return params[slots.name]
+
+    copy = dict(node) if isinstance(node, dict) else list(node)
+    for key, child_slots in slots.items():
+        copy[key] = _render(node[key], child_slots, params)
+    return copy
+
+
+def _slot_names(slots: Any) -> List[str]:
+    if isinstance(slots, _Slot):
+        return [slots.name]
+    return [name for child_slots in slots.values() for name in _slot_names(child_slots)]
+
+
+class QueryTemplate(object):
+    """
+    Request body (and request params) of a query, with the search term, any other request parameters and pagination
+    spliced in on render. Rendered bodies share all unparameterised sub-trees with the template, so must be treated as
+    read-only.
+    """
+    def __init__(self, body: dict, params: dict):
+        """
+        :param body: Request body built with markers in place of request parameters
+        :param params: Request params (i.e search_type)
+        """
+        self.body = body
+        self.params = params
+        self._slots = _compile(body) or {}
+        self._slot_names = sorted(set(_slot_names(self._slots)))
+
+    @classmethod
+    def build(cls, build_query: Callable[..., SearchClient], **kwargs) -> 'QueryTemplate':
+        """
+        Builds a template from the query returned by build_query, called with SEARCH_TERM_MARKER as the search term
+        :param build_query:
+        :param kwargs: Additional arguments for build_query (i.e markers for other request parameters)
+        :return:
+        """
+        s: SearchClient = build_query(SEARCH_TERM_MARKER, **kwargs)
+        return cls(s.to_dict(), dict(s._params))
+
+    @property
+    def slot_names(self) -> List[str]:
+        """
+        Returns the (distinct) names of all request parameters in the template
+        :return:
+        """
+        return self._slot_names
+
+    def render(self, search_term: str, from_start: int=None, size: int=None, **params) -> dict:
+        """
+        Renders the request body for the given search term, request parameters and (optional) pagination. Pagination
+        is only applied if the template query was paginated.
+        :param search_term:
+        :param from_start:
+        :param size:
+        :param params: Values of other request parameters
+        :return:
+        """
+        params[SEARCH_TERM] = search_term
+
+        # The top level body is always copied, so pagination can be set
+        body = _render(self.body, self._slots, params)
+
+        if from_start is not None and FROM_KEY in body:
+            body[FROM_KEY] = from_start
+        if size is not None and SIZE_KEY in body:
+            body[SIZE_KEY] = size
+
+        return body
@@ -0,0 +1,196 @@
+"""
+Elasticsearch stored search templates. A stored template is the mustache source of a QueryTemplate, registered with
+Elasticsearch (see put_script) so that queries can be executed with search_template/msearch_template, sending only the
+template id and request parameters rather than the full query body.
+"""
+import re
+import asyncio
+import logging
+from json import dumps, loads
+from hashlib import sha1
+from inspect import isawaitable
+from typing import Any, Dict, Optional, Tuple
+
+from elasticsearch import Elasticsearch
+
+from dp_conceptual_search.cache import CacheBackendType, create_cache
+from dp_conceptual_search.search.query_template import QueryTemplate, marker, SEARCH_TERM, FROM_KEY, SIZE_KEY
+
+TO_JSON_PATTERN = re.compile(r"{{#toJson}}(\w+){{/toJson}}")
+
+
+def to_json_tag(name: str) -> str:
+    """
+    Returns the mustache tag which renders the named parameter as JSON
+    :param name:
+    :return:
+    """
+    return "{{{{#toJson}}}}{name}{{{{/toJson}}}}".format(name=name)
+
+
+class StoredSearchTemplate(object):
+    """
+    Mustache search template (and request params) compiled from a QueryTemplate. The template id is derived from the
+    source, so registering the same template from several workers (or across restarts) is idempotent.
+    """
+    LANG = "mustache"
+
+    def __init__(self, template_id: str, source: str, params: dict, pagination: Dict[str, int]=None):
+        """
+        :param template_id:
+        :param source: Mustache source of the request body
+        :param params: Request params (i.e search_type)
+        :param pagination: Pagination of the template query, used when a request doesn't specify from/size
+        """
+        self.template_id = template_id
+        self.source = source
+        self.params = params
+        self.pagination = pagination if pagination is not None else {}
+
+    @classmethod
+    def from_query_template(cls, prefix: str, template: QueryTemplate) -> 'StoredSearchTemplate':
+        """
+        Compiles a QueryTemplate into a stored search template, replacing each request parameter (and pagination)
+        with a mustache tag which renders its JSON value
+        :param prefix: Prefix of the template id
+        :param template:
+        :return:
+        """
+        names = template.slot_names
+        params = {name: marker(name) for name in names if name != SEARCH_TERM}
+        pagination = {key: template.body[key] for key in (FROM_KEY, SIZE_KEY) if key in template.body}
+
+        body = template.render(marker(SEARCH_TERM), from_start=marker(FROM_KEY), size=marker(SIZE_KEY), **params)
+
+        source = dumps(body)
+        for name in names + list(pagination.keys()):
+            source = source.replace(dumps(marker(name)), to_json_tag(name))
+
+        template_id = "{prefix}-{digest}".format(prefix=prefix, digest=sha1(source.encode()).hexdigest()[:16])
+        return cls(template_id, source, template.params, pagination=pagination)
+
+    def request_params(self, search_term: str, from_start: int=None, size: int=None, **params) -> Dict[str, Any]:
+        """
+        Returns the template parameters for a request. Pagination defaults to that of the template query.
+        :param search_term:
+        :param from_start:
+        :param size:
+        :param params: Values of other request parameters
+        :return:
+        """
+        params.update(self.pagination)
+        params[SEARCH_TERM] = search_term
+        if from_start is not None and FROM_KEY in self.pagination:
+            params[FROM_KEY] = from_start
+        if size is not None and SIZE_KEY in self.pagination:
+            params[SIZE_KEY] = size
+        return params
+
+    def render(self, params: Dict[str, Any]) -> dict:
+        """
+        Renders the request body locally, as Elasticsearch would for the given template parameters
+        :param params:
+        :return:
+        """
+        return loads(TO_JSON_PATTERN.sub(lambda match: dumps(params[match.group(1)]), self.source))
+
+    def to_dict(self) -> dict:
+        """
+        Returns the put_script request body
+        :return:
+        """
+        return {
+            "script": {
+                "lang": self.LANG,
+                "source": self.source
+            }
+        }
+
+    async def put(self, client: Elasticsearch):
+        """
+        Registers the template with Elasticsearch
+        :param client:
+        :return:
+        """
+        response = client.put_script(id=self.template_id, body=self.to_dict())
+        if isawaitable(response):
+            await response
+
+
+class StoredSearchTemplates(object):
+    """
+    Registry of the stored search templates of an app. Templates are registered in the background on first use, and
+    are only returned once registered (until then, queries should send the rendered body).
+    """
+    NAME = "stored_search_templates"
+    TEMPLATE_ID_PREFIX = "dp-conceptual-search"
+
+    def __init__(self, client: Elasticsearch, max_size: int):
+        """
+        :param client: Elasticsearch client used to register templates
+        :param max_size: Max number of templates tracked by the registry
+        """
+        self.client = client
+
+        # Templates, with whether they are registered, keyed by query template key
+        self._templates = create_cache(self.NAME, max_size, backend=CacheBackendType.MEMORY)
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    def get(self, key: Tuple, name: str, query_template: QueryTemplate) -> Optional[StoredSearchTemplate]:
+        """
+        Returns the stored search template for a query template if it is registered, otherwise starts registering it
+        (on the running event loop) and returns None
+        :param key: Key of the query template
+        :param name: Name of the query, used in the template id
+        :param query_template:
+        :return:
+        """
+        entry = self._templates.get(key)
+        if entry is None:
+            prefix = "{0}-{1}".format(self.TEMPLATE_ID_PREFIX, name)
+            entry = [StoredSearchTemplate.from_query_template(prefix, query_template), False]
+            self._templates[key] = entry
+
+        template, registered = entry
+        if registered:
+            return template
+
+        if template.template_id not in self._pending:
+            self._pending[template.template_id] = asyncio.ensure_future(self._register(entry))
+        return None
+
+    async def _register(self, entry: list):
+        """
+        Registers a template with Elasticsearch, marking it as registered on success. Errors are logged, and the
+        template will be registered again on next use.
+        :param entry:
+        :return:
+        """
+        template: StoredSearchTemplate = entry[0]
+        try:
+            await template.put(self.client)
+            entry[1] = True
+
+            logging.debug("Registered stored search template", extra={
+                "template": {
+                    "id": template.template_id
+                }
+            })
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error("Caught exception registering stored search template", exc_info=e, extra={
+                "template": {
+                    "id": template.template_id
+                }
+            })
+        finally:
+            self._pending.pop(template.template_id, None)
+
+    async def wait(self):
+        """
+        Waits for all pending registrations to complete
+        :return:
+        """
+        if len(self._pending) > 0:
+            await asyncio.gather(*self._pending.values(), return_exceptions=True)
@@ -0,0 +1,60 @@
+"""
+Benchmarks recall@k and latency of the approximate nearest-neighbour (IVF) index against exact similarity search over
+the unsupervised model, for a range of n_probe values.
+
+Usage (from the repository root):
+    python scripts/benchmarks/benchmark_ann_recall.py [model.vec] [top_n] [num_queries] [num_lists]
+"""
+import os
+import sys
+from time import perf_counter
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from dp_conceptual_search.config import CONFIG
+from dp_conceptual_search.ml.word_embedding.ivf_index import IVFIndex
+from dp_conceptual_search.ml.word_embedding.fastText.unsupervised import UnsupervisedModel
+
+
+def benchmark(filename: str, top_n: int, num_queries: int, num_lists: int):
+    model = UnsupervisedModel(filename)
+    vectors_norm = model.vectors_norm
+
+    # Query with (perturbed) vocabulary vectors
+    random_state = np.random.RandomState(0)
+    queries = vectors_norm[random_state.choice(len(vectors_norm), num_queries, replace=False)]
+    queries = UnsupervisedModel.normalise(queries + 0.1 * random_state.randn(*queries.shape).astype(queries.dtype))
+
+    start = perf_counter()
+    index = IVFIndex.build(vectors_norm, num_lists=num_lists)
+    print("built index with {0} lists over {1} vectors in {2:.1f} s".format(
+        index.num_lists, index.num_vectors, perf_counter() - start))
+
+    start = perf_counter()
+    exact = [set(np.argsort(-vectors_norm.dot(query))[:top_n]) for query in queries]
+    exact_latency = (perf_counter() - start) / num_queries
+    print("exact: {0:.2f} ms per query".format(exact_latency * 1000.0))
+
+    n_probe = 1
+    while n_probe <= index.num_lists:
+        hits = 0
+        start = perf_counter()
+        for query, expected in zip(queries, exact):
+            indices, _ = index.search(vectors_norm, query, top_n, n_probe=n_probe)
+            hits += len(expected.intersection(indices))
+        latency = (perf_counter() - start) / num_queries
+
+        print("n_probe={0:<4} recall@{1}={2:.3f} {3:.2f} ms per query".format(
+            n_probe, top_n, hits / float(top_n * num_queries), latency * 1000.0))
+        n_probe *= 2
+
+
+if __name__ == "__main__":
+    model_filename = sys.argv[1] if len(sys.argv) > 1 else CONFIG.ML.unsupervised_model_filename
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    n = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    lists = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+
+    benchmark(model_filename, k, n, lists)
@@ -0,0 +1,73 @@
+"""
+Offline benchmark of ConceptualSearchEngine.conceptual_search_params, through the dp-fasttext client pool, against a
+local stand-in dp-fasttext server.
+
+Usage (from the repository root):
+    python scripts/benchmarks/benchmark_conceptual_search_params.py [latency_ms] [iterations] [pool_size]
+"""
+import os
+import sys
+import asyncio
+from time import perf_counter
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from dp_conceptual_search.ons.conceptual.client import FastTextClientService, FastTextClientPool, \
+    ConceptualSearchEngine
+from dp_conceptual_search.ons.conceptual.client.testing import StandInFastTextServer
+
+
+async def benchmark(latency: float, iterations: int, pool_size: int):
+    engine = ConceptualSearchEngine()
+    cache = ConceptualSearchEngine.conceptual_search_params_cache
+
+    async with StandInFastTextServer(latency=latency) as server:
+        pool = FastTextClientPool(server.host, server.port, pool_size, 5.0)
+        await pool.open()
+        FastTextClientService.set_pool(pool)
+
+        try:
+            # Uncached lookups
+            start = perf_counter()
+            for i in range(iterations):
+                cache.clear()
+                await engine.conceptual_search_params("rpi inflation", 5, 0.0)
+            elapsed = (perf_counter() - start) / iterations
+
+            print("uncached: {0:.1f} ms per lookup ({1:.1f} round trips, {2} requests per lookup)".format(
+                elapsed * 1000.0, elapsed / latency, len(server.requests) // iterations))
+
+            # Burst of identical lookups
+            num_requests = len(server.requests)
+            cache.clear()
+            start = perf_counter()
+            await asyncio.gather(*[engine.conceptual_search_params("rpi inflation", 5, 0.0)
+                                   for i in range(iterations)])
+            elapsed = perf_counter() - start
+
+            print("burst of {0} identical lookups: {1:.1f} ms, {2} upstream requests".format(
+                iterations, elapsed * 1000.0, len(server.requests) - num_requests))
+
+            # Burst of distinct lookups, bounded by the pool size
+            num_requests = len(server.requests)
+            cache.clear()
+            start = perf_counter()
+            await asyncio.gather(*[engine.conceptual_search_params("rpi inflation {0}".format(i), 5, 0.0)
+                                   for i in range(iterations)])
+            elapsed = perf_counter() - start
+
+            print("burst of {0} distinct lookups: {1:.1f} ms, {2} upstream requests, max {3} in flight".format(
+                iterations, elapsed * 1000.0, len(server.requests) - num_requests, server.max_in_flight))
+            print("cache stats: {0}".format(cache.stats()))
+        finally:
+            FastTextClientService.set_pool(None)
+            await pool.close()
+
+
+if __name__ == "__main__":
+    latency_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 20.0
+    num_iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    num_clients = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(benchmark(latency_ms / 1000.0, num_iterations, num_clients))
@@ -0,0 +1,152 @@
+"""
+Micro-benchmark of search response shaping for pages of highlighted hits: the previous approach (wrapping the response
+in elasticsearch_dsl Hit objects, copying each hit into a DotDict and applying highlights) against the single-pass
+hit transformer. Both produce the same results, which is checked before timing.
+
+Usage (from the repository root):
+    python scripts/benchmarks/benchmark_hit_transformer.py [num_hits] [iterations]
+"""
+import os
+import sys
+from copy import deepcopy
+from time import perf_counter
+
+from elasticsearch_dsl import Search
+from elasticsearch_dsl.response import Response, HitMeta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from dp_conceptual_search.ons.search.response.client.hit_transformer import transform_hits
+
+
+class DotDict(dict):
+    """
+    The DotDict previously used to shape hits (kept here as the benchmark baseline)
+    """
+    description_field_name = "description"
+
+    def set_description_element(self, field_name, original_value, new_value):
+        if isinstance(self[self.description_field_name][field_name], list):
+            if original_value in self[self.description_field_name][field_name]:
+                idx = self[self.description_field_name][field_name].index(original_value)
+                self[self.description_field_name][field_name][idx] = new_value
+        else:
+            self[self.description_field_name][field_name] = new_value
+
+    def set_value(self, field_name, original_value, new_value):
+        if field_name in self:
+            self[field_name] = new_value
+        elif "." in field_name:
+            parts = field_name.split(".")
+            if parts[0] == self.description_field_name and len(parts) <= 2:
+                self.set_description_element(parts[1], original_value, new_value)
+        else:
+            raise Exception("Unable to set field %s" % field_name)
+
+
+def highlight_all(raw_response: dict, tag="strong") -> list:
+    """
+    The previous ONSResponse.highlight_all (kept here as the benchmark baseline)
+    :param raw_response:
+    :param tag:
+    :return:
+    """
+    response = Response(Search(), raw_response)
+
+    open_tag = "<{tag}>".format(tag=tag)
+    close_tag = "</{tag}>".format(tag=tag)
+
+    highlighted_hits = []
+    for hit in response.hits:
+        hit_dict = DotDict(hit.to_dict())
+        if hasattr(hit, "meta") and isinstance(hit.meta, HitMeta):
+            hit_meta = hit.meta
+            hit_dict["_type"] = hit_meta.to_dict().get("doc_type", None)
+
+            if hasattr(hit_meta, "highlight") and hasattr(hit_meta.highlight, "to_dict"):
+                highlight_dict = hit_meta.highlight.to_dict()
+                for highlight_field in highlight_dict:
+                    for highlighted_value in highlight_dict[highlight_field]:
+                        if isinstance(highlighted_value, str) and open_tag in highlighted_value \
+                                and close_tag in highlighted_value:
+                            idx_start = highlighted_value.index(open_tag) + len(open_tag)
+                            idx_end = highlighted_value.index(close_tag)
+                            original_value = highlighted_value[idx_start:idx_end].strip()
+                            hit_dict.set_value(highlight_field, original_value, highlighted_value)
+
+        highlighted_hits.append(hit_dict)
+
+    return highlighted_hits
+
+
+def mock_response(num_hits: int) -> dict:
+    """
+    Builds a raw search response with num_hits highlighted hits
+    :param num_hits:
+    :return:
+    """
+    hits = []
+    for i in range(num_hits):
+        keywords = ["keyword {0} {1}".format(i, j) for j in range(10)]
+        hits.append({
+            "_index": "ons",
+            "_type": "bulletin",
+            "_id": "/economy/bulletins/{0}".format(i),
+            "_score": 1.0 / (i + 1),
+            "_source": {
+                "uri": "/economy/bulletins/{0}".format(i),
+                "type": "bulletin",
+                "description": {
+                    "title": "Consumer price inflation {0}".format(i),
+                    "summary": "Price indices, percentage changes and weights for the different measures of "
+                               "consumer price inflation {0}".format(i),
+                    "metaDescription": "Consumer price inflation, including CPIH and CPI {0}".format(i),
+                    "keywords": keywords,
+                    "releaseDate": "2018-08-15T00:00:00.000Z"
+                }
+            },
+            "highlight": {
+                "description.title": ["Consumer price <strong>inflation</strong> {0}".format(i)],
+                "description.summary": ["Price indices, percentage changes and weights for the different measures "
+                                        "of consumer price <strong>inflation</strong> {0}".format(i)],
+                "description.keywords": ["<strong>{0}</strong>".format(keyword) for keyword in keywords[:3]]
+            }
+        })
+
+    return {
+        "took": 5,
+        "timed_out": False,
+        "hits": {
+            "total": num_hits,
+            "max_score": 1.0,
+            "hits": hits
+        }
+    }
+
+
+def benchmark(num_hits: int, iterations: int):
+    response = mock_response(num_hits)
+
+    # Both approaches modify the hit _source in place, so each iteration gets its own copy
+    assert highlight_all(deepcopy(response)) == transform_hits(deepcopy(response)["hits"]["hits"])
+
+    timings = {}
+    for name, fn in [("highlight_all", highlight_all),
+                     ("transform_hits", lambda r: transform_hits(r["hits"]["hits"]))]:
+        copies = [deepcopy(response) for _ in range(iterations)]
+
+        start = perf_counter()
+        for copy in copies:
+            fn(copy)
+        timings[name] = (perf_counter() - start) / iterations
+
+        print("{0:<15} {1:.3f} ms per {2} hit page".format(name, timings[name] * 1000.0, num_hits))
+
+    print("speedup: {0:.1f}x".format(timings["highlight_all"] / timings["transform_hits"]))
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    benchmark(n, k)
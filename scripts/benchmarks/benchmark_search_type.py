@@ -0,0 +1,141 @@
+"""
+Benchmark of search types against a live Elasticsearch cluster: runs the ONS content, departments, type counts and
+featured result queries for a list of search terms with both DFS query then fetch and query then fetch, and reports
+the latency of each, along with the ranking drift of query then fetch (overlap of the top hits and agreement of the
+top hit with DFS, or whether the type counts match). Use the results to choose the search type policies (see the
+SEARCH_TYPE_* environment variables).
+
+The request cache is disabled, and search types are alternated on each iteration, so neither mode benefits from
+cached results.
+
+Usage (from the repository root, with ELASTIC_SEARCH_SERVER set):
+    python scripts/benchmarks/benchmark_search_type.py [search_terms_file] [iterations] [top_n]
+"""
+import os
+import sys
+from time import perf_counter
+from typing import Callable, Dict, List, Tuple
+
+from numpy import percentile
+
+from elasticsearch import Elasticsearch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from dp_conceptual_search.config import CONFIG
+from dp_conceptual_search.search.search_type import SearchType
+from dp_conceptual_search.ons.search.search_type_policy import QueryKind
+from dp_conceptual_search.ons.search.client.search_engine import SearchEngine
+from dp_conceptual_search.ons.search.content_type import AvailableContentTypes
+
+DEFAULT_SEARCH_TERMS = ["rpi", "cpi inflation", "gdp", "unemployment rate", "population estimates", "crime",
+                        "house prices", "retail sales", "migration", "wages"]
+
+
+def query_builders(client: Elasticsearch, top_n: int) -> Dict[QueryKind, Tuple[str, Callable[[str], SearchEngine]]]:
+    """
+    Returns the index and query builder of each kind of query
+    :param client:
+    :param top_n:
+    :return:
+    """
+    ons_index = CONFIG.SEARCH.search_index
+    departments_index = CONFIG.SEARCH.departments_search_index
+    type_filters = AvailableContentTypes.available_content_types()
+
+    def engine(index: str) -> SearchEngine:
+        return SearchEngine(using=client, index=index)
+
+    return {
+        QueryKind.CONTENT: (ons_index, lambda term: engine(ons_index).content_query(
+            term, 1, top_n, filter_functions=type_filters, type_filters=type_filters)),
+        QueryKind.DEPARTMENTS: (departments_index, lambda term: engine(departments_index).departments_query(
+            term, 1, top_n)),
+        QueryKind.TYPE_COUNTS: (ons_index, lambda term: engine(ons_index).type_counts_query(
+            term, type_filters=type_filters)),
+        QueryKind.FEATURED: (ons_index, lambda term: engine(ons_index).featured_result_query(term))
+    }
+
+
+def ranking(response: dict) -> List:
+    """
+    Returns the ranked hit ids of a response, or the type counts of an aggregation response
+    :param response:
+    :return:
+    """
+    if "aggregations" in response:
+        buckets = response["aggregations"][SearchEngine.agg_bucket]["buckets"]
+        return sorted((bucket["key"], bucket["doc_count"]) for bucket in buckets)
+    return [hit["_id"] for hit in response["hits"]["hits"]]
+
+
+def drift(query_kind: QueryKind, dfs_ranking: List, ranking: List) -> Tuple[float, float]:
+    """
+    Returns the overlap of the top hits, and whether the top hit agrees (1.0 or 0.0), of a ranking against the DFS
+    ranking. Type counts only agree if all counts match.
+    :param query_kind:
+    :param dfs_ranking:
+    :param ranking:
+    :return:
+    """
+    if query_kind == QueryKind.TYPE_COUNTS or len(dfs_ranking) == 0:
+        agrees = float(dfs_ranking == ranking)
+        return agrees, agrees
+
+    overlap = len(set(dfs_ranking) & set(ranking)) / len(dfs_ranking)
+    top_hit = float(len(ranking) > 0 and ranking[0] == dfs_ranking[0])
+    return overlap, top_hit
+
+
+def benchmark(search_terms: List[str], iterations: int, top_n: int):
+    client = Elasticsearch(CONFIG.ELASTIC_SEARCH.server, timeout=CONFIG.ELASTIC_SEARCH.timeout)
+    search_types = [SearchType.DFS_QUERY_THEN_FETCH, SearchType.QUERY_THEN_FETCH]
+
+    print("{0:<12} {1:>10} {2:>10} {3:>10} {4:>10} {5:>8} {6:>9} {7:>8}".format(
+        "query", "dfs p50", "dfs p95", "qtf p50", "qtf p95", "speedup", "overlap", "top hit"))
+
+    for query_kind, (index, build_query) in query_builders(client, top_n).items():
+        timings: Dict[SearchType, List[float]] = {search_type: [] for search_type in search_types}
+        overlaps, top_hits = [], []
+
+        for search_term in search_terms:
+            body = build_query(search_term).to_dict()
+
+            rankings = {}
+            for i in range(iterations):
+                # Alternate the order of search types, so neither benefits from warmer caches
+                for search_type in (search_types if i % 2 == 0 else reversed(search_types)):
+                    start = perf_counter()
+                    response = client.search(index=index, body=body, search_type=search_type.value,
+                                             request_cache=False)
+                    timings[search_type].append(perf_counter() - start)
+
+                    rankings[search_type] = ranking(response)
+
+            overlap, top_hit = drift(query_kind, rankings[SearchType.DFS_QUERY_THEN_FETCH],
+                                     rankings[SearchType.QUERY_THEN_FETCH])
+            overlaps.append(overlap)
+            top_hits.append(top_hit)
+
+        dfs_timings = [t * 1000.0 for t in timings[SearchType.DFS_QUERY_THEN_FETCH]]
+        qtf_timings = [t * 1000.0 for t in timings[SearchType.QUERY_THEN_FETCH]]
+
+        print("{0:<12} {1:>8.1f}ms {2:>8.1f}ms {3:>8.1f}ms {4:>8.1f}ms {5:>7.2f}x {6:>9.3f} {7:>8.3f}".format(
+            query_kind.value,
+            percentile(dfs_timings, 50), percentile(dfs_timings, 95),
+            percentile(qtf_timings, 50), percentile(qtf_timings, 95),
+            percentile(dfs_timings, 50) / percentile(qtf_timings, 50),
+            sum(overlaps) / len(overlaps),
+            sum(top_hits) / len(top_hits)))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        with open(sys.argv[1]) as f:
+            terms = [line.strip() for line in f if len(line.strip()) > 0]
+    else:
+        terms = DEFAULT_SEARCH_TERMS
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    n = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+    benchmark(terms, k, n)
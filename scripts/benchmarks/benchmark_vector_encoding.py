@@ -0,0 +1,94 @@
+"""
+Micro-benchmark of vector script score param encodings: the size of an msearch request body holding a vector script
+score query per search (as sent for the conceptual content and type counts queries), and the time taken to encode the
+vector and serialise the request body to JSON. Both float64 vectors (as decoded from dp-fasttext responses) and float32
+vectors (as returned by fastText models) are benchmarked. The base64 encoding is checked to decode to the original
+vector before timing.
+
+Usage (from the repository root):
+    python scripts/benchmarks/benchmark_vector_encoding.py [dimensions] [num_searches] [iterations]
+"""
+import os
+import sys
+from json import dumps
+from time import perf_counter
+
+from numpy import ndarray, float32
+from numpy.random import rand
+
+from dp_fasttext.ml.utils import decode_float_list
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from dp_conceptual_search.search.dsl.vector_encoding import VectorEncoding
+from dp_conceptual_search.search.dsl.vector_script_score import VectorScriptScore, encode_vector
+
+
+def msearch_body(vector: ndarray, num_searches: int, encoding: VectorEncoding, precision: int) -> str:
+    """
+    Builds and serialises an msearch request body, with a vector script scored query per search
+    :param vector:
+    :param num_searches:
+    :param encoding:
+    :param precision:
+    :return:
+    """
+    lines = []
+    for _ in range(num_searches):
+        script_score = VectorScriptScore("embedding_vector", vector, cosine=True, encoding=encoding,
+                                         precision=precision)
+
+        lines.append(dumps({"index": "ons", "search_type": "dfs_query_then_fetch"}))
+        lines.append(dumps({
+            "query": {
+                "function_score": {
+                    "query": {"match": {"description.title": "consumer price inflation"}},
+                    "functions": [script_score.to_dict()],
+                    "boost_mode": "replace"
+                }
+            }
+        }))
+    return "\n".join(lines) + "\n"
+
+
+def benchmark_vector(vector: ndarray, num_searches: int, iterations: int):
+    _, encoded_vector = encode_vector(vector, encoding=VectorEncoding.BASE64)
+    assert decode_float_list(encoded_vector).tolist() == vector.tolist()
+
+    results = {}
+    for name, encoding, precision in [("json", VectorEncoding.JSON, 0),
+                                      ("json (6 d.p)", VectorEncoding.JSON, 6),
+                                      ("json (4 d.p)", VectorEncoding.JSON, 4),
+                                      ("base64", VectorEncoding.BASE64, 0)]:
+        size = len(msearch_body(vector, num_searches, encoding, precision).encode())
+
+        start = perf_counter()
+        for _ in range(iterations):
+            msearch_body(vector, num_searches, encoding, precision)
+        duration = (perf_counter() - start) / iterations
+
+        results[name] = (size, duration)
+        print("{0:<13} {1:>8} bytes {2:.3f} ms per {3} search msearch".format(name, size, duration * 1000.0,
+                                                                            num_searches))
+
+    json_size, json_duration = results["json"]
+    base64_size, base64_duration = results["base64"]
+    print("base64: {0:.1f}x fewer bytes, {1:.1f}x faster".format(json_size / base64_size,
+                                                                 json_duration / base64_duration))
+
+
+def benchmark(dimensions: int, num_searches: int, iterations: int):
+    vector = rand(dimensions)
+
+    for dtype, dtype_vector in [("float64", vector), ("float32", vector.astype(float32))]:
+        print("{0} vector:".format(dtype))
+        benchmark_vector(dtype_vector, num_searches, iterations)
+        print()
+
+
+if __name__ == "__main__":
+    d = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    k = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+
+    benchmark(d, n, k)
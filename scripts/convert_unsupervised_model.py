@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+"""
+One-time conversion of the unsupervised fastText .vec model to its compact, memory-mappable format (written next to
+the model, see compact_model_dirname). Workers load the compact format when it exists and was converted from the
+current model (re-run this script whenever the model is updated).
+
+Usage (from the repository root):
+    python scripts/convert_unsupervised_model.py [model.vec] [output_dir]
+"""
+import os
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from dp_conceptual_search.config import CONFIG
+from dp_conceptual_search.ml.word_embedding.fastText.unsupervised import UnsupervisedModel, compact_model_dirname
+
+
+if __name__ == "__main__":
+    filename = sys.argv[1] if len(sys.argv) > 1 else CONFIG.ML.unsupervised_model_filename
+    output_dir = sys.argv[2] if len(sys.argv) > 2 else None
+
+    start = perf_counter()
+    model = UnsupervisedModel(filename, mmap=False)
+    print("parsed {0} ({1} words) in {2:.1f} s".format(filename, len(model.words), perf_counter() - start))
+
+    output_dir = model.save_compact(output_dir)
+    print("wrote {0}".format(output_dir))
+
+    if output_dir == compact_model_dirname(filename):
+        start = perf_counter()
+        UnsupervisedModel(filename)
+        print("loaded compact model in {0:.3f} s".format(perf_counter() - start))
@@ -24,6 +24,7 @@ from dp_conceptual_search.search.dsl.vector_script_score import VectorScriptScor
 from dp_conceptual_search.ons.search.index import Index
 from dp_conceptual_search.ons.search.sort_fields import query_sort, SortField
 from dp_conceptual_search.ons.recommend.queries.ons_query_builders import similar_to_uri
+from dp_conceptual_search.ons.recommend.client.recommend_search_engine import RecommendationSearchEngine
 from dp_conceptual_search.ons.conceptual.client.fasttext_client import FastTextClientService
 from dp_conceptual_search.ons.search.fields import get_highlighted_fields, Field, AvailableFields
 
@@ -147,4 +148,26 @@ class RecommendApiTestCase(SearchTestApp):
         results = data['results']
 
         expected_hits_highlighted = mock_hits_highlighted()
-        self.assertEqual(results, expected_hits_highlighted, "returned hits should match expected")
\ No newline at end of file
+        self.assertEqual(results, expected_hits_highlighted, "returned hits should match expected")
+
+    def test_invalidate_api(self):
+        """
+        Tests that the /recommend/invalidate API invalidates cached recommendations for the given uri
+        :return:
+        """
+        data = {
+            "uri": TEST_URI[1:]
+        }
+
+        with mock.patch.object(RecommendationSearchEngine, 'invalidate_uri') as invalidate_uri:
+            request, response = self.post("/recommend/invalidate", 200, data=dumps(data))
+
+        invalidate_uri.assert_called_once_with(TEST_URI[1:])
+        self.assertEqual(response.json, data, "expected the invalidated uri to be returned")
+
+    def test_invalidate_api_requires_uri(self):
+        """
+        Tests that the /recommend/invalidate API requires a uri
+        :return:
+        """
+        self.post("/recommend/invalidate", 400, data=dumps({}))
@@ -0,0 +1,53 @@
+"""
+Tests the chunked serialisation of streaming JSON responses
+"""
+from json import loads
+from unittest import TestCase
+
+from unit.elasticsearch.elasticsearch_test_utils import mock_hits_highlighted
+
+from dp_conceptual_search.api.response.streaming_json import iter_json_chunks
+
+
+class StreamingJsonTestCase(TestCase):
+
+    @property
+    def data(self) -> dict:
+        return {
+            "numberOfResults": 2,
+            "took": 5,
+            "results": mock_hits_highlighted(),
+            "sortBy": "relevance"
+        }
+
+    def test_iter_json_chunks(self):
+        """
+        Tests that the joined chunks are the JSON of the input dict
+        :return:
+        """
+        data = self.data
+        self.assertEqual(loads("".join(iter_json_chunks(data))), data, "joined chunks should match input")
+
+    def test_iter_json_chunks_lazy(self):
+        """
+        Tests that results can be a (lazy) iterator, and that the envelope is written before any result
+        :return:
+        """
+        data = self.data
+        expected = self.data
+
+        data["results"] = iter(data["results"])
+        chunks = list(iter_json_chunks(data, chunk_size=1))
+
+        self.assertEqual(len(chunks), len(expected["results"]) + 1, "each result should be written in its own chunk")
+        self.assertLess(chunks[0].index('"sortBy"'), chunks[0].index('"results"'),
+                        "envelope should be written before the results")
+        self.assertEqual(loads("".join(chunks)), expected, "joined chunks should match input")
+
+    def test_iter_json_chunks_empty(self):
+        """
+        Tests serialisation of empty results and envelopes
+        :return:
+        """
+        self.assertEqual(loads("".join(iter_json_chunks({"results": []}))), {"results": []})
+        self.assertEqual(loads("".join(iter_json_chunks({"took": 1}))), {"took": 1, "results": []})
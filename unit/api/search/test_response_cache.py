@@ -0,0 +1,90 @@
+"""
+Tests the search API response cache
+"""
+from json import dumps
+
+from unittest import mock
+
+from unit.utils.search_test_app import SearchTestApp
+from unit.elasticsearch.elasticsearch_test_utils import mock_search_client
+
+from dp_conceptual_search.app.search_app import SearchApp
+from dp_conceptual_search.ons.search.sort_fields import SortField
+from dp_conceptual_search.api.search.response_cache import ResponseCache, SearchEndpoint, CacheStatus
+from dp_conceptual_search.app.elasticsearch.elasticsearch_client_service import ElasticsearchClientService
+
+
+class SearchResponseCacheTestCase(SearchTestApp):
+
+    def get_app(self) -> SearchApp:
+        app = super(SearchResponseCacheTestCase, self).get_app()
+
+        # Only cache content query responses
+        app._response_cache = ResponseCache([SearchEndpoint.CONTENT], 10, 1024 * 1024, 60)
+        return app
+
+    @property
+    def search_term(self):
+        """
+        Mock search term to be used for testing
+        :return:
+        """
+        return "Zuul"
+
+    def content_query(self, page: int):
+        """
+        Makes a content query request for the given page
+        :param page:
+        :return:
+        """
+        params = {
+            "q": self.search_term,
+            "page": page,
+            "size": 10
+        }
+
+        data = {
+            "sort_by": SortField.relevance.name
+        }
+
+        target = "/search/content?{q}".format(q=self.url_encode(params))
+        return self.post(target, 200, data=dumps(data))
+
+    @mock.patch.object(ElasticsearchClientService, '_init_client', mock_search_client)
+    def test_content_query_cached(self):
+        """
+        Tests that repeated content queries are served from the cache, without querying Elasticsearch
+        :return:
+        """
+        request, response = self.content_query(1)
+        self.mock_client.search.assert_called()
+        self.assertEqual(response.headers.get(ResponseCache.CACHE_STATUS_HEADER), CacheStatus.MISS.value,
+                         "first request should be a cache miss")
+
+        request, cached_response = self.content_query(1)
+        self.mock_client.search.assert_not_called()
+        self.assertEqual(cached_response.headers.get(ResponseCache.CACHE_STATUS_HEADER), CacheStatus.HIT.value,
+                         "repeated request should be a cache hit")
+        self.assertEqual(cached_response.json, response.json, "cached response should match original response")
+
+        # A different page is a different cache entry
+        request, response = self.content_query(2)
+        self.mock_client.search.assert_called()
+        self.assertEqual(response.headers.get(ResponseCache.CACHE_STATUS_HEADER), CacheStatus.MISS.value,
+                         "request for a different page should be a cache miss")
+
+    @mock.patch.object(ElasticsearchClientService, '_init_client', mock_search_client)
+    def test_disabled_endpoint_not_cached(self):
+        """
+        Tests that responses of endpoints for which the cache is not enabled are not cached
+        :return:
+        """
+        params = {
+            "q": self.search_term
+        }
+        target = "/search/counts?{q}".format(q=self.url_encode(params))
+
+        for _ in range(2):
+            request, response = self.post(target, 200, data=dumps({}))
+            self.assertNotIn(ResponseCache.CACHE_STATUS_HEADER, response.headers,
+                             "cache status header should not be set")
@@ -0,0 +1,65 @@
+"""
+Tests the concurrent fan-out used by the SanicSearchEngine
+"""
+import asyncio
+from unittest import TestCase
+
+from unit.utils.async_test import AsyncTestCase
+
+from dp_conceptual_search.api.search.sanic_search_engine import gather
+
+
+class MockRequest(object):
+    request_id = "test"
+
+
+class GatherTestCase(AsyncTestCase, TestCase):
+
+    def test_gather_returns_results_by_branch(self):
+        """
+        Tests that gather runs all branches and returns their results keyed by branch name
+        :return:
+        """
+        async def branch(result, delay):
+            await asyncio.sleep(delay)
+            return result
+
+        async def async_test_function():
+            results = await gather(MockRequest(), {
+                "content": branch(1, 0.02),
+                "counts": branch(2, 0.01),
+                "featured": branch(3, 0.0)
+            })
+
+            self.assertEqual(results, {"content": 1, "counts": 2, "featured": 3},
+                             "results should be keyed by branch name")
+
+        self.run_async(async_test_function)
+
+    def test_gather_cancels_outstanding_branches(self):
+        """
+        Tests that a failing branch cancels all outstanding branches and that its exception is propagated
+        :return:
+        """
+        cancelled = []
+
+        async def failing_branch():
+            raise ValueError("Egon is not available")
+
+        async def slow_branch():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        async def async_test_function():
+            with self.assertRaises(ValueError):
+                await gather(MockRequest(), {
+                    "content": failing_branch(),
+                    "counts": slow_branch()
+                })
+
+            self.assertEqual(cancelled, [True], "outstanding branch should be cancelled")
+
+        self.run_async(async_test_function)
@@ -144,6 +144,28 @@ class SearchContentApiTestCase(SearchTestApp):
         expected_hits_highlighted = mock_hits_highlighted()
         self.assertEqual(results, expected_hits_highlighted, "returned hits should match expected")
 
+    @mock.patch.object(ElasticsearchClientService, '_init_client', mock_search_client)
+    @mock.patch.object(CONFIG.API, 'streaming_responses_enabled', True)
+    def test_content_query_streamed(self):
+        """
+        Tests that content query results are streamed (using chunked transfer) when enabled
+        :return:
+        """
+        params = {
+            "q": self.search_term
+        }
+
+        target = "/search/content?{q}".format(q=self.url_encode(params))
+
+        # Make the request
+        request, response = self.post(target, 200, data=dumps({}))
+
+        self.assertEqual(response.headers.get("Transfer-Encoding"), "chunked", "response should be chunked")
+
+        data = response.json
+        self.assertEqual(data['results'], mock_hits_highlighted(), "returned hits should match expected")
+        self.assertIn('paginator', data, "envelope should be returned with the results")
+
     def test_max_request_size_400(self):
         """
         Test that making a request where the page size if greater than the max allowed raises a 400 BAD_REQUEST
@@ -120,3 +120,29 @@ class SearchTypeCountsApiTestCase(SearchTestApp):
         # Assert search was called with correct arguments
         self.mock_client.search.assert_called_with(index=[Index.ONS.value], doc_type=[], body=expected,
                                                    search_type=SearchType.DFS_QUERY_THEN_FETCH.value)
+
+    @mock.patch.object(ElasticsearchClientService, '_init_client', mock_search_client)
+    def test_type_counts_query_cached(self):
+        """
+        Tests that type counts are cached independently of the sort order, and only depend on the search term and
+        type filters
+        :return:
+        """
+        params = {
+            "q": self.search_term
+        }
+        target = "/search/counts?{q}".format(q=self.url_encode(params))
+
+        # Make the request
+        request, response = self.post(target, 200, data=dumps({"sort_by": SortField.relevance.name}))
+        self.mock_client.search.assert_called_once()
+        expected = response.json
+
+        # Same search with a different sort order should be served from the cache
+        request, response = self.post(target, 200, data=dumps({"sort_by": SortField.release_date.name}))
+        self.mock_client.search.assert_not_called()
+        self.assertEqual(response.json, expected, "cached type counts should match original type counts")
+
+        # Different type filters should query Elasticsearch
+        request, response = self.post(target, 200, data=dumps({"filter": ["bulletin"]}))
+        self.mock_client.search.assert_called_once()
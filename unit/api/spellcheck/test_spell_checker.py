@@ -1,8 +1,13 @@
 """
 Tests the spellcheck spell checker API
 """
+import asyncio
+from unittest import mock
+
 from unit.utils.search_test_app import SearchTestApp
 
+from dp_conceptual_search.app.executor.bounded_executor import BoundedExecutor, ExecutorQueueFull
+
 
 class SpellCheckTestCase(SearchTestApp):
 
@@ -89,3 +94,35 @@ class SpellCheckTestCase(SearchTestApp):
 
         # Make the request and assert a 400 BAD_REQUEST response
         request, response = self.get(target, 400)
+
+    def assert_spell_check_unavailable(self, error: Exception):
+        """
+        Asserts that a 503 SERVICE_UNAVAILABLE is returned when the spellcheck executor raises the given error
+        :param error:
+        :return:
+        """
+        params = {
+            "q": "infltion",
+        }
+        url_encoded_params = self.url_encode(params)
+        target = "/spellcheck?{0}".format(url_encoded_params)
+
+        with mock.patch.object(BoundedExecutor, 'run', side_effect=error) as run:
+            # Make the request and assert a 503 SERVICE_UNAVAILABLE response
+            request, response = self.get(target, 503)
+
+            run.assert_called_once()
+
+    def test_spell_check_queue_full(self):
+        """
+        Tests that a 503 SERVICE_UNAVAILABLE is returned when the spellcheck queue is full
+        :return:
+        """
+        self.assert_spell_check_unavailable(ExecutorQueueFull("Executor 'spellcheck' has 2 pending calls"))
+
+    def test_spell_check_timeout(self):
+        """
+        Tests that a 503 SERVICE_UNAVAILABLE is returned when the spellcheck deadline is exceeded
+        :return:
+        """
+        self.assert_spell_check_unavailable(asyncio.TimeoutError())
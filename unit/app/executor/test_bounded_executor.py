@@ -0,0 +1,76 @@
+"""
+Tests the bounded executor used to run blocking work off the event loop
+"""
+import asyncio
+import threading
+from unittest import TestCase
+
+from unit.utils.async_test import AsyncTestCase
+
+from dp_conceptual_search.app.executor.bounded_executor import BoundedExecutor, ExecutorQueueFull
+
+
+class BoundedExecutorTestCase(AsyncTestCase, TestCase):
+
+    def setUp(self):
+        self.executor = BoundedExecutor("test", max_workers=1, max_queue_size=1)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_run(self):
+        """
+        Tests that calls are run on a worker thread and their result is returned
+        :return:
+        """
+        async def async_test_function():
+            result = await self.executor.run(threading.current_thread)
+            self.assertIsNot(result, threading.current_thread(), "call should be run on a worker thread")
+            self.assertEqual(self.executor.pending, 0, "expected no pending calls")
+
+        self.run_async(async_test_function)
+
+    def test_queue_full(self):
+        """
+        Tests that calls are rejected once max_workers + max_queue_size calls are pending
+        :return:
+        """
+        event = threading.Event()
+
+        async def async_test_function():
+            running = self.executor.submit(event.wait)
+            queued = self.executor.submit(event.wait)
+
+            with self.assertRaises(ExecutorQueueFull):
+                await self.executor.run(event.wait)
+
+            event.set()
+            # Await the wrapped futures: their callbacks run after the executor's own done callback, so the calls
+            # are no longer counted as pending once these complete
+            await asyncio.wrap_future(running)
+            await asyncio.wrap_future(queued)
+            self.assertEqual(self.executor.pending, 0, "expected no pending calls")
+
+            # Queue has drained
+            self.assertTrue(await self.executor.run(event.wait), "expected call to succeed once queue has drained")
+
+        self.run_async(async_test_function)
+
+    def test_timeout(self):
+        """
+        Tests that calls which exceed their deadline raise a TimeoutError, and remain counted until they finish
+        :return:
+        """
+        event = threading.Event()
+
+        async def async_test_function():
+            with self.assertRaises(asyncio.TimeoutError):
+                await self.executor.run(event.wait, timeout=0.01)
+
+            self.assertEqual(self.executor.pending, 1, "timed out call should still be pending")
+
+            event.set()
+            await asyncio.sleep(0.1)
+            self.assertEqual(self.executor.pending, 0, "expected no pending calls")
+
+        self.run_async(async_test_function)
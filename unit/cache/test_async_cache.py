@@ -0,0 +1,100 @@
+"""
+Tests the AsyncCache class
+"""
+import asyncio
+from unittest import TestCase
+
+from unit.utils.async_test import AsyncTestCase
+
+from dp_conceptual_search.cache import AsyncCache, LRUCache
+
+
+class AsyncCacheTestCase(AsyncTestCase, TestCase):
+
+    def setUp(self):
+        super(AsyncCacheTestCase, self).setUp()
+
+        self.calls = 0
+
+    async def compute(self):
+        """
+        Mock upstream call which counts its invocations
+        :return:
+        """
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return "Gatekeeper"
+
+    def test_get_or_compute_caches(self):
+        """
+        Tests that a computed value is cached and re-used
+        :return:
+        """
+        cache = AsyncCache(LRUCache("test", 10))
+
+        async def async_test_function():
+            first = await cache.get_or_compute("Zuul", self.compute)
+            second = await cache.get_or_compute("Zuul", self.compute)
+
+            self.assertEqual(first, "Gatekeeper", "computed value should be returned")
+            self.assertEqual(second, "Gatekeeper", "cached value should be returned")
+            self.assertEqual(self.calls, 1, "expected a single upstream call")
+
+        self.run_async(async_test_function)
+
+    def test_get_or_compute_coalesces(self):
+        """
+        Tests that concurrent lookups for the same key share a single computation
+        :return:
+        """
+        cache = AsyncCache(LRUCache("test", 10))
+
+        async def async_test_function():
+            results = await asyncio.gather(*[cache.get_or_compute("Zuul", self.compute) for i in range(10)])
+
+            self.assertEqual(results, ["Gatekeeper"] * 10, "all waiters should receive the computed value")
+            self.assertEqual(self.calls, 1, "expected a single upstream call")
+            self.assertEqual(cache.stats()["in_flight"], 0, "no computations should be in flight")
+
+        self.run_async(async_test_function)
+
+    def test_get_or_compute_exception_not_cached(self):
+        """
+        Tests that exceptions are propagated to all waiters and are not cached
+        :return:
+        """
+        cache = AsyncCache(LRUCache("test", 10))
+
+        async def failing_compute():
+            self.calls += 1
+            await asyncio.sleep(0.01)
+            raise ValueError("Egon is not available")
+
+        async def async_test_function():
+            results = await asyncio.gather(*[cache.get_or_compute("Zuul", failing_compute) for i in range(2)],
+                                           return_exceptions=True)
+
+            for result in results:
+                self.assertIsInstance(result, ValueError, "exception should be propagated to all waiters")
+
+            self.assertNotIn("Zuul", cache.cache, "exception should not be cached")
+            self.assertEqual(self.calls, 1, "expected a single upstream call")
+
+        self.run_async(async_test_function)
+
+    def test_invalidate_matching(self):
+        """
+        Tests that all keys matching a predicate are invalidated
+        :return:
+        """
+        cache = AsyncCache(LRUCache("test", 10))
+
+        async def async_test_function():
+            for key in [("Zuul", 1), ("Zuul", 2), ("Gozer", 1)]:
+                await cache.get_or_compute(key, self.compute)
+
+            cache.invalidate_matching(lambda key: key[0] == "Zuul")
+
+            self.assertEqual(cache.cache.keys(), [("Gozer", 1)], "expected only non-matching keys to remain")
+
+        self.run_async(async_test_function)
@@ -0,0 +1,98 @@
+"""
+Tests the LRUCache class
+"""
+from unittest import TestCase
+from unittest.mock import patch
+
+from dp_conceptual_search.cache.lru_cache import LRUCache
+
+
+class LRUCacheTestCase(TestCase):
+
+    def test_get_set(self):
+        """
+        Tests that cached values are returned and hits/misses are counted
+        :return:
+        """
+        cache = LRUCache("test", 10)
+
+        self.assertIsNone(cache.get("Zuul"), "missing key should return None")
+        cache["Zuul"] = "Gatekeeper"
+        self.assertEqual(cache.get("Zuul"), "Gatekeeper", "cached value should be returned")
+
+        self.assertEqual(cache.hits, 1, "expected one hit")
+        self.assertEqual(cache.misses, 1, "expected one miss")
+
+    def test_lru_eviction(self):
+        """
+        Tests that the least recently used entry is evicted when the cache is full
+        :return:
+        """
+        cache = LRUCache("test", 2)
+
+        cache["Egon"] = 1
+        cache["Peter"] = 2
+
+        # Touch 'Egon' so that 'Peter' becomes the least recently used entry
+        cache.get("Egon")
+        cache["Ray"] = 3
+
+        self.assertIn("Egon", cache, "recently used entry should be kept")
+        self.assertIn("Ray", cache, "new entry should be cached")
+        self.assertNotIn("Peter", cache, "least recently used entry should be evicted")
+        self.assertEqual(len(cache), 2, "cache should not exceed max_size")
+        self.assertEqual(cache.evictions, 1, "expected one eviction")
+
+    def test_ttl_eviction(self):
+        """
+        Tests that entries older than the ttl are evicted
+        :return:
+        """
+        with patch("dp_conceptual_search.cache.lru_cache.monotonic") as mock_monotonic:
+            mock_monotonic.return_value = 0.0
+
+            cache = LRUCache("test", 10, ttl=60)
+            cache["Zuul"] = "Gatekeeper"
+
+            mock_monotonic.return_value = 30.0
+            self.assertEqual(cache.get("Zuul"), "Gatekeeper", "entry should not have expired")
+
+            mock_monotonic.return_value = 61.0
+            self.assertIsNone(cache.get("Zuul"), "entry should have expired")
+
+            self.assertEqual(len(cache), 0, "expired entry should be evicted")
+            self.assertEqual(cache.evictions, 1, "expected one eviction")
+
+    def test_disabled(self):
+        """
+        Tests that a cache with a max_size of zero never stores values
+        :return:
+        """
+        cache = LRUCache("test", 0)
+        cache["Zuul"] = "Gatekeeper"
+
+        self.assertFalse(cache.enabled, "cache should be disabled")
+        self.assertEqual(len(cache), 0, "disabled cache should be empty")
+
+    def test_weight_eviction(self):
+        """
+        Tests that least recently used entries are evicted when the total weight exceeds max_weight, and that values
+        heavier than max_weight are not cached
+        :return:
+        """
+        cache = LRUCache("test", 10, max_weight=10, weigher=len)
+
+        cache["Egon"] = b"12345"
+        cache["Peter"] = b"1234"
+        self.assertEqual(cache.weight, 9, "expected total weight of both entries")
+
+        cache["Ray"] = b"123"
+        self.assertNotIn("Egon", cache, "least recently used entry should be evicted")
+        self.assertEqual(cache.weight, 7, "weight of evicted entry should be released")
+
+        cache["Peter"] = b"1"
+        self.assertEqual(cache.weight, 4, "replaced entry should be re-weighed")
+
+        cache["Zuul"] = b"12345678901"
+        self.assertNotIn("Zuul", cache, "entries heavier than max_weight should not be cached")
+        self.assertEqual(len(cache), 2, "existing entries should be kept")
@@ -0,0 +1,261 @@
+"""
+Tests the SharedCache class, using a temporary SQLite database in place of shared memory
+"""
+import os
+import stat
+import shutil
+import sqlite3
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from numpy.random import rand
+
+from dp_conceptual_search.cache import SharedCache, LRUCache, CacheBackendType, create_cache
+
+
+class SharedCacheTestCase(TestCase):
+
+    def setUp(self):
+        self.dirname = tempfile.mkdtemp()
+        self.path = os.path.join(self.dirname, "cache.db")
+        self.caches = []
+
+    def tearDown(self):
+        for cache in self.caches:
+            cache.close()
+        shutil.rmtree(self.dirname)
+
+    def create_cache(self, name: str="test", max_size: int=10, **kwargs) -> SharedCache:
+        cache = SharedCache(name, max_size, self.path, **kwargs)
+        self.caches.append(cache)
+        return cache
+
+    def test_get_set(self):
+        """
+        Tests that cached values (including None) are returned and hits/misses are counted
+        :return:
+        """
+        cache = self.create_cache()
+
+        self.assertIsNone(cache.get("Zuul"), "missing key should return None")
+        cache["Zuul"] = {"name": "Gatekeeper"}
+        cache[("Vinz", 1)] = None
+
+        self.assertEqual(cache.get("Zuul"), {"name": "Gatekeeper"}, "cached value should be returned")
+        self.assertIsNone(cache[("Vinz", 1)], "cached None should be returned")
+        self.assertEqual(sorted(cache.keys(), key=str), [("Vinz", 1), "Zuul"], "expected both keys")
+
+        self.assertEqual(cache.hits, 2, "expected two hits")
+        self.assertEqual(cache.misses, 1, "expected one miss")
+
+    def test_shared_between_instances(self):
+        """
+        Tests that entries are shared between instances (i.e worker processes) using the same database, but not
+        between caches with different names
+        :return:
+        """
+        worker_cache = self.create_cache()
+        other_worker_cache = self.create_cache()
+        other_cache = self.create_cache(name="other")
+
+        worker_cache["Zuul"] = "Gatekeeper"
+
+        self.assertEqual(other_worker_cache.get("Zuul"), "Gatekeeper", "entry should be shared between workers")
+        self.assertNotIn("Zuul", other_cache, "entry should not be shared between caches")
+
+        del other_worker_cache["Zuul"]
+        self.assertNotIn("Zuul", worker_cache, "deletion should be shared between workers")
+
+    def test_lru_eviction(self):
+        """
+        Tests that the least recently used entry is evicted when the cache is full
+        :return:
+        """
+        with patch("dp_conceptual_search.cache.shared_cache.time") as mock_time:
+            cache = self.create_cache(max_size=2)
+
+            mock_time.return_value = 1.0
+            cache["Egon"] = 1
+            mock_time.return_value = 2.0
+            cache["Peter"] = 2
+
+            # Touch 'Egon' so that 'Peter' becomes the least recently used entry
+            mock_time.return_value = 3.0
+            cache.get("Egon")
+            mock_time.return_value = 4.0
+            cache["Ray"] = 3
+
+            self.assertIn("Egon", cache, "recently used entry should be kept")
+            self.assertIn("Ray", cache, "new entry should be cached")
+            self.assertNotIn("Peter", cache, "least recently used entry should be evicted")
+            self.assertEqual(len(cache), 2, "cache should not exceed max_size")
+            self.assertEqual(cache.evictions, 1, "expected one eviction")
+
+    def test_weight_eviction(self):
+        """
+        Tests that entries are evicted when the total weight exceeds max_weight
+        :return:
+        """
+        with patch("dp_conceptual_search.cache.shared_cache.time") as mock_time:
+            cache = self.create_cache(max_weight=10, weigher=len)
+
+            mock_time.return_value = 1.0
+            cache["Egon"] = b"12345"
+            mock_time.return_value = 2.0
+            cache["Peter"] = b"1234"
+            mock_time.return_value = 3.0
+            cache["Ray"] = b"123"
+
+            self.assertNotIn("Egon", cache, "least recently used entry should be evicted")
+            self.assertEqual(cache.weight, 7, "weight of evicted entry should be released")
+
+            cache["Zuul"] = b"12345678901"
+            self.assertNotIn("Zuul", cache, "entries heavier than max_weight should not be cached")
+
+    def test_ttl_eviction(self):
+        """
+        Tests that entries older than the ttl are evicted
+        :return:
+        """
+        with patch("dp_conceptual_search.cache.shared_cache.time") as mock_time:
+            mock_time.return_value = 0.0
+
+            cache = self.create_cache(ttl=60)
+            cache["Zuul"] = "Gatekeeper"
+
+            mock_time.return_value = 30.0
+            self.assertEqual(cache.get("Zuul"), "Gatekeeper", "entry should not have expired")
+
+            mock_time.return_value = 61.0
+            self.assertIsNone(cache.get("Zuul"), "entry should have expired")
+            self.assertEqual(len(cache), 0, "expired entry should be evicted")
+
+    def test_clear(self):
+        """
+        Tests that clearing a cache only removes its own entries
+        :return:
+        """
+        cache = self.create_cache()
+        other_cache = self.create_cache(name="other")
+
+        cache["Zuul"] = "Gatekeeper"
+        other_cache["Vinz"] = "Keymaster"
+        cache.clear()
+
+        self.assertEqual(len(cache), 0, "cache should be empty")
+        self.assertEqual(len(other_cache), 1, "other cache should be unaffected")
+
+    def test_serialised_values(self):
+        """
+        Tests that tuples, bytes and numpy arrays are cached, and that cached arrays are read-only
+        :return:
+        """
+        cache = self.create_cache()
+
+        vector = rand(10)
+        cache[("Zuul", 5, 0.5)] = (["gatekeeper", "keymaster"], vector)
+        cache["Vinz"] = b"Keymaster"
+
+        labels, cached_vector = cache[("Zuul", 5, 0.5)]
+        self.assertEqual(labels, ["gatekeeper", "keymaster"])
+        self.assertEqual(cached_vector.tolist(), vector.tolist(), "cached vector should match")
+        self.assertFalse(cached_vector.flags.writeable, "cached vector should be read-only")
+        self.assertEqual(cache["Vinz"], b"Keymaster")
+        self.assertIn(("Zuul", 5, 0.5), cache.keys(), "tuple keys should be returned as tuples")
+
+        # Values which can't be serialised are skipped
+        cache["Egon"] = object()
+        self.assertNotIn("Egon", cache, "unserialisable value should not be cached")
+        self.assertEqual(cache.errors, 1, "expected the skipped write to be counted as an error")
+
+    def test_replace(self):
+        """
+        Tests that replacing an entry updates (rather than adds to) the size and weight of the cache
+        :return:
+        """
+        cache = self.create_cache(max_weight=10, weigher=len)
+
+        cache["Zuul"] = b"12345"
+        cache["Zuul"] = b"123"
+
+        self.assertEqual(len(cache), 1, "replaced entry should only be counted once")
+        self.assertEqual(cache.weight, 3, "weight of replaced entry should be released")
+
+    def test_batch_eviction(self):
+        """
+        Tests that all entries over max_size are evicted at once (i.e when max_size is reduced)
+        :return:
+        """
+        with patch("dp_conceptual_search.cache.shared_cache.time") as mock_time:
+            cache = self.create_cache(max_size=5)
+            for i in range(5):
+                mock_time.return_value = float(i)
+                cache[i] = i
+
+            smaller_cache = self.create_cache(max_size=2)
+            mock_time.return_value = 5.0
+            smaller_cache[5] = 5
+
+            self.assertEqual(sorted(smaller_cache.keys()), [4, 5], "least recently used entries should be evicted")
+            self.assertEqual(smaller_cache.evictions, 4, "expected four evictions")
+
+    def test_private_file(self):
+        """
+        Tests that the database is only accessible to the current user, and isn't created in a directory accessible to
+        other users
+        :return:
+        """
+        cache = self.create_cache()
+        cache["Zuul"] = "Gatekeeper"
+
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600, "database should be private")
+
+        public_dirname = os.path.join(self.dirname, "public")
+        os.mkdir(public_dirname)
+        os.chmod(public_dirname, 0o777)
+
+        public_cache = SharedCache("test", 10, os.path.join(public_dirname, "cache.db"))
+        self.caches.append(public_cache)
+
+        public_cache["Zuul"] = "Gatekeeper"
+        self.assertIsNone(public_cache.get("Zuul"), "cache in a public directory should be disabled")
+        self.assertFalse(os.path.exists(os.path.join(public_dirname, "cache.db")), "database should not be created")
+        self.assertEqual(public_cache.errors, 2, "expected an error for each operation")
+
+    def test_locked_database(self):
+        """
+        Tests that a locked database is treated as a cache miss, and writes are skipped
+        :return:
+        """
+        cache = self.create_cache(timeout=0.01)
+        cache["Zuul"] = "Gatekeeper"
+
+        # Hold the write lock from another connection (i.e worker)
+        connection = sqlite3.connect(self.path, isolation_level=None)
+        connection.execute("BEGIN EXCLUSIVE")
+        try:
+            cache["Vinz"] = "Keymaster"
+            self.assertEqual(cache.errors, 1, "write should be skipped while the database is locked")
+        finally:
+            connection.execute("ROLLBACK")
+            connection.close()
+
+        self.assertNotIn("Vinz", cache, "skipped write should not be cached")
+        self.assertEqual(cache.get("Zuul"), "Gatekeeper", "cache should be usable once unlocked")
+
+    def test_create_cache(self):
+        """
+        Tests that create_cache returns the requested backend
+        :return:
+        """
+        self.assertIsInstance(create_cache("test", 10, backend=CacheBackendType.MEMORY), LRUCache)
+
+        with patch("dp_conceptual_search.cache.cache_factory.CACHE_CONFIG") as mock_config:
+            mock_config.shared_path = self.path
+            mock_config.shared_timeout = 1.0
+
+            cache = create_cache("test", 10, backend=CacheBackendType.SHARED)
+            self.caches.append(cache)
+            self.assertIsInstance(cache, SharedCache)
+            self.assertEqual(cache.path, self.path, "expected configured database path")
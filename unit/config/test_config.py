@@ -0,0 +1,36 @@
+"""
+Tests parsing of config values
+"""
+import os
+from unittest import TestCase, mock
+
+from dp_conceptual_search.config.config import get_search_type
+from dp_conceptual_search.search.search_type import SearchType
+
+
+class ConfigTestCase(TestCase):
+
+    def test_get_search_type(self):
+        """
+        Tests that search types are parsed from the environment, defaulting to DFS query then fetch
+        :return:
+        """
+        with mock.patch.dict(os.environ, {"SEARCH_TYPE_TEST": "query_then_fetch"}):
+            self.assertEqual(get_search_type("SEARCH_TYPE_TEST"), SearchType.QUERY_THEN_FETCH)
+
+        with mock.patch.dict(os.environ, {"SEARCH_TYPE_TEST": "DFS_QUERY_THEN_FETCH"}):
+            self.assertEqual(get_search_type("SEARCH_TYPE_TEST"), SearchType.DFS_QUERY_THEN_FETCH,
+                             "search types should be case insensitive")
+
+        with mock.patch.dict(os.environ, clear=True):
+            self.assertEqual(get_search_type("SEARCH_TYPE_TEST"), SearchType.DFS_QUERY_THEN_FETCH,
+                             "expected default search type")
+
+    def test_get_search_type_invalid(self):
+        """
+        Tests that an invalid search type exits at startup
+        :return:
+        """
+        with mock.patch.dict(os.environ, {"SEARCH_TYPE_TEST": "query_the_fetch"}):
+            with self.assertRaises(SystemExit):
+                get_search_type("SEARCH_TYPE_TEST")
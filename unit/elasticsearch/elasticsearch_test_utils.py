@@ -32,6 +32,26 @@ def mock_search(index=None, doc_type=None, body=None, params=None, **kwargs) ->
     return mock_search_response()
 
 
+def mock_msearch(body=None, index=None, doc_type=None, params=None, **kwargs) -> dict:
+    """
+    Mock multi search method which passes each header/body pair to mock_search
+    :param body:
+    :param index:
+    :param doc_type:
+    :param params:
+    :param kwargs:
+    :return:
+    """
+    headers = body[0::2]
+    bodies = body[1::2]
+
+    responses = [mock_search(body=search_body, **header) for header, search_body in zip(headers, bodies)]
+
+    return {
+        "responses": responses
+    }
+
+
 def mock_search_client(*args) -> MockElasticsearchClient:
     """
     Returns a mock Elasticsearch client for search
@@ -40,9 +60,11 @@ def mock_search_client(*args) -> MockElasticsearchClient:
     # Mock the search client
     mock_client = MockElasticsearchClient()
     mock_client.search = MagicMock()
+    mock_client.msearch = MagicMock()
 
     # Set side effect to call custom mock_search
     mock_client.search.side_effect = mock_search
+    mock_client.msearch.side_effect = mock_msearch
 
     return mock_client
 
@@ -1,10 +1,15 @@
 """
 Tests the custom spell checker class
 """
+import os
+import shutil
+import tempfile
 from unittest import TestCase
+from unittest.mock import Mock, patch
 
 from dp_conceptual_search.config import CONFIG
-from dp_conceptual_search.ml.spelling.spell_checker import SpellChecker
+from dp_conceptual_search.cache import SharedCache
+from dp_conceptual_search.ml.spelling.spell_checker import SpellChecker, damerau_levenshtein_distance
 from dp_conceptual_search.ml.word_embedding.fastText.unsupervised import UnsupervisedModel
 
 
@@ -64,3 +69,145 @@ class SpellCheckerTestCase(TestCase):
                                  key=correction.input_token,
                                  actual=correction.correction
                              ))
+
+
+class StandInSpellCheckerTestCase(SpellCheckerTestCase):
+    """
+    Runs the sample word tests against a stand-in vocabulary (so without the default model), along with tests of the
+    deletes index and suggestions cache
+    """
+
+    @property
+    def vocabulary(self) -> list:
+        """
+        Returns a stand-in vocabulary, in rank (frequency) order, including less frequent near misses of the sample
+        corrections
+        :return:
+        """
+        return ["economic", "inflation", "rpi", "cpi", "economy", "deflation", "population", "cpa", "roo", "economics",
+                "infection"]
+
+    def setUp(self):
+        """
+        Initialise a spell checker with a stand-in model
+        :return:
+        """
+        model = Mock(words={word: i for i, word in enumerate(self.vocabulary)})
+        self.spell_checker: SpellChecker = SpellChecker(model)
+
+    def test_damerau_levenshtein_distance(self):
+        """
+        Tests the edit distance used to verify candidates from the deletes index
+        :return:
+        """
+        self.assertEqual(damerau_levenshtein_distance("rpi", "rpi"), 0)
+        self.assertEqual(damerau_levenshtein_distance("rpo", "rpi"), 1)
+        self.assertEqual(damerau_levenshtein_distance("cpi", "pci"), 1)
+        self.assertEqual(damerau_levenshtein_distance("infltion", "inflation"), 1)
+        self.assertEqual(damerau_levenshtein_distance("ca", "abc"), 2)
+        self.assertEqual(damerau_levenshtein_distance("b-ad", "ab-d"), 2)
+
+        # Only letters may be inserted or substituted
+        self.assertEqual(damerau_levenshtein_distance("cp", "cp1"), float("inf"))
+
+    def test_candidates_by_edit_distance(self):
+        """
+        Tests that candidates are only returned from the closest (non-empty) edit distance
+        :return:
+        """
+        vocab = ["inflation", "deflation", "rpi", "cpi"]
+        model = Mock(words={word: i for i, word in enumerate(vocab)})
+        spell_checker = SpellChecker(model)
+
+        self.assertEqual(spell_checker.candidates("rpi"), {"rpi"})
+        self.assertEqual(spell_checker.candidates("xpi"), {"rpi", "cpi"})
+        self.assertEqual(spell_checker.candidates("inlfatoin"), {"inflation"})
+        self.assertEqual(spell_checker.candidates("zzzzzz"), {"zzzzzz"})
+
+    def test_max_words(self):
+        """
+        Tests that only the most frequent words are indexed as corrections
+        :return:
+        """
+        spell_checker = SpellChecker(self.spell_checker.model, max_words=4)
+
+        self.assertEqual(len(spell_checker.deletes_index.words), 4, "expected four indexed words")
+        self.assertEqual(spell_checker.candidates("cpa"), {"cpa"}, "expected known words to be returned")
+        self.assertEqual(spell_checker.candidates("economu"), {"economic"},
+                         "expected less frequent words not to be candidates")
+        self.assertLess(len(spell_checker.deletes_index), len(self.spell_checker.deletes_index),
+                        "expected a smaller deletes index")
+
+    def test_prefix_length(self):
+        """
+        Tests that misspellings of long words are found by indexing their prefix, whether the edits are within or
+        beyond the prefix
+        :return:
+        """
+        spell_checker = SpellChecker(self.spell_checker.model, prefix_length=5)
+
+        self.assertEqual(spell_checker.candidates("poplation"), {"population"})
+        self.assertEqual(spell_checker.candidates("populaton"), {"population"})
+        self.assertEqual(spell_checker.candidates("deflatoin"), {"deflation"})
+        self.assertEqual(spell_checker.candidates("xyzation"), {"xyzation"}, "expected no candidates")
+
+    def test_suggestions_cache(self):
+        """
+        Tests that per-token suggestions are cached, and invalidated when the model changes
+        :return:
+        """
+        model = Mock(words={"rpi": 0, "cpi": 1})
+        spell_checker = SpellChecker(model, cache_max_size=10)
+
+        suggestions = spell_checker.correct_spelling(["rpo", "rpi"])
+        self.assertEqual(len(suggestions), 1, "expected one suggestion")
+        self.assertEqual(suggestions[0].correction, "rpi", "expected correction 'rpi'")
+        self.assertEqual(spell_checker.suggestions_cache.misses, 2, "expected two cache misses")
+
+        # Correctly spelt terms are cached too
+        suggestions = spell_checker.correct_spelling(["rpo", "rpi"])
+        self.assertEqual(len(suggestions), 1, "expected one suggestion")
+        self.assertEqual(spell_checker.suggestions_cache.hits, 2, "expected two cache hits")
+
+        # Setting the model invalidates the cache
+        spell_checker.model = Mock(words={"rpo": 0})
+        self.assertEqual(len(spell_checker.suggestions_cache), 0, "expected empty cache")
+        self.assertEqual(spell_checker.correct_spelling(["rpo"]), [], "expected no suggestions")
+
+
+class SharedCacheSpellCheckerTestCase(TestCase):
+
+    def setUp(self):
+        self.dirname = tempfile.mkdtemp()
+
+        with patch("dp_conceptual_search.cache.cache_factory.CACHE_CONFIG") as mock_config:
+            mock_config.backend = "shared"
+            mock_config.shared_path = os.path.join(self.dirname, "cache.db")
+            mock_config.shared_timeout = 1.0
+
+            model = Mock(words={"rpi": 0, "cpi": 1})
+            self.spell_checker: SpellChecker = SpellChecker(model, cache_max_size=10)
+
+    def tearDown(self):
+        self.spell_checker.suggestions_cache.close()
+        shutil.rmtree(self.dirname)
+
+    def test_shared_suggestions_cache(self):
+        """
+        Tests that suggestions are cached (and served from the cache) by the shared cache backend
+        :return:
+        """
+        cache = self.spell_checker.suggestions_cache
+        self.assertIsInstance(cache, SharedCache, "expected the shared cache backend")
+
+        for i in range(2):
+            suggestions = self.spell_checker.correct_spelling(["rpo", "rpi"])
+            self.assertEqual([suggestion.to_dict() for suggestion in suggestions], [{
+                "input": "rpo",
+                "correction": "rpi",
+                "probability": 1.0
+            }], "expected a single suggestion")
+
+        self.assertEqual(cache.misses, 2, "expected two cache misses")
+        self.assertEqual(cache.hits, 2, "expected two cache hits")
+        self.assertEqual(cache.errors, 0, "expected suggestions to be cached without errors")
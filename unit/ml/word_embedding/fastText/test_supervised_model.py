@@ -0,0 +1,88 @@
+"""
+Tests our SupervisedModel class, with a mock fastText model
+"""
+import sys
+from unittest import TestCase, mock
+
+import numpy as np
+
+from dp_conceptual_search.ml.word_embedding.fastText.supervised import SupervisedModel
+
+
+class MockFastTextModel(object):
+    """
+    Mock of the model returned by fastText.load_model, returning values of the same types as the fastText bindings
+    """
+    def __init__(self, dimensions: int=10):
+        self.dimensions = dimensions
+
+    def get_sentence_vector(self, sentence: str) -> np.ndarray:
+        return np.random.rand(self.dimensions).astype(np.float32)
+
+    def predict(self, sentence: str, k: int=1, threshold: float=0.0):
+        labels = tuple("{0}{1}_{2}".format(SupervisedModel.LABEL_PREFIX, sentence, i) for i in range(k))
+        probabilities = np.array([1.0 / (i + 1) for i in range(k)])
+        return labels, probabilities
+
+
+class SupervisedModelTestCase(TestCase):
+    def setUp(self):
+        """
+        Load the model with a mock fastText module
+        :return:
+        """
+        self.load_model = mock.MagicMock(return_value=MockFastTextModel())
+        fasttext_module = mock.MagicMock(load_model=self.load_model)
+
+        with mock.patch.dict(sys.modules, {"fastText": fasttext_module}):
+            self.model = SupervisedModel("supervised.bin")
+
+    def test_load_model(self):
+        """
+        Tests that the model is loaded from the given file
+        :return:
+        """
+        self.load_model.assert_called_once_with("supervised.bin")
+        self.assertEqual(self.model.filename, "supervised.bin", "expected model filename to be set")
+
+    def test_get_sentence_vector(self):
+        """
+        Tests that sentence vectors are returned as float64 arrays, like those decoded by the dp-fasttext client
+        :return:
+        """
+        vector = self.model.get_sentence_vector("consumer price inflation")
+
+        self.assertIsInstance(vector, np.ndarray, "expected ndarray, got {0}".format(type(vector)))
+        self.assertEqual(vector.dtype, np.float64, "expected float64 vector, got {0}".format(vector.dtype))
+        self.assertEqual(vector.shape, (10,), "expected vector of size 10, got {0}".format(vector.shape))
+
+    def test_predict(self):
+        """
+        Tests that the label prefix is stripped, and that labels and probabilities are returned as lists of str and
+        float, like those returned by the dp-fasttext client
+        :return:
+        """
+        num_labels = 3
+        labels, probabilities = self.model.predict("cpi", num_labels, threshold=0.1)
+
+        self.assertIsInstance(labels, list, "expected list, got {0}".format(type(labels)))
+        self.assertEqual(labels, ["cpi_0", "cpi_1", "cpi_2"], "expected label prefix to be stripped")
+        for label in labels:
+            self.assertIsInstance(label, str, "label should be instance of string")
+
+        self.assertIsInstance(probabilities, list, "expected list, got {0}".format(type(probabilities)))
+        self.assertEqual(len(probabilities), num_labels, "expected {0} probabilities, got {1}"
+                         .format(num_labels, len(probabilities)))
+        for probability in probabilities:
+            self.assertIs(type(probability), float, "probability should be instance of float")
+
+    def test_predict_strips_prefix_once(self):
+        """
+        Tests that only the leading label prefix is stripped
+        :return:
+        """
+        self.model.model.predict = mock.MagicMock(return_value=(("__label__a__label__b",), np.array([0.5])))
+
+        labels, probabilities = self.model.predict("zuul", 1)
+        self.assertEqual(labels, ["a__label__b"], "expected only the leading label prefix to be stripped")
+        self.assertEqual(probabilities, [0.5])
@@ -1,10 +1,17 @@
 """
 Tests our UnsupervisedModel class
 """
+import os
+import shutil
+import tempfile
 from unittest import TestCase
 
+import numpy as np
+
 from dp_conceptual_search.config import CONFIG
-from dp_conceptual_search.ml.word_embedding.fastText.unsupervised import UnsupervisedModel
+from dp_conceptual_search.ml.word_embedding.fastText.unsupervised import (
+    UnsupervisedModel, VocabIndex, compact_model_dirname, ann_index_dirname
+)
 
 
 class SupervisedModelTestCase(TestCase):
@@ -62,4 +69,135 @@ class SupervisedModelTestCase(TestCase):
             self.assertIsInstance(similar_word, str, "similar_word should be instance of string")
             self.assertIsInstance(similar_score, float, "similar_score should be instance of float")
 
-            self.assertGreater(similar_score, 0, "similar_score should be greater than zero")
\ No newline at end of file
+            self.assertGreater(similar_score, 0, "similar_score should be greater than zero")
+
+
+class RandomUnsupervisedModelTestCase(TestCase):
+    def setUp(self):
+        """
+        Write a small random model in the text .vec format
+        :return:
+        """
+        self.tmp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmp_dir, "model.vec")
+
+        random_state = np.random.RandomState(0)
+        self.vocab = ["word_{0}".format(i) for i in range(50)]
+
+        with open(self.filename, "w") as f:
+            f.write("{0} {1}\n".format(len(self.vocab), 8))
+            for word in self.vocab:
+                f.write("{0} {1}\n".format(word, " ".join("{0:.6f}".format(x) for x in random_state.randn(8))))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_compact_model(self):
+        """
+        Tests that the compact (memory-mapped) model behaves identically to the parsed text model
+        :return:
+        """
+        model = UnsupervisedModel(self.filename)
+        self.assertIsInstance(model.words, dict, "expected text model to be parsed")
+
+        dirname = model.save_compact()
+        self.assertEqual(dirname, compact_model_dirname(self.filename))
+
+        compact_model = UnsupervisedModel(self.filename)
+        self.assertIsInstance(compact_model.words, VocabIndex, "expected compact model to be loaded")
+        self.assertIsInstance(compact_model.vectors, np.memmap, "expected vectors to be memory-mapped")
+
+        # Vocabulary ranks
+        self.assertEqual(len(compact_model.words), len(self.vocab))
+        self.assertEqual(list(compact_model.words.keys()), self.vocab)
+        for word in self.vocab:
+            self.assertEqual(compact_model.words[word], model.words[word])
+        self.assertNotIn("unknown", compact_model.words)
+        self.assertIsNone(compact_model.words.get("unknown"))
+
+        # Similarity
+        for word in self.vocab[:5]:
+            expected = model.similar_by_word(word, top_n=10, return_similarity=True)
+            actual = compact_model.similar_by_word(word, top_n=10, return_similarity=True)
+
+            self.assertEqual([w for w, s in actual], [w for w, s in expected])
+            self.assertEqual(actual[0][0], word, "expected word to be most similar to itself")
+            for (w, actual_score), (_, expected_score) in zip(actual, expected):
+                self.assertIsInstance(w, str)
+                self.assertIsInstance(actual_score, float)
+                self.assertAlmostEqual(actual_score, expected_score, places=5)
+
+    def test_compact_model_out_of_date(self):
+        """
+        Tests that the compact model is written atomically, and is only loaded if converted from the current .vec file
+        :return:
+        """
+        UnsupervisedModel(self.filename).save_compact()
+        self.assertEqual(sorted(os.listdir(self.tmp_dir)), ["model.mmap", "model.vec"],
+                         "expected no temporary directories to be left behind")
+
+        # Update the .vec file (keeping the same size)
+        stat = os.stat(self.filename)
+        os.utime(self.filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        model = UnsupervisedModel(self.filename)
+        self.assertIsInstance(model.words, dict, "expected out of date compact model to be ignored")
+
+        # Re-converting replaces the compact model
+        model.save_compact()
+        self.assertIsInstance(UnsupervisedModel(self.filename).words, VocabIndex,
+                              "expected re-converted compact model to be loaded")
+
+    def test_similar_by_vectors(self):
+        """
+        Tests that batch similarity (optionally chunked over the vocabulary) matches similar_by_vector
+        :return:
+        """
+        model = UnsupervisedModel(self.filename)
+        vectors = np.random.RandomState(1).randn(7, 8)
+
+        expected = [model.similar_by_vector(vector, top_n=5, return_similarity=True) for vector in vectors]
+
+        for chunk_size in [None, 1, 3, 16, 100]:
+            actual = model.similar_by_vectors(vectors, top_n=5, return_similarity=True, chunk_size=chunk_size)
+            self.assertEqual(len(actual), len(vectors))
+
+            for actual_similar, expected_similar in zip(actual, expected):
+                self.assertEqual([w for w, s in actual_similar], [w for w, s in expected_similar])
+                for (_, actual_score), (_, expected_score) in zip(actual_similar, expected_similar):
+                    self.assertAlmostEqual(actual_score, expected_score, places=5)
+
+        # Restricted vocabulary, and top_n larger than the vocabulary
+        actual = model.similar_by_vectors(vectors, top_n=20, restrict_vocab=10, chunk_size=4)
+        for similar in actual:
+            self.assertEqual(sorted(similar), sorted(self.vocab[:10]))
+
+    def test_ann_index(self):
+        """
+        Tests that the approximate nearest-neighbour index is persisted next to the model, and is exact when every list
+        is probed
+        :return:
+        """
+        model = UnsupervisedModel(self.filename)
+        model.init_ann_index(num_lists=4, n_probe=4)
+        self.assertTrue(os.path.isdir(ann_index_dirname(self.filename)), "expected index to be persisted")
+
+        for word in self.vocab[:5]:
+            expected = model.similar_by_word(word, top_n=5, exact=True)
+            self.assertEqual(model.similar_by_word(word, top_n=5), expected)
+
+        # Persisted index is loaded
+        model = UnsupervisedModel(self.filename)
+        model.init_ann_index(num_lists=4, n_probe=1)
+        self.assertIsInstance(model.ann_index.centroids, np.memmap, "expected persisted index to be loaded")
+        self.assertEqual(len(model.similar_by_word(self.vocab[0], top_n=5)), 5)
+
+        # Index built from a previous version of the model (with the same number of vectors) is rebuilt
+        stat = os.stat(self.filename)
+        os.utime(self.filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        model = UnsupervisedModel(self.filename)
+        model.init_ann_index(num_lists=4, n_probe=1)
+        self.assertNotIsInstance(model.ann_index.centroids, np.memmap, "expected out of date index to be rebuilt")
+        self.assertEqual(sorted(os.listdir(self.tmp_dir)), ["model.ivf", "model.vec"],
+                         "expected no temporary directories to be left behind")
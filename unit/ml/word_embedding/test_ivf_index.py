@@ -0,0 +1,79 @@
+"""
+Tests the approximate nearest-neighbour (IVF) index
+"""
+import shutil
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from dp_conceptual_search.ml.word_embedding.ivf_index import IVFIndex
+
+
+class IVFIndexTestCase(TestCase):
+    def setUp(self):
+        """
+        Generate clustered random unit vectors
+        :return:
+        """
+        random_state = np.random.RandomState(0)
+        centres = random_state.randn(10, 16)
+        vectors = np.repeat(centres, 100, axis=0) + 0.3 * random_state.randn(1000, 16)
+        self.vectors_norm = (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+        queries = random_state.randn(20, 16)
+        self.queries = (queries / np.linalg.norm(queries, axis=1, keepdims=True)).astype(np.float32)
+
+    def exact(self, query: np.ndarray, top_n: int) -> set:
+        return set(np.argsort(-self.vectors_norm.dot(query))[:top_n])
+
+    def recall(self, index: IVFIndex, top_n: int, n_probe: int) -> float:
+        hits = 0
+        for query in self.queries:
+            indices, _ = index.search(self.vectors_norm, query, top_n, n_probe=n_probe)
+            hits += len(self.exact(query, top_n).intersection(indices))
+        return hits / float(top_n * len(self.queries))
+
+    def test_build(self):
+        """
+        Tests that every vector is assigned to exactly one inverted list
+        :return:
+        """
+        index = IVFIndex.build(self.vectors_norm, num_lists=10)
+
+        self.assertEqual(index.num_lists, 10)
+        self.assertEqual(index.offsets[-1], len(self.vectors_norm))
+        self.assertEqual(sorted(index.indices), list(range(len(self.vectors_norm))))
+
+    def test_search(self):
+        """
+        Tests that searching every list is exact, and recall improves with n_probe
+        :return:
+        """
+        index = IVFIndex.build(self.vectors_norm, num_lists=10)
+
+        self.assertEqual(self.recall(index, 10, n_probe=index.num_lists), 1.0, "expected exact search")
+        self.assertLessEqual(self.recall(index, 10, n_probe=1), self.recall(index, 10, n_probe=4))
+
+        indices, scores = index.search(self.vectors_norm, self.queries[0], 10, n_probe=3)
+        self.assertEqual(len(indices), 10)
+        self.assertTrue(np.all(np.diff(scores) <= 0), "expected scores in descending order")
+
+    def test_save_load(self):
+        """
+        Tests that a persisted index returns the same results
+        :return:
+        """
+        index = IVFIndex.build(self.vectors_norm, num_lists=10)
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            index.save(tmp_dir)
+            loaded = IVFIndex.load(tmp_dir, n_probe=2)
+
+            for query in self.queries:
+                expected, _ = index.search(self.vectors_norm, query, 10, n_probe=2)
+                actual, _ = loaded.search(self.vectors_norm, query, 10)
+                self.assertEqual(list(actual), list(expected))
+        finally:
+            shutil.rmtree(tmp_dir)
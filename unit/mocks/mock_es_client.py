@@ -52,3 +52,14 @@ class MockElasticsearchClient(Elasticsearch):
         :return:
         """
         raise NotImplementedError("search not implemented, must be mocked!")
+
+    def msearch(self, body, index=None, doc_type=None, params=None):
+        """
+        Mocks the multi search API
+        :param body:
+        :param index:
+        :param doc_type:
+        :param params:
+        :return:
+        """
+        raise NotImplementedError("msearch not implemented, must be mocked!")
@@ -2,6 +2,7 @@
 Tests the ONS conceptual search engine functionality
 """
 from typing import List
+from numpy import ndarray
 from numpy.random import rand
 
 from unittest import TestCase
@@ -18,6 +19,8 @@ from dp_conceptual_search.ons.search.content_type import AvailableContentTypes,
 from dp_conceptual_search.ons.conceptual.queries.ons_query_builders import build_content_query
 from dp_conceptual_search.ons.search.queries.ons_query_builders import build_type_counts_query
 from dp_conceptual_search.ons.search.fields import get_highlighted_fields, Field, AvailableFields
+from dp_conceptual_search.ons.conceptual.client.testing import StandInFastTextServer
+from dp_conceptual_search.ons.conceptual.client.fasttext_client import FastTextClientService, FastTextClientPool
 from dp_conceptual_search.ons.conceptual.client.conceptual_search_engine import ConceptualSearchEngine
 
 
@@ -220,3 +223,52 @@ class ConceptualSearchEngineTestCase(AsyncTestCase, TestCase):
 
         # Run the above function in a dedicated event loop
         self.run_async(async_test_function)
+
+    def test_conceptual_search_params(self):
+        """
+        Tests that the search vector and labels are requested from (a stand-in) dp-fasttext concurrently, through the
+        client pool, and that the result is cached for subsequent requests
+        :return:
+        """
+        num_labels = 5
+
+        # Clear any results cached by other tests
+        ConceptualSearchEngine.conceptual_search_params_cache.clear()
+
+        async def async_test_function():
+            engine = self.get_search_engine()
+
+            async with StandInFastTextServer(latency=0.05) as server:
+                pool = FastTextClientPool(server.host, server.port, 2, 1.0)
+                await pool.open()
+                FastTextClientService.set_pool(pool)
+
+                try:
+                    labels, search_vector = await engine.conceptual_search_params(self.search_term, num_labels, 0.0)
+
+                    self.assertEqual(len(labels), num_labels, "expected {0} labels".format(num_labels))
+                    self.assertIsInstance(search_vector, ndarray, "search vector should be instance of ndarray")
+                    self.assertFalse(search_vector.flags.writeable, "cached search vector should be read-only")
+
+                    self.assertEqual(sorted(server.requests), ["get_sentence_vector", "predict"],
+                                     "expected one sentence vector and one predict request")
+                    self.assertEqual(server.max_in_flight, 2, "requests should be sent concurrently")
+
+                    # Second lookup should be served from the cache
+                    await engine.conceptual_search_params(self.search_term, num_labels, 0.0)
+                    self.assertEqual(len(server.requests), 2,
+                                     "cached result should not trigger additional requests")
+
+                    # Labels are predicted from the raw search term, so a term which only cleans to the same term
+                    # isn't served from the cache
+                    upper_labels, _ = await engine.conceptual_search_params(self.search_term.upper(), num_labels,
+                                                                            0.0)
+                    self.assertEqual(len(server.requests), 4,
+                                     "expected a new lookup for a different raw search term")
+                    self.assertNotEqual(upper_labels, labels, "expected labels predicted from the raw search term")
+                finally:
+                    FastTextClientService.set_pool(None)
+                    await pool.close()
+
+        # Run the above function in a dedicated event loop
+        self.run_async(async_test_function)
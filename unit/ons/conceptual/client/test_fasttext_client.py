@@ -0,0 +1,94 @@
+"""
+Tests the pooled dp-fasttext client
+"""
+import asyncio
+from unittest import TestCase, mock
+
+from unit.utils.async_test import AsyncTestCase
+
+from dp_conceptual_search.ons.conceptual.client import fasttext_client
+from dp_conceptual_search.ons.conceptual.client.fasttext_client import FastTextClientPool, FastTextClientService
+
+
+class MockClient(object):
+    """
+    Mock dp-fasttext client which records whether it has been opened/closed
+    """
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.is_open = False
+
+    async def __aenter__(self):
+        self.is_open = True
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.is_open = False
+
+
+@mock.patch.object(fasttext_client, 'Client', MockClient)
+class FastTextClientPoolTestCase(AsyncTestCase, TestCase):
+
+    def test_clients_reused(self):
+        """
+        Tests that clients are opened once and re-used between requests
+        :return:
+        """
+        async def async_test_function():
+            # A single client pool, so consecutive requests must borrow the same client
+            pool = FastTextClientPool("localhost", 5100, 1, 1.0)
+            await pool.open()
+
+            async with pool.acquire() as first:
+                self.assertTrue(first.is_open, "pooled client should be open")
+                self.assertIn(first, pool._clients, "client should be borrowed from the pool")
+
+            async with pool.acquire() as second:
+                self.assertIs(first, second, "pooled client should be re-used")
+                self.assertEqual(len(pool._clients), 1, "no new clients should be created")
+
+            await pool.close()
+            self.assertFalse(first.is_open, "pooled client should be closed with the pool")
+
+        self.run_async(async_test_function)
+
+    def test_pool_size_bounded(self):
+        """
+        Tests that no more than pool size clients can be borrowed at once, and that waiting for a free client times
+        out
+        :return:
+        """
+        async def async_test_function():
+            pool = FastTextClientPool("localhost", 5100, 2, 0.01)
+            await pool.open()
+
+            async with pool.acquire() as first, pool.acquire() as second:
+                self.assertIsNot(first, second, "concurrent requests should borrow different clients")
+
+                with self.assertRaises(asyncio.TimeoutError):
+                    async with pool.acquire():
+                        pass
+
+            await pool.close()
+
+        self.run_async(async_test_function)
+
+    def test_service_uses_pool(self):
+        """
+        Tests that the FastTextClientService borrows clients from the pool once set
+        :return:
+        """
+        async def async_test_function():
+            pool = FastTextClientPool("localhost", 5100, 1, 1.0)
+            await pool.open()
+
+            FastTextClientService.set_pool(pool)
+            try:
+                async with FastTextClientService.get_fasttext_client() as client:
+                    self.assertIn(client, pool._clients, "client should be borrowed from the pool")
+            finally:
+                FastTextClientService.set_pool(None)
+                await pool.close()
+
+        self.run_async(async_test_function)
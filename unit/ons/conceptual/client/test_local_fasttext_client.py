@@ -0,0 +1,95 @@
+"""
+Tests the in-process fastText client
+"""
+import threading
+from unittest import TestCase
+from concurrent.futures import ThreadPoolExecutor
+
+from numpy import ndarray
+from numpy.random import rand
+
+from dp_fasttext.ml.utils import encode_float_list
+
+from unit.utils.async_test import AsyncTestCase
+
+from dp_conceptual_search.ons.conceptual.client.local_fasttext_client import LocalFastTextClient
+
+
+class MockSupervisedModel(object):
+    """
+    Mock supervised model which records the threads that inference was run on
+    """
+    def __init__(self):
+        self.threads = []
+
+    def get_sentence_vector(self, sentence: str) -> ndarray:
+        self.threads.append(threading.current_thread())
+        return rand(10)
+
+    def predict(self, sentence: str, num_labels: int, threshold: float=0.0):
+        self.threads.append(threading.current_thread())
+        return ["label_{0}".format(i) for i in range(num_labels)], [1.0] * num_labels
+
+
+class MockUnsupervisedModel(object):
+    """
+    Mock unsupervised model which records the vectors it was queried with
+    """
+    def __init__(self):
+        self.vectors = []
+
+    def similar_by_vector(self, vector: ndarray, top_n: int=10) -> list:
+        self.vectors.append(vector)
+        return ["word_{0}".format(i) for i in range(top_n)]
+
+
+class LocalFastTextClientTestCase(AsyncTestCase, TestCase):
+
+    def test_supervised_inference_runs_in_executor(self):
+        """
+        Tests that supervised model inference is run off the event loop thread, on the executor
+        :return:
+        """
+        model = MockSupervisedModel()
+        executor = ThreadPoolExecutor(max_workers=1)
+
+        async def async_test_function():
+            async with LocalFastTextClient(executor, model) as client:
+                search_vector = await client.supervised.get_sentence_vector("zuul")
+                labels, probabilities = await client.supervised.predict("zuul", 5, 0.0)
+
+            self.assertIsInstance(search_vector, ndarray, "search vector should be instance of ndarray")
+            self.assertEqual(len(labels), 5, "expected 5 labels")
+            self.assertEqual(len(probabilities), 5, "expected 5 probabilities")
+
+            for thread in model.threads:
+                self.assertIsNot(thread, threading.current_thread(), "inference should not block the event loop")
+
+        try:
+            self.run_async(async_test_function)
+        finally:
+            executor.shutdown()
+
+    def test_unsupervised_similar_by_vector(self):
+        """
+        Tests that the local client decodes vectors and queries the unsupervised model for similar words
+        :return:
+        """
+        model = MockUnsupervisedModel()
+        executor = ThreadPoolExecutor(max_workers=1)
+        vector = rand(10)
+
+        async def async_test_function():
+            async with LocalFastTextClient(executor, unsupervised_model=model) as client:
+                self.assertFalse(hasattr(client, "supervised"), "supervised model should not be served locally")
+
+                similar_words = await client.unsupervised.similar_by_vector(encode_float_list(vector), 5)
+
+            self.assertEqual(similar_words, ["word_{0}".format(i) for i in range(5)])
+            self.assertEqual(len(model.vectors), 1, "expected exactly one query")
+            self.assertEqual(len(model.vectors[0]), len(vector), "expected decoded vector")
+
+        try:
+            self.run_async(async_test_function)
+        finally:
+            executor.shutdown()
@@ -1,6 +1,7 @@
 """
 Tests the ONS recommendation search engine functionality
 """
+import asyncio
 from typing import List
 from numpy import ndarray
 
@@ -72,6 +73,8 @@ class RecommendationSearchEngineTestCase(AsyncTestCase, TestCase):
 
         self.mock_client = mock_recommend_search_client()
 
+        RecommendationSearchEngine.recommendation_params_cache.clear()
+
     @property
     def index(self):
         """
@@ -182,4 +185,39 @@ class RecommendationSearchEngineTestCase(AsyncTestCase, TestCase):
                                                        search_type=SearchType.DFS_QUERY_THEN_FETCH.value)
 
         # Run the above function in a dedicated event loop
-        self.run_async(async_test_function)
\ No newline at end of file
+        self.run_async(async_test_function)
+
+    @mock.patch.object(FastTextClientService, 'get_fasttext_client', mock_fasttext_client)
+    def test_recommendation_params_cached(self):
+        """
+        Tests that embedding vectors and keywords are cached (and shared between concurrent lookups) by uri, and can
+        be invalidated
+        :return:
+        """
+        match_query = {
+            "query": match_by_uri(TEST_URI).to_dict()
+        }
+
+        def num_match_queries():
+            return len([c for c in self.mock_client.search.call_args_list if c[1].get("body") == match_query])
+
+        async def async_test_function():
+            engine = self.get_search_engine()
+
+            results = await asyncio.gather(*[engine.recommendation_params(TEST_URI, 10) for i in range(5)])
+            await engine.recommendation_params(TEST_URI, 10)
+
+            self.assertEqual(num_match_queries(), 1, "expected a single query for the embedding vector")
+
+            embedding_vector, keywords = results[0]
+            self.assertIsInstance(embedding_vector, ndarray, "embedding vector should be instance of ndarray")
+            self.assertEqual(keywords, mock_similar_vector().get("words"), "expected keywords from fasttext")
+
+            # Invalidate the uri
+            RecommendationSearchEngine.invalidate_uri(TEST_URI)
+            await engine.recommendation_params(TEST_URI, 10)
+
+            self.assertEqual(num_match_queries(), 2, "expected embedding vector to be re-fetched after invalidation")
+
+        # Run the above function in a dedicated event loop
+        self.run_async(async_test_function)
@@ -0,0 +1,150 @@
+"""
+Tests the store of precomputed recommendations
+"""
+import asyncio
+from unittest import TestCase
+
+from unit.utils.async_test import AsyncTestCase
+
+from dp_conceptual_search.ons.search.sort_fields import SortField
+from dp_conceptual_search.ons.recommend.client.recommendation_store import RecommendationStore, RecommendationKey
+
+
+class RecommendationStoreTestCase(AsyncTestCase, TestCase):
+
+    def setUp(self):
+        super(RecommendationStoreTestCase, self).setUp()
+
+        self.computed = []
+
+    async def compute(self, key: RecommendationKey) -> dict:
+        """
+        Mock live query path which records its invocations
+        :param key:
+        :return:
+        """
+        self.computed.append(key)
+        await asyncio.sleep(0.01)
+        return {"uri": key.uri, "version": len(self.computed)}
+
+    @staticmethod
+    def key(uri: str) -> RecommendationKey:
+        return RecommendationStore.key(uri, 10, 10, SortField.relevance)
+
+    def test_refresh_most_requested(self):
+        """
+        Tests that only the most requested keys are precomputed, and that other keys fall back to the live path
+        :return:
+        """
+        store = RecommendationStore(self.compute, max_size=2, ttl=60, refresh_interval=60)
+
+        async def async_test_function():
+            for uri, num_requests in [("/zuul", 3), ("/gozer", 2), ("/vinz", 1)]:
+                for i in range(num_requests):
+                    self.assertIsNone(store.get(self.key(uri)), "expected miss before refresh")
+
+            await store.refresh()
+
+            self.assertEqual(sorted(key.uri for key in self.computed), ["/gozer", "/zuul"])
+            self.assertEqual(store.get(self.key("/zuul"))["uri"], "/zuul")
+            self.assertIsNone(store.get(self.key("/vinz")), "expected least requested key not to be precomputed")
+
+            # Popularity changes
+            for i in range(10):
+                store.get(self.key("/vinz"))
+            await store.refresh()
+
+            self.assertIn(self.key("/vinz"), store)
+            self.assertEqual(len(store), 2, "store should be bounded")
+
+        self.run_async(async_test_function)
+
+    def test_refresh_skips_fresh_results(self):
+        """
+        Tests that refreshes only compute results which are missing or stale
+        :return:
+        """
+        store = RecommendationStore(self.compute, max_size=2, ttl=60, refresh_interval=60)
+
+        async def async_test_function():
+            store.get(self.key("/zuul"))
+            await store.refresh()
+            self.assertEqual(len(self.computed), 1)
+
+            await store.refresh()
+            self.assertEqual(len(self.computed), 1, "expected fresh result not to be recomputed")
+
+            store.get(self.key("/gozer"))
+            await store.refresh()
+            self.assertEqual([key.uri for key in self.computed], ["/zuul", "/gozer"],
+                             "expected only the missing result to be computed")
+
+        self.run_async(async_test_function)
+
+    def test_stale_while_revalidate(self):
+        """
+        Tests that stale results are served while being refreshed in the background
+        :return:
+        """
+        store = RecommendationStore(self.compute, max_size=2, ttl=0, refresh_interval=60)
+
+        async def async_test_function():
+            store.get(self.key("/zuul"))
+            await store.refresh()
+
+            # Stale result is returned, and a single refresh is triggered
+            first = store.get(self.key("/zuul"))
+            second = store.get(self.key("/zuul"))
+            self.assertEqual(first, second)
+            self.assertEqual(first["version"], 1)
+
+            await asyncio.sleep(0.05)
+            self.assertEqual(len(self.computed), 2, "expected a single background refresh")
+            self.assertEqual(store.get(self.key("/zuul"))["version"], 2, "expected refreshed result")
+
+            await store.stop()
+
+        self.run_async(async_test_function)
+
+    def test_invalidate_uri(self):
+        """
+        Tests that invalidated results fall back to the live path until recomputed by the next refresh
+        :return:
+        """
+        store = RecommendationStore(self.compute, max_size=2, ttl=60, refresh_interval=60)
+
+        async def async_test_function():
+            store.get(self.key("/zuul"))
+            store.get(self.key("/gozer"))
+            await store.refresh()
+
+            store.invalidate_uri("zuul")
+            self.assertIsNone(store.get(self.key("/zuul")), "expected invalidated result to be removed")
+            self.assertIsNotNone(store.get(self.key("/gozer")), "expected other results to be kept")
+
+            await store.refresh()
+            self.assertEqual(store.get(self.key("/zuul"))["version"], 3, "expected result to be recomputed")
+
+        self.run_async(async_test_function)
+
+    def test_background_refresh(self):
+        """
+        Tests that the background task refreshes the store until stopped
+        :return:
+        """
+        store = RecommendationStore(self.compute, max_size=2, ttl=60, refresh_interval=0.01)
+
+        async def async_test_function():
+            store.get(self.key("/zuul"))
+            store.start()
+
+            await asyncio.sleep(0.1)
+            await store.stop()
+
+            self.assertIsNotNone(store.get(self.key("/zuul")), "expected result to be precomputed")
+
+            num_computed = len(self.computed)
+            await asyncio.sleep(0.05)
+            self.assertEqual(len(self.computed), num_computed, "expected no refreshes once stopped")
+
+        self.run_async(async_test_function)
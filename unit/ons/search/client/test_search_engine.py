@@ -2,7 +2,7 @@
 Tests the ONS search engine functionality
 """
 from typing import List
-from unittest import TestCase
+from unittest import TestCase, mock
 
 from unit.utils.async_test import AsyncTestCase
 from unit.elasticsearch.elasticsearch_test_utils import mock_search_client
@@ -12,6 +12,7 @@ from dp_conceptual_search.search.search_type import SearchType
 from dp_conceptual_search.search.query_helper import match_by_uri
 
 from dp_conceptual_search.ons.search.client.search_engine import SearchEngine
+from dp_conceptual_search.ons.search.search_type_policy import QueryKind, search_type_policy
 from dp_conceptual_search.ons.search.sort_fields import query_sort, SortField
 from dp_conceptual_search.ons.search.fields import get_highlighted_fields, Field
 from dp_conceptual_search.ons.search.type_filter import AvailableTypeFilters, AvailableContentTypes, ContentType
@@ -380,3 +381,31 @@ class SearchEngineTestCase(AsyncTestCase, TestCase):
         # Run the above function in a dedicated event loop
         self.run_async(async_test_function)
 
+    def test_search_type_policies(self):
+        """
+        Tests that each kind of query uses its configured search type
+        :return:
+        """
+        content_types: List[ContentType] = AvailableContentTypes.available_content_types()
+
+        with mock.patch.object(SEARCH_CONFIG, "type_counts_search_type", SearchType.QUERY_THEN_FETCH), \
+                mock.patch.object(SEARCH_CONFIG, "featured_search_type", SearchType.QUERY_THEN_FETCH):
+            self.assertEqual(search_type_policy(QueryKind.TYPE_COUNTS), SearchType.QUERY_THEN_FETCH)
+
+            queries = {
+                QueryKind.CONTENT: self.get_search_engine().content_query(self.search_term, 1, 10),
+                QueryKind.DEPARTMENTS: self.get_search_engine().departments_query(self.search_term, 1, 10),
+                QueryKind.TYPE_COUNTS: self.get_search_engine().type_counts_query(self.search_term,
+                                                                                  type_filters=content_types),
+                QueryKind.FEATURED: self.get_search_engine().featured_result_query(self.search_term)
+            }
+
+            for query_kind, engine in queries.items():
+                self.assertEqual(engine._params.get("search_type"), search_type_policy(query_kind).value,
+                                 "{0} query should use its configured search type".format(query_kind))
+
+            # Zero-size type counts and single-hit featured queries skip the DFS phase, but content queries don't
+            self.assertEqual(queries[QueryKind.CONTENT]._params.get("search_type"),
+                             SearchType.DFS_QUERY_THEN_FETCH.value)
+            self.assertEqual(queries[QueryKind.TYPE_COUNTS]._params.get("search_type"),
+                             SearchType.QUERY_THEN_FETCH.value)
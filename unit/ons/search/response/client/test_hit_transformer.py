@@ -0,0 +1,82 @@
+"""
+Tests the single-pass transformer which shapes raw Elasticsearch hits into search results
+"""
+from unittest import TestCase
+
+from unit.elasticsearch.elasticsearch_test_utils import mock_hits, mock_hits_highlighted
+
+from dp_conceptual_search.ons.search.response.client.hit_transformer import transform_hits
+
+
+class HitTransformerTestCase(TestCase):
+
+    def test_transform_hits(self):
+        """
+        Tests that hits are transformed into their highlighted _source, with _type
+        :return:
+        """
+        self.assertEqual(transform_hits(mock_hits()), mock_hits_highlighted(), "returned hits should match expected")
+
+    def test_transform_hits_in_place(self):
+        """
+        Tests that results are the (modified) _source of each hit, rather than copies
+        :return:
+        """
+        hits = mock_hits()
+        results = transform_hits(hits)
+
+        for hit, result in zip(hits, results):
+            self.assertIs(result, hit["_source"], "result should be the hit _source")
+
+    def test_highlight_fields(self):
+        """
+        Tests that top level, description and description list fields are highlighted
+        :return:
+        """
+        hits = [
+            {
+                "_type": "bulletin",
+                "_source": {
+                    "searchBoost": "Zuul",
+                    "description": {
+                        "title": "Zuul the Gatekeeper",
+                        "keywords": ["Gatekeeper", "Zuul", "Zuul"]
+                    }
+                },
+                "highlight": {
+                    "searchBoost": ["<strong>Zuul</strong>"],
+                    "description.title": ["<strong>Zuul</strong> the Gatekeeper"],
+                    "description.keywords": ["<strong>Zuul</strong>", "Gatekeeper"],
+                    "description.title.title_no_dates": ["<strong>Zuul</strong> the Gatekeeper"]
+                }
+            }
+        ]
+
+        expected = {
+            "searchBoost": "<strong>Zuul</strong>",
+            "_type": "bulletin",
+            "description": {
+                "title": "<strong>Zuul</strong> the Gatekeeper",
+                "keywords": ["Gatekeeper", "<strong>Zuul</strong>", "Zuul"]
+            }
+        }
+
+        self.assertEqual(transform_hits(hits), [expected], "returned hit should match expected")
+
+    def test_unknown_field(self):
+        """
+        Tests that highlights for unknown (top level) fields raise an exception
+        :return:
+        """
+        hits = [
+            {
+                "_type": "bulletin",
+                "_source": {},
+                "highlight": {
+                    "cdid": ["<strong>Zuul</strong>"]
+                }
+            }
+        ]
+
+        with self.assertRaises(Exception):
+            transform_hits(hits)
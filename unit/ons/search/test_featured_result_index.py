@@ -0,0 +1,258 @@
+"""
+Tests the featured result index used to skip featured result queries
+"""
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from unit.utils.async_test import AsyncTestCase
+from unit.mocks.mock_es_client import MockElasticsearchClient
+
+from dp_conceptual_search.ons.search.fields import AvailableFields
+from dp_conceptual_search.ons.search.featured_result_index import FeaturedResultIndex, FeaturedTerms
+
+
+TITLE = AvailableFields.TITLE.value.name
+KEYWORDS = AvailableFields.KEYWORDS.value.name
+
+
+class FeaturedResultIndexTestCase(AsyncTestCase, TestCase):
+
+    @property
+    def terms(self) -> dict:
+        """
+        Mock (analysed) terms of featured pages, by field
+        :return:
+        """
+        return {
+            TITLE: {"inflat", "price", "indic", "consum", "census", "2021"},
+            KEYWORDS: {"cpih"}
+        }
+
+    @staticmethod
+    async def analyze(search_term: str) -> dict:
+        """
+        Mock search analysers: the title is stemmed (by truncation) with a synonym for "cpi", and keywords are only
+        lower cased
+        :param search_term:
+        :return:
+        """
+        tokens = search_term.lower().split()
+        title_tokens = set()
+        for token in tokens:
+            if token == "cpi":
+                title_tokens.update(["consum", "price", "index"])
+            title_tokens.add(token[:6])
+
+        return {
+            TITLE: title_tokens,
+            KEYWORDS: set(tokens)
+        }
+
+    def get_index(self, terms: dict=None) -> FeaturedResultIndex:
+        async def load():
+            if terms is None:
+                raise Exception("Elasticsearch unavailable")
+            return terms
+
+        return FeaturedResultIndex(load, self.analyze, 60, 10, 60)
+
+    def test_may_have_featured_result(self):
+        """
+        Tests that analysed search terms are matched against the terms of featured pages
+        :return:
+        """
+        async def async_test_function():
+            index = self.get_index()
+            self.assertTrue(await index.may_have_featured_result("Zuul"),
+                            "any term may match before the index is loaded")
+
+            index.build(self.terms)
+
+            self.assertTrue(await index.may_have_featured_result("cpih"), "keyword should match")
+            self.assertTrue(await index.may_have_featured_result("Census"), "matching should be case insensitive")
+            self.assertTrue(await index.may_have_featured_result("inflationary pressure"), "stems should match")
+            self.assertTrue(await index.may_have_featured_result("cpi"), "synonyms should match")
+            self.assertTrue(await index.may_have_featured_result(""), "terms without tokens should not be ruled out")
+            self.assertFalse(await index.may_have_featured_result("Zuul Gatekeeper"),
+                             "unknown words should not match")
+
+        self.run_async(async_test_function)
+
+    def test_truncated_load(self):
+        """
+        Tests that no term is ruled out if not all featured pages could be loaded
+        :return:
+        """
+        async def async_test_function():
+            index = self.get_index()
+            index.build(self.terms)
+            self.assertFalse(await index.may_have_featured_result("Zuul"), "unknown words should not match")
+
+            index.build(None)
+            self.assertFalse(index.loaded, "index should not be loaded")
+            self.assertTrue(await index.may_have_featured_result("Zuul"), "any term may match")
+
+        self.run_async(async_test_function)
+
+    def test_analysis_errors(self):
+        """
+        Tests that terms which can't be analysed are not ruled out
+        :return:
+        """
+        async def analyze(search_term: str):
+            raise Exception("Elasticsearch unavailable")
+
+        async def async_test_function():
+            index = self.get_index()
+            index.build(self.terms)
+            index.analyze = analyze
+
+            self.assertTrue(await index.may_have_featured_result("Zuul"), "any term may match")
+
+        self.run_async(async_test_function)
+
+    def test_negative_cache(self):
+        """
+        Tests that terms recorded as having no featured result are ruled out until the index is rebuilt
+        :return:
+        """
+        async def async_test_function():
+            index = self.get_index()
+            index.record_no_featured_result("cpih")
+            self.assertFalse(await index.may_have_featured_result("cpih"),
+                             "term should be ruled out by the negative cache")
+
+            index.build(self.terms)
+            self.assertTrue(await index.may_have_featured_result("cpih"),
+                            "rebuilding the index should clear the cache")
+
+        self.run_async(async_test_function)
+
+    def test_refresh(self):
+        """
+        Tests that refresh loads the index, and keeps the existing index if loading fails
+        :return:
+        """
+        async def async_test_function():
+            index = self.get_index(self.terms)
+            await index.refresh()
+            self.assertTrue(index.loaded, "index should be loaded")
+
+            index.load = self.get_index().load
+            await index.refresh()
+            self.assertTrue(index.loaded, "existing index should be kept")
+            self.assertFalse(await index.may_have_featured_result("Zuul"), "existing index should be used")
+
+        self.run_async(async_test_function)
+
+
+class FeaturedTermsTestCase(AsyncTestCase, TestCase):
+
+    def setUp(self):
+        super(FeaturedTermsTestCase, self).setUp()
+
+        self.mock_client = MockElasticsearchClient()
+        self.mock_client.search = MagicMock(side_effect=lambda **kwargs: self.search_response)
+        self.mock_client.mtermvectors = MagicMock(return_value={
+            "docs": [{
+                "_id": "cpi",
+                "term_vectors": {
+                    TITLE: {"terms": {"consum": {}, "price": {}}},
+                    KEYWORDS: {"terms": {"cpih": {}}}
+                }
+            }]
+        })
+        self.mock_client.indices.get_field_mapping = MagicMock(return_value={
+            "ons": {
+                "mappings": {
+                    "doc": {
+                        TITLE: {
+                            "full_name": TITLE,
+                            "mapping": {"title": {"type": "text", "analyzer": "ons_stem",
+                                                  "search_analyzer": "ons_synonym_stem"}}
+                        },
+                        KEYWORDS: {
+                            "full_name": KEYWORDS,
+                            "mapping": {"keywords": {"type": "text", "analyzer": "ons_standard"}}
+                        }
+                    }
+                }
+            }
+        })
+        self.mock_client.indices.analyze = MagicMock(side_effect=lambda index=None, body=None: {
+            "tokens": [{"token": token} for token in body["text"].lower().split()]
+        })
+
+        self.search_response = self.hits_response(1)
+
+    @staticmethod
+    def hits_response(total: int) -> dict:
+        return {
+            "took": 1,
+            "timed_out": False,
+            "_shards": {"total": 1, "successful": 1, "failed": 0},
+            "hits": {
+                "total": total,
+                "max_score": 1.0,
+                "hits": [{"_index": "ons", "_type": "doc", "_id": "cpi", "_score": 1.0}]
+            }
+        }
+
+    def get_featured_terms(self) -> FeaturedTerms:
+        return FeaturedTerms(self.mock_client, "ons", 1, fields=[AvailableFields.TITLE.value,
+                                                                 AvailableFields.KEYWORDS.value,
+                                                                 AvailableFields.CDID.value])
+
+    def test_load(self):
+        """
+        Tests that the term vectors of featured pages are loaded by field
+        :return:
+        """
+        async def async_test_function():
+            terms = await self.get_featured_terms().load()
+
+            self.assertEqual(terms, {
+                TITLE: {"consum", "price"},
+                KEYWORDS: {"cpih"},
+                AvailableFields.CDID.value.name: set()
+            })
+
+            body = self.mock_client.mtermvectors.call_args[1]["body"]
+            self.assertEqual(body, {"docs": [{"_id": "cpi", "_type": "doc"}]}, "expected term vectors of each page")
+
+        self.run_async(async_test_function)
+
+    def test_load_truncated(self):
+        """
+        Tests that no terms are returned if there are more featured pages than max_pages
+        :return:
+        """
+        async def async_test_function():
+            self.search_response = self.hits_response(2)
+
+            self.assertIsNone(await self.get_featured_terms().load(), "expected no terms")
+            self.mock_client.mtermvectors.assert_not_called()
+
+        self.run_async(async_test_function)
+
+    def test_analyze(self):
+        """
+        Tests that search terms are analysed once with each field's search analyser
+        :return:
+        """
+        async def async_test_function():
+            featured_terms = self.get_featured_terms()
+            await featured_terms.load()
+
+            tokens = await featured_terms.analyze("Consumer Prices")
+            self.assertEqual(tokens[TITLE], {"consumer", "prices"})
+
+            bodies = sorted((call[1]["body"] for call in self.mock_client.indices.analyze.call_args_list),
+                            key=lambda body: sorted(body.items()))
+            self.assertEqual(bodies, [
+                {"analyzer": "ons_standard", "text": "Consumer Prices"},
+                {"analyzer": "ons_synonym_stem", "text": "Consumer Prices"},
+                {"field": AvailableFields.CDID.value.name, "text": "Consumer Prices"}
+            ], "expected the search analyser of each field (or the field itself, if not set)")
+
+        self.run_async(async_test_function)
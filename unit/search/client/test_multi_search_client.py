@@ -0,0 +1,108 @@
+from unittest import TestCase
+
+from elasticsearch.exceptions import TransportError
+
+from unit.utils.async_test import AsyncTestCase
+from unit.elasticsearch.elasticsearch_test_utils import mock_search_client, mock_search_response
+
+from dp_conceptual_search.search.search_type import SearchType
+from dp_conceptual_search.search.client.search_client import SearchClient
+from dp_conceptual_search.search.client.multi_search_client import MultiSearchClient
+
+
+class MultiSearchClientTestCase(AsyncTestCase, TestCase):
+
+    def setUp(self):
+        super(MultiSearchClientTestCase, self).setUp()
+
+        self.mock_client = mock_search_client()
+
+    @property
+    def index(self):
+        """
+        Returns the test index
+        :return:
+        """
+        return "test"
+
+    def get_search_client(self, name: str) -> SearchClient:
+        """
+        Create an instance of a SearchClient for testing
+        :param name:
+        :return:
+        """
+        client = SearchClient(using=self.mock_client, index=self.index)
+        client.update_from_dict({
+            "query": {
+                "match": {
+                    "name": name
+                }
+            }
+        })
+        return client.search_type(SearchType.DFS_QUERY_THEN_FETCH)
+
+    def test_msearch_called(self):
+        """
+        Tests that msearch is called once with a header and body for each search
+        :return:
+        """
+        names = ["Egon Spengler", "Peter Venkman"]
+
+        expected = []
+        for name in names:
+            expected.append({
+                "index": [self.index],
+                "search_type": SearchType.DFS_QUERY_THEN_FETCH.value
+            })
+            expected.append({
+                "query": {
+                    "match": {
+                        "name": name
+                    }
+                }
+            })
+
+        async def async_test_function():
+            multi_search = MultiSearchClient(using=self.mock_client)
+            for name in names:
+                multi_search.add(self.get_search_client(name))
+
+            responses = await multi_search.execute()
+
+            self.mock_client.msearch.assert_called_once_with(body=expected)
+            self.mock_client.search.assert_not_called()
+
+            self.assertEqual(len(responses), len(names), "expected one response per search")
+            for response in responses:
+                self.assertEqual(response.hits.total, mock_search_response()["hits"]["total"],
+                                 "response should wrap the mock search response")
+
+        self.run_async(async_test_function)
+
+    def test_msearch_error(self):
+        """
+        Tests that a TransportError is raised if any individual search fails
+        :return:
+        """
+        self.mock_client.msearch.side_effect = None
+        self.mock_client.msearch.return_value = {
+            "responses": [
+                mock_search_response(),
+                {
+                    "error": {
+                        "type": "search_phase_execution_exception"
+                    },
+                    "status": 400
+                }
+            ]
+        }
+
+        async def async_test_function():
+            multi_search = MultiSearchClient(using=self.mock_client) \
+                .add(self.get_search_client("Egon Spengler")) \
+                .add(self.get_search_client("Zuul"))
+
+            with self.assertRaises(TransportError):
+                await multi_search.execute()
+
+        self.run_async(async_test_function)
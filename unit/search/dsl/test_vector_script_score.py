@@ -0,0 +1,81 @@
+"""
+Tests the encodings of vector script score params
+"""
+from unittest import TestCase
+
+from numpy import ndarray, float32
+from numpy.random import rand
+
+from dp_fasttext.ml.utils import decode_float_list
+
+from dp_conceptual_search.search.query_template import vector_marker, marker
+from dp_conceptual_search.search.dsl.vector_encoding import VectorEncoding
+from dp_conceptual_search.search.dsl.vector_script_score import VectorScriptScore
+
+
+class VectorScriptScoreTestCase(TestCase):
+
+    def setUp(self):
+        super(VectorScriptScoreTestCase, self).setUp()
+
+        self.vector: ndarray = rand(300)
+
+    def get_params(self, vector: ndarray, **kwargs) -> dict:
+        return VectorScriptScore("embedding_vector", vector, **kwargs).to_dict()["script_score"]["params"]
+
+    def test_json_encoding(self):
+        """
+        Tests that JSON encoded vectors are sent at full precision by default
+        :return:
+        """
+        params = self.get_params(self.vector, encoding=VectorEncoding.JSON, precision=0)
+
+        self.assertEqual(params["vector"], self.vector.tolist(), "vector should be sent at full precision")
+        self.assertNotIn("encoded_vector", params, "vector should not be base64 encoded")
+
+    def test_json_encoding_precision(self):
+        """
+        Tests that JSON encoded vectors are rounded to the given number of decimal places
+        :return:
+        """
+        params = self.get_params(self.vector, encoding=VectorEncoding.JSON, precision=4)
+
+        self.assertEqual(len(params["vector"]), len(self.vector), "vector length should match")
+        for actual, expected in zip(params["vector"], self.vector):
+            self.assertAlmostEqual(actual, expected, places=4)
+            self.assertEqual(actual, round(actual, 4), "vector should be rounded to 4 decimal places")
+
+    def test_json_encoding_precision_float32(self):
+        """
+        Tests that float32 vectors (as returned by in-process fastText models) are rounded to the given number of
+        decimal places when serialised
+        :return:
+        """
+        vector = self.vector.astype(float32)
+        params = self.get_params(vector, encoding=VectorEncoding.JSON, precision=4)
+
+        for actual, expected in zip(params["vector"], vector):
+            self.assertAlmostEqual(actual, float(expected), places=4)
+            self.assertLessEqual(len(repr(actual).split(".")[-1]), 4, "serialised value should have at most 4 "
+                                                                         "decimal places, got {0}".format(actual))
+
+    def test_base64_encoding(self):
+        """
+        Tests that base64 encoded vectors decode (as per the stored embedding vectors) to the original vector
+        :return:
+        """
+        params = self.get_params(self.vector, encoding=VectorEncoding.BASE64)
+
+        self.assertNotIn("vector", params, "vector should not be sent as a JSON array")
+        self.assertIsInstance(params["encoded_vector"], str, "vector should be base64 encoded")
+        self.assertEqual(decode_float_list(params["encoded_vector"]).tolist(), self.vector.tolist(),
+                         "encoded vector should decode to the original vector")
+
+    def test_vector_marker(self):
+        """
+        Tests that query template markers are sent as is, for all encodings
+        :return:
+        """
+        for encoding in VectorEncoding:
+            params = self.get_params(vector_marker("vector"), encoding=encoding, precision=4)
+            self.assertIn(marker("vector"), params.values(), "vector marker should be sent as is")
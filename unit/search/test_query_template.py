@@ -0,0 +1,110 @@
+"""
+Tests that precompiled query templates render the same request bodies as building the query
+"""
+from json import dumps
+from typing import List
+from unittest import TestCase
+
+from unit.elasticsearch.elasticsearch_test_utils import mock_search_client
+
+from dp_conceptual_search.search.query_template import QueryTemplate, SEARCH_TERM_MARKER
+from dp_conceptual_search.search.client.exceptions import RequestSizeExceededException
+from dp_conceptual_search.config import CONFIG
+from dp_conceptual_search.ons.search.sort_fields import SortField
+from dp_conceptual_search.ons.search.client.search_engine import SearchEngine
+from dp_conceptual_search.ons.search.content_type import AvailableContentTypes, ContentType
+
+
+class QueryTemplateTestCase(TestCase):
+
+    def setUp(self):
+        super(QueryTemplateTestCase, self).setUp()
+
+        self.mock_client = mock_search_client()
+
+    def get_engine(self) -> SearchEngine:
+        return SearchEngine(using=self.mock_client, index="ons")
+
+    @property
+    def type_filters(self) -> List[ContentType]:
+        return [AvailableContentTypes.BULLETIN.value, AvailableContentTypes.ARTICLE.value]
+
+    def assertSameBody(self, rendered: dict, expected: dict):
+        """
+        Asserts that the rendered body serialises to exactly the same JSON (including key order) as the built body
+        :param rendered:
+        :param expected:
+        :return:
+        """
+        self.assertEqual(dumps(rendered), dumps(expected), "rendered body should match built body")
+
+    def test_content_query(self):
+        """
+        Tests that rendered content queries match built content queries, for all sort orders and pages
+        :return:
+        """
+        for sort_by in SortField:
+            def build_query(search_term: str) -> SearchEngine:
+                return self.get_engine().content_query(search_term, 1, 10, sort_by=sort_by,
+                                                       filter_functions=self.type_filters,
+                                                       type_filters=self.type_filters)
+
+            template = QueryTemplate.build(build_query)
+
+            for search_term, current_page, size in [("Zuul", 1, 10), ("rpi cpi", 3, 20), ("", 10, 1)]:
+                expected = self.get_engine().content_query(search_term, current_page, size, sort_by=sort_by,
+                                                           filter_functions=self.type_filters,
+                                                           type_filters=self.type_filters)
+
+                from_start = SearchEngine.from_start(current_page, size)
+                rendered = template.render(search_term, from_start=from_start, size=size)
+
+                self.assertSameBody(rendered, expected.to_dict())
+                self.assertEqual(template.params, expected._params, "template params should match built params")
+
+    def test_type_counts_query(self):
+        """
+        Tests that rendered type counts queries match built type counts queries
+        :return:
+        """
+        template = QueryTemplate.build(
+            lambda search_term: self.get_engine().type_counts_query(search_term, type_filters=self.type_filters)
+        )
+
+        for search_term in ["Zuul", "Gatekeeper"]:
+            expected = self.get_engine().type_counts_query(search_term, type_filters=self.type_filters)
+            self.assertSameBody(template.render(search_term), expected.to_dict())
+
+    def test_render_does_not_modify_template(self):
+        """
+        Tests that rendering copies (rather than modifies) the parameterised parts of the template
+        :return:
+        """
+        template = QueryTemplate.build(lambda search_term: self.get_engine().content_query(search_term, 1, 10))
+        body = dumps(template.body)
+
+        template.render("Zuul", from_start=10, size=10)
+
+        self.assertEqual(dumps(template.body), body, "template body should not be modified")
+        self.assertIn(dumps(SEARCH_TERM_MARKER), body, "template body should hold the search term marker")
+
+    def test_with_body(self):
+        """
+        Tests that a search with a prebuilt body sends the body and params
+        :return:
+        """
+        template = QueryTemplate.build(lambda search_term: self.get_engine().content_query(search_term, 1, 10))
+        body = template.render("Zuul", from_start=0, size=10)
+
+        engine: SearchEngine = self.get_engine().with_body(body, **template.params)
+
+        self.assertIs(engine.to_dict(), body, "search should send the prebuilt body")
+        self.assertEqual(engine._params, template.params, "search should send the template params")
+
+    def test_check_request_size(self):
+        """
+        Tests that page sizes greater than the max request size are rejected
+        :return:
+        """
+        with self.assertRaises(RequestSizeExceededException):
+            SearchEngine.check_request_size(CONFIG.SEARCH.max_request_size + 1)
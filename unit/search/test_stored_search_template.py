@@ -0,0 +1,226 @@
+"""
+Tests that Elasticsearch stored search templates render the same request bodies as building the query, by executing
+templated queries against an Elasticsearch client with a local mock transport
+"""
+from json import dumps
+from typing import List
+from unittest import TestCase
+
+from numpy.random import rand
+
+from elasticsearch import Elasticsearch, Transport
+
+from unit.utils.async_test import AsyncTestCase
+from unit.elasticsearch.elasticsearch_test_utils import mock_search_response
+
+from dp_conceptual_search.search.query_template import QueryTemplate
+from dp_conceptual_search.search.client.multi_search_client import MultiSearchClient
+from dp_conceptual_search.search.stored_search_template import StoredSearchTemplate, StoredSearchTemplates
+from dp_conceptual_search.ons.search.sort_fields import SortField
+from dp_conceptual_search.ons.search.client.search_engine import SearchEngine
+from dp_conceptual_search.ons.search.content_type import AvailableContentTypes, ContentType
+from dp_conceptual_search.ons.search.client.abstract_search_engine import AbstractSearchEngine
+from dp_conceptual_search.ons.conceptual.client.conceptual_search_engine import ConceptualSearchEngine
+
+
+class MockTransport(Transport):
+    """
+    Transport which records requests (rather than sending them), storing registered scripts and returning a mock
+    search response for all other requests
+    """
+    def __init__(self, *args, **kwargs):
+        super(MockTransport, self).__init__(*args, **kwargs)
+
+        self.requests = []
+        self.scripts = {}
+
+    def perform_request(self, method, url, headers=None, params=None, body=None):
+        self.requests.append((method, url, params, body))
+
+        if url.startswith("/_scripts/"):
+            self.scripts[url[len("/_scripts/"):]] = body["script"]["source"]
+            return {"acknowledged": True}
+        if url.endswith("/_msearch/template"):
+            return {"responses": [mock_search_response() for _ in range(0, len(body.splitlines()), 2)]}
+        return mock_search_response()
+
+
+class StoredSearchTemplateTestCase(AsyncTestCase, TestCase):
+
+    def setUp(self):
+        super(StoredSearchTemplateTestCase, self).setUp()
+
+        self.client = Elasticsearch(transport_class=MockTransport)
+
+    @property
+    def transport(self) -> MockTransport:
+        return self.client.transport
+
+    @property
+    def type_filters(self) -> List[ContentType]:
+        return [AvailableContentTypes.BULLETIN.value, AvailableContentTypes.ARTICLE.value]
+
+    def get_engine(self, search_engine_cls=SearchEngine) -> AbstractSearchEngine:
+        return search_engine_cls(using=self.client, index="ons")
+
+    def register(self, build_query, **kwargs) -> StoredSearchTemplate:
+        """
+        Builds and registers the stored search template of a query
+        :param build_query:
+        :param kwargs: Markers for additional query arguments
+        :return:
+        """
+        template = StoredSearchTemplate.from_query_template("test", QueryTemplate.build(build_query, **kwargs))
+
+        self.run_async(lambda: template.put(self.client))
+        return template
+
+    def execute(self, engine: AbstractSearchEngine) -> dict:
+        """
+        Executes a templated query, and returns the body Elasticsearch would render from the registered script
+        :param engine:
+        :return:
+        """
+        self.run_async(engine.execute)
+
+        method, url, params, body = self.transport.requests[-1]
+        self.assertTrue(url.endswith("/_search/template"), "query should be executed with search_template")
+
+        source = self.transport.scripts[body["id"]]
+        return StoredSearchTemplate(body["id"], source, params).render(body["params"])
+
+    def assertRendersQuery(self, template: StoredSearchTemplate, expected: AbstractSearchEngine, search_term: str,
+                           from_start: int=None, size: int=None, **params):
+        """
+        Asserts that the templated query renders exactly the same JSON (including key order) as the built query
+        :param template:
+        :param expected:
+        :param search_term:
+        :param from_start:
+        :param size:
+        :param params:
+        :return:
+        """
+        template_params = template.request_params(search_term, from_start=from_start, size=size, **params)
+        engine = self.get_engine(type(expected)).with_template(template.template_id, template_params,
+                                                               **template.params)
+
+        self.assertEqual(dumps(self.execute(engine)), dumps(expected.to_dict()), "rendered body should match")
+        self.assertEqual(engine._params, expected._params, "request params should match")
+
+    def test_content_query(self):
+        """
+        Tests that the stored content query renders the built content query
+        :return:
+        """
+        template = self.register(lambda term: self.get_engine().content_query(term, 1, 10, sort_by=SortField.relevance,
+                                                                              filter_functions=self.type_filters,
+                                                                              type_filters=self.type_filters))
+
+        for search_term, current_page, size in [("Zuul", 1, 10), ("\"rpi\" cpi", 3, 20)]:
+            expected = self.get_engine().content_query(search_term, current_page, size, sort_by=SortField.relevance,
+                                                       filter_functions=self.type_filters,
+                                                       type_filters=self.type_filters)
+
+            self.assertRendersQuery(template, expected, search_term, SearchEngine.from_start(current_page, size), size)
+
+    def test_type_counts_query(self):
+        """
+        Tests that the stored type counts query renders the built type counts query
+        :return:
+        """
+        template = self.register(lambda term: self.get_engine().type_counts_query(term, type_filters=self.type_filters))
+
+        expected = self.get_engine().type_counts_query("Zuul", type_filters=self.type_filters)
+        self.assertRendersQuery(template, expected, "Zuul")
+
+    def test_featured_result_query(self):
+        """
+        Tests that the stored featured result query renders the built featured result query
+        :return:
+        """
+        template = self.register(lambda term: self.get_engine().featured_result_query(term))
+
+        expected = self.get_engine().featured_result_query("Zuul")
+        self.assertRendersQuery(template, expected, "Zuul")
+
+    def test_conceptual_content_query(self):
+        """
+        Tests that the stored conceptual content query renders the built query, with labels and search vector
+        :return:
+        """
+        engine: ConceptualSearchEngine = self.get_engine(ConceptualSearchEngine)
+
+        labels = ["consumer_price", "inflation", "cpih"]
+        search_vector = rand(300)
+
+        template_kwargs, params = engine.query_template_kwargs(labels=labels, search_vector=search_vector)
+        template = self.register(
+            lambda term, **kwargs: engine.content_query(term, 1, 10, type_filters=self.type_filters, **kwargs),
+            **template_kwargs
+        )
+
+        self.assertNotIn(str(search_vector[0]), template.source, "search vector should not be in the template")
+
+        expected = engine.content_query("Zuul", 2, 10, type_filters=self.type_filters, labels=labels,
+                                        search_vector=search_vector)
+        self.assertRendersQuery(template, expected, "Zuul", 10, 10, **params)
+
+    def test_template_id(self):
+        """
+        Tests that template ids are derived from the template source
+        :return:
+        """
+        def build_query(term: str) -> SearchEngine:
+            return self.get_engine().featured_result_query(term)
+
+        first = StoredSearchTemplate.from_query_template("test", QueryTemplate.build(build_query))
+        second = StoredSearchTemplate.from_query_template("test", QueryTemplate.build(build_query))
+
+        self.assertEqual(first.template_id, second.template_id, "template ids should match")
+        self.assertTrue(first.template_id.startswith("test-"), "template id should have the given prefix")
+
+    def test_multi_search(self):
+        """
+        Tests that templated and non-templated searches are combined in a single msearch_template request
+        :return:
+        """
+        template = self.register(lambda term: self.get_engine().featured_result_query(term))
+
+        templated = self.get_engine().with_template(template.template_id, template.request_params("Zuul"),
+                                                    **template.params)
+        inline = self.get_engine().featured_result_query("Zuul")
+
+        multi_search = MultiSearchClient(using=self.client).add(templated).add(inline)
+
+        async def async_test_function():
+            responses = await multi_search.execute()
+            self.assertEqual(len(responses), 2, "should return one response per search")
+
+        self.run_async(async_test_function)
+
+        method, url, params, body = self.transport.requests[-1]
+        self.assertTrue(url.endswith("/_msearch/template"), "searches should be sent with msearch_template")
+        self.assertEqual(multi_search.to_dict()[3], {"source": inline.to_dict()},
+                         "non-templated search should be sent as an inline template")
+
+    def test_registry(self):
+        """
+        Tests that templates are registered on first use, and only returned once registered
+        :return:
+        """
+        templates = StoredSearchTemplates(self.client, 10)
+        query_template = QueryTemplate.build(lambda term: self.get_engine().featured_result_query(term))
+
+        async def async_test_function():
+            self.assertIsNone(templates.get(("featured",), "featured", query_template),
+                              "template should not be returned before it is registered")
+
+            await templates.wait()
+
+            template = templates.get(("featured",), "featured", query_template)
+            self.assertIsNotNone(template, "template should be returned once registered")
+            self.assertIn(template.template_id, self.transport.scripts, "template should be registered")
+            self.assertTrue(template.template_id.startswith(StoredSearchTemplates.TEMPLATE_ID_PREFIX))
+
+        self.run_async(async_test_function)
@@ -5,10 +5,17 @@ from dp4py_sanic.unit.test_app import TestApp
 
 from dp_conceptual_search.app.app import create_app
 from dp_conceptual_search.app.search_app import SearchApp
+from dp_conceptual_search.api.search.sanic_search_engine import SanicSearchEngine
 
 
 class SearchTestApp(TestApp):
 
+    def setUp(self):
+        super(SearchTestApp, self).setUp()
+
+        # Type counts are cached across apps, so clear them to ensure each test queries Elasticsearch
+        SanicSearchEngine.type_counts_cache.clear()
+
     def get_app(self) -> SearchApp:
         return create_app()
 